@@ -11,6 +11,8 @@ This package organizes boundary models by domain with file naming pattern: {pref
 
 # API boundary models exports (Http API request/response models)
 from github_mingzilla.llm_mcp.boundary_models.api_boundary_models import (
+    ApiBatchChatRequest,
+    ApiBatchChatResult,
     ApiChatMessage,
     ApiChatRequest,
     ApiChatResponse,
@@ -22,6 +24,9 @@ from github_mingzilla.llm_mcp.boundary_models.domain_boundary_models import (
     DomainHttpToolDiscoveryResponse,
     DomainHttpToolExecutionResponse,
     DomainMcpTool,
+    DomainOrchestrationEvent,
+    DomainOrchestrationIteration,
+    DomainOrchestrationState,
     DomainToolExecutionRequest,
     DomainToolSelection,
 )
@@ -55,6 +60,8 @@ from github_mingzilla.llm_mcp.boundary_models.openai_boundary_models import (
 # All models available at package level
 __all__ = [
     # API boundary models (Api* prefix)
+    "ApiBatchChatRequest",
+    "ApiBatchChatResult",
     "ApiChatMessage",
     "ApiChatRequest",
     "ApiChatResponse",
@@ -63,6 +70,9 @@ __all__ = [
     "DomainHttpToolDiscoveryResponse",
     "DomainHttpToolExecutionResponse",
     "DomainMcpTool",
+    "DomainOrchestrationEvent",
+    "DomainOrchestrationIteration",
+    "DomainOrchestrationState",
     "DomainToolExecutionRequest",
     "DomainToolSelection",
     # LLM boundary models (Llm* prefix)
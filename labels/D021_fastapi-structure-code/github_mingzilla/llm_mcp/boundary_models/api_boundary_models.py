@@ -6,9 +6,10 @@ This module contains models that cross HTTP API boundaries:
 - Models that external clients see
 """
 
+import json
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from github_mingzilla.llm_mcp.boundary_models.domain_boundary_models import DomainToolSelection
 
@@ -16,10 +17,15 @@ from github_mingzilla.llm_mcp.boundary_models.domain_boundary_models import Doma
 class ApiChatRequest(BaseModel):
     """Request model for chat endpoint."""
 
-    message: str = Field(..., description="User message to send to LLM")
+    message: str = Field(..., description="User message to send to LLM; empty to resume the tool orchestration of session_id")
     session_id: Optional[str] = Field(None, description="Optional session ID for conversation continuity")
     model: Optional[str] = Field(default="gpt-4.1-nano", description="LLM model to use")
     selected_tools: Optional[List[DomainToolSelection]] = Field(None, description="List of tool selection objects with server info")
+    persist_response: bool = Field(False, description="Accumulate streamed content server-side and save the assistant reply to history")
+    stream_tool_calls: bool = Field(False, description="Stream tool orchestration, starting each tool call as soon as its arguments are complete")
+    temperature: Optional[float] = Field(None, ge=0, le=2, description="Sampling temperature (provider default if omitted); 0 makes batch responses cacheable")
+    timeout: Optional[float] = Field(None, gt=0, description="Deadline in seconds for tool orchestration across all LLM rounds and tool calls (server default if omitted)")
+    max_iterations: Optional[int] = Field(None, ge=1, le=50, description="Tool orchestration iteration budget, i.e. LLM rounds per user message (server default if omitted)")
 
 
 class ApiChatResponse(BaseModel):
@@ -32,6 +38,22 @@ class ApiChatResponse(BaseModel):
     tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tool calls made during response")
 
 
+class ApiBatchChatRequest(BaseModel):
+    """Request model for the bulk chat endpoint."""
+
+    requests: List[ApiChatRequest] = Field(..., min_length=1, description="Chat requests to run; results refer to them by index")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Maximum requests in flight per provider (capped by the server limit)")
+
+
+class ApiBatchChatResult(BaseModel):
+    """One NDJSON line of the bulk chat response."""
+
+    index: int = Field(..., description="Index of the request in the batch")
+    response: Optional[ApiChatResponse] = Field(None, description="Chat response, if the request succeeded")
+    error: Optional[str] = Field(None, description="Error message, if the request failed")
+    status_code: int = Field(200, description="HTTP status the request would have had on the chat endpoint")
+
+
 class ApiChatMessage(BaseModel):
     """Individual chat message model."""
 
@@ -40,6 +62,26 @@ class ApiChatMessage(BaseModel):
     tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tool calls made by assistant")
     tool_call_id: Optional[str] = Field(None, description="ID of tool call (for tool role messages)")
     name: Optional[str] = Field(None, description="Name of tool that was called (for tool role messages)")
+    orchestration_round: Optional[int] = Field(None, description="Tool orchestration round that produced this assistant message, counted from 0 per user message (resume checkpoint)")
+
+    _token_estimate: Optional[int] = PrivateAttr(default=None)
+
+    def estimate_tokens(self) -> int:
+        """
+        Estimate the prompt tokens of this message (about 4 characters per token).
+
+        The estimate is computed once and cached, since messages are not modified after
+        they are saved to history.
+
+        Returns:
+            Estimated token count including per-message overhead
+        """
+        if self._token_estimate is None:
+            characters = len(self.content or "")
+            if self.tool_calls:
+                characters += len(json.dumps(self.tool_calls))
+            self._token_estimate = characters // 4 + 4
+        return self._token_estimate
 
 
 class ApiToolCall(BaseModel):
@@ -50,6 +50,36 @@ class DomainToolExecutionRequest(BaseModel):
         return self.arguments
 
 
+class DomainOrchestrationEvent(BaseModel):
+    """Progress event emitted while streaming tool orchestration runs."""
+
+    event: str = Field(..., description="Event type: 'content', 'tool_call_started', 'tool_call_completed', 'llm_response' or 'error'")
+    data: Dict[str, Any] = Field(default_factory=dict, description="Event payload")
+
+
+class DomainOrchestrationIteration(BaseModel):
+    """Timing of one orchestration iteration: an LLM round and the tool calls it made."""
+
+    iteration: int = Field(..., description="Iteration number, starting at 0")
+    llm_ms: Optional[float] = Field(None, description="Duration of the LLM round in milliseconds")
+    tools_ms: Optional[float] = Field(None, description="Time spent waiting for tool results after the LLM round in milliseconds")
+    tool_calls: int = Field(0, description="Number of tool calls executed")
+
+
+class DomainOrchestrationState(BaseModel):
+    """Progress of the tool orchestration of one session."""
+
+    session_id: str = Field(..., description="Session ID of the conversation")
+    model: str = Field(..., description="Model used for the LLM rounds")
+    status: str = Field("running", description="'running', 'completed', 'failed', 'deadline_exceeded', 'budget_exhausted' or 'interrupted'")
+    iteration: int = Field(0, description="LLM rounds completed since the last user message, including earlier attempts")
+    max_iterations: int = Field(..., description="Iteration budget")
+    resumed: bool = Field(False, description="Whether the orchestration continued from a checkpoint in the history")
+    started_at: float = Field(..., description="Start time (Unix timestamp)")
+    updated_at: float = Field(..., description="Time of the last progress (Unix timestamp)")
+    iterations: List[DomainOrchestrationIteration] = Field(default_factory=list, description="Timing of the iterations run by this attempt")
+
+
 class DomainMcpTool(BaseModel):
     """Type-safe model for MCP tool definitions."""
 
@@ -1,97 +1,151 @@
 """
 HTTP client singleton for connection pooling across the application.
 
-Provides a shared aiohttp connector with optimized settings for performance.
+Every LLM provider (raw streaming, AsyncOpenAI, pydantic_ai) sends its requests through
+the httpx clients managed here, so batch and stream calls to the same host share warm
+connections and all pool tuning lives in one place.
+
+Configuration via environment variables:
+- HTTP_MAX_CONNECTIONS_PER_HOST: Maximum open connections per host (default 50)
+- HTTP_MAX_KEEPALIVE_PER_HOST: Maximum idle keep-alive connections per host (default 20)
+- HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open (default 30)
+- HTTP_ENABLE_HTTP2: Negotiate HTTP/2 where supported; requires the `h2` package (default false)
 """
 
-import aiohttp
-from aiohttp import TCPConnector
+import os
+from typing import Dict
+from urllib.parse import urlsplit
 
+import httpx
+
+from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
 
 
-class _HTTPClient:
+def _h2_available() -> bool:
+    """Check whether the optional `h2` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _HTTPClient(ClosableService):
     """
-    Singleton HTTP client for connection pooling.
+    Singleton HTTP transport for connection pooling.
 
-    Provides a shared TCP connector with optimized settings for high-performance
-    HTTP operations across the application.
+    Keeps one httpx client per host (scheme, host and port), which makes the pool
+    limits per-host limits and lets the connection stats be reported per host.
     """
 
     def __init__(self):
-        """Initialize HTTP client with pooled connector."""
+        """Initialize HTTP client configuration; clients are created per host on first use."""
         super().__init__()
-        self._connector = None
+        self.max_connections_per_host = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "50"))
+        self.max_keepalive_per_host = int(os.getenv("HTTP_MAX_KEEPALIVE_PER_HOST", "20"))
+        self.keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
 
-    def get_connector(self) -> TCPConnector:
-        """
-        Get the shared TCP connector.
+        self.http2 = os.getenv("HTTP_ENABLE_HTTP2", "false").lower() == "true"
+        if self.http2 and not _h2_available():
+            print("HTTP_ENABLE_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+            self.http2 = False
 
-        Creates the connector on first access for lazy initialization.
-        Requires an active event loop.
-        """
-        if self._connector is None or self._connector.closed:
-            try:
-                self._connector = aiohttp.TCPConnector(
-                    limit=100,  # Total connection pool size
-                    limit_per_host=50,  # Per-host connection limit
-                    keepalive_timeout=30,  # Keep connections alive for 30 seconds
-                    enable_cleanup_closed=True,  # Clean up closed connections
-                    ttl_dns_cache=300,  # DNS cache TTL (5 minutes)
-                    use_dns_cache=True,  # Enable DNS caching
-                )
-            except RuntimeError as e:
-                if "no running event loop" in str(e):
-                    raise RuntimeError("HTTPClient.get_connector() requires an active event loop. Call this method from within an async context.") from e
-                raise
-        return self._connector
-
-    def create_session(self, **kwargs) -> aiohttp.ClientSession:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._request_counts: Dict[str, int] = {}
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
         """
-        Create a new client session with the shared connector.
+        Get the shared client for the host of a URL.
+
+        Can be called outside an event loop, so SDK clients can be configured at
+        construction time.
 
         Args:
-            **kwargs: Additional arguments for ClientSession
+            url: Any URL on the target host (e.g. a provider base URL)
 
         Returns:
-            Configured ClientSession with shared connector
+            Pooled httpx client for that host
         """
-        session_kwargs = {"connector": self.get_connector()}
-        session_kwargs.update(kwargs)
-        return aiohttp.ClientSession(**session_kwargs)
+        host = self._host_key(url)
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_keepalive_per_host,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(600, connect=5),
+                http2=self.http2,
+                event_hooks={"request": [self._count_request]},
+            )
+            self._clients[host] = client
+        return client
+
+    async def _count_request(self, request: httpx.Request):
+        """Count requests per host for the connection stats."""
+        host = self._host_key(str(request.url))
+        self._request_counts[host] = self._request_counts.get(host, 0) + 1
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        """Normalize a URL to scheme://host:port."""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return f"{parts.scheme}://{parts.hostname}:{port}"
 
     async def close(self):
         """
-        Close the HTTP client and clean up resources.
+        Close all per-host clients and their connections.
 
         Should be called during application shutdown.
         """
-        if self._connector is not None and not self._connector.closed:
-            await self._connector.close()
-            self._connector = None
+        for client in self._clients.values():
+            if not client.is_closed:
+                await client.aclose()
+        self._clients.clear()
+
+    async def disconnect(self):
+        """Close pooled connections on shutdown."""
+        await self.close()
 
     @property
     def is_closed(self) -> bool:
         """Check if the HTTP client is closed."""
-        return self._connector is not None and self._connector.closed
+        return not self._clients or all(client.is_closed for client in self._clients.values())
 
     def get_connection_stats(self) -> dict:
         """
-        Get connection pool statistics.
+        Get connection pool statistics for all hosts.
 
         Returns:
-            Dictionary with connection pool statistics
+            Dictionary with pool settings and per-host connection and request counts
         """
-        if self._connector is None:
-            return {"status": "not_initialized"}
+        hosts = {}
+        for host, client in self._clients.items():
+            connections = self._get_pool_connections(client)
+            hosts[host] = {
+                "connections": len(connections),
+                "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+                "requests": self._request_counts.get(host, 0),
+                "is_closed": client.is_closed,
+            }
 
         return {
-            "limit": self._connector.limit,
-            "limit_per_host": self._connector.limit_per_host,
-            "keepalive_timeout": self._connector.keepalive_timeout,
-            "is_closed": self._connector.closed,
+            "max_connections_per_host": self.max_connections_per_host,
+            "max_keepalive_per_host": self.max_keepalive_per_host,
+            "keepalive_expiry": self.keepalive_expiry,
+            "http2": self.http2,
+            "hosts": hosts,
         }
 
+    @staticmethod
+    def _get_pool_connections(client: httpx.AsyncClient) -> list:
+        """Get the open connections of a client's pool (httpcore internals; empty if unavailable)."""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []))
+
 
 http_client = _HTTPClient()
 singleton_manager.register(http_client)
@@ -1,4 +1,6 @@
-from typing import AsyncGenerator, List, Optional
+import time
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 from dotenv import load_dotenv
 
@@ -6,8 +8,16 @@ from github_mingzilla.llm_mcp.clients.http_client import http_client
 from github_mingzilla.llm_mcp.models import ApiChatMessage, DomainMcpTool, LlmResponse
 from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.services.admission_control_service import admission_control_service
+from github_mingzilla.llm_mcp.util.context_window import ContextWindowManager
+from github_mingzilla.llm_mcp.util.endpoint_pool import OllamaEndpointRegistry
+from github_mingzilla.llm_mcp.util.hedging import HedgingPolicy
 from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
 from github_mingzilla.llm_mcp.util.llm_providers import LLMProviders
+from github_mingzilla.llm_mcp.util.metrics import LLM_ERRORS_TOTAL, LLM_REQUEST_DURATION_SECONDS, StreamTimer
+from github_mingzilla.llm_mcp.util.sse_util import SseFrameBuffer
+from github_mingzilla.llm_mcp.util.tracing import tracer
 
 load_dotenv()
 
@@ -21,16 +31,80 @@ class _LLMClient(ClosableService):
         # This prevents issues where cache was populated before environment variables were loaded
         LlmModel.clear_cache()
         self._providers = LLMProviders()
+        # Trims outgoing history to each model's prompt token budget
+        self.context_window = ContextWindowManager()
+        # Sends backup calls for requests that are slow to respond (opt-in), within admission limits
+        self.hedging = HedgingPolicy(backup_gate=self._admit_backup)
+        # Spreads Ollama requests across the endpoints of each model
+        self.endpoints = OllamaEndpointRegistry()
 
-    async def invoke(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]]) -> LlmResponse:
-        llm_model = LlmModel.get_by_model(model)
-        provider = self._providers.get_by_name(llm_model.provider)
-        return await provider.chat_completion(messages=messages, model=llm_model.model_name, mcp_tools=mcp_tools)
+    async def invoke(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]], openai_messages: Optional[List[Dict[str, Any]]] = None, temperature: Optional[float] = None, session_id: Optional[str] = None) -> LlmResponse:
+        llm_model = self.endpoints.route(LlmModel.get_by_model(model), session_id)
+        fit = self._fit_per_model(llm_model, messages, openai_messages)
+        primary_messages, _ = await fit(llm_model)
+
+        async def call(target: LlmModel) -> LlmResponse:
+            target_messages, target_openai = await fit(target)
+            return await self._invoke_model(target, target_messages, mcp_tools, target_openai, temperature)
+
+        backup = self.hedging.get_backup(llm_model)
+        if backup is None:
+            return await call(llm_model)
+        return await self.hedging.call(llm_model, backup, call, self._estimate_prompt_tokens(primary_messages))
+
+    def _fit_per_model(self, llm_model: LlmModel, messages: List[ApiChatMessage], openai_messages: Optional[List[Dict[str, Any]]]) -> Callable[[LlmModel], Awaitable[Tuple[List[ApiChatMessage], Optional[List[Dict[str, Any]]]]]]:
+        """
+        Get a function that fits the history into the prompt budget of a call's target model.
+
+        The fit for the primary model is reused by targets with the same budget, so only a
+        hedging backup with a different context window is fitted again.
+        """
+        fitted: Dict[int, Tuple[List[ApiChatMessage], Optional[List[Dict[str, Any]]]]] = {}
+
+        async def fit(target: LlmModel) -> Tuple[List[ApiChatMessage], Optional[List[Dict[str, Any]]]]:
+            budget = target.prompt_token_budget
+            if budget not in fitted:
+                fitted[budget] = await self.context_window.fit(messages, target, openai_messages)
+            return fitted[budget]
+
+        return fit
+
+    @staticmethod
+    def _admit_backup(backup: LlmModel) -> Optional[Callable[[], None]]:
+        """Take an admission slot for a hedged backup call right away, or skip the backup."""
+        ticket = admission_control_service.try_acquire(backup.model_name)
+        return ticket.release if ticket else None
+
+    @staticmethod
+    def _is_error_chunk(chunk: Union[str, bytes]) -> bool:
+        """Check whether a stream item is the error chunk emitted for a failed upstream call."""
+        if isinstance(chunk, bytes):
+            return b'data: {"error"' in chunk
+        return chunk.startswith('{"error"')
+
+    async def _invoke_model(self, llm_model: LlmModel, messages: List[ApiChatMessage], mcp_tools: Optional[List[DomainMcpTool]], openai_messages: Optional[List[Dict[str, Any]]], temperature: Optional[float]) -> LlmResponse:
+        """Run one batch completion against a specific model configuration."""
+        provider = self._providers.get_by_name(llm_model.provider, llm_model.endpoint)
+
+        started = time.perf_counter()
+        with tracer.span("llm.call", model=llm_model.model_name, provider=llm_model.provider, endpoint=llm_model.endpoint, messages=len(messages)), self.endpoints.track(llm_model):
+            try:
+                max_tokens = llm_model.max_tokens_for(self._estimate_prompt_tokens(messages))
+                response = await provider.chat_completion(messages=messages, model=llm_model.model_name, mcp_tools=mcp_tools, openai_messages=openai_messages, temperature=temperature, max_tokens=max_tokens)
+            except Exception:
+                LLM_ERRORS_TOTAL.inc(llm_model.model_name, llm_model.provider, "batch")
+                raise
+        LLM_REQUEST_DURATION_SECONDS.observe(time.perf_counter() - started, llm_model.model_name, llm_model.provider)
+        return response
 
     async def raw_stream_openai_format(
         self,
         messages: List[ApiChatMessage],
         model: Optional[str],
+        mcp_tools: Optional[List[DomainMcpTool]] = None,
+        openai_messages: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None,
+        session_id: Optional[str] = None,
     ) -> AsyncGenerator[str, None]:
         """
         Unified streaming method using LlmModel utility for configuration.
@@ -38,52 +112,192 @@ class _LLMClient(ClosableService):
         Args:
             messages: List of chat messages
             model: Model name (determines provider and endpoints automatically)
+            mcp_tools: Optional MCP tools offered to the model as OpenAI functions
+            openai_messages: Optional pre-encoded `messages` (skips conversion)
+            temperature: Optional sampling temperature (defaults to 0.7)
+            session_id: Optional conversation ID, keeps the session on one Ollama endpoint
 
         Yields:
             Raw strings from provider API
         """
+        llm_model = self.endpoints.route(LlmModel.get_by_model(model), session_id)
+        fit = self._fit_per_model(llm_model, messages, openai_messages)
+        primary_messages, primary_openai = await fit(llm_model)
+
+        async def open_stream(target: LlmModel) -> AsyncGenerator[str, None]:
+            target_messages, target_openai = await fit(target)
+            async with aclosing(self._stream_openai_format(target, target_messages, mcp_tools, target_openai, temperature)) as stream:
+                async for chunk in stream:
+                    yield chunk
+
+        backup = self.hedging.get_backup(llm_model)
+        stream = self._stream_openai_format(llm_model, primary_messages, mcp_tools, primary_openai, temperature) if backup is None else self.hedging.stream(llm_model, backup, open_stream, self._estimate_prompt_tokens(primary_messages), self._is_error_chunk)
+        async with aclosing(stream):
+            async for chunk in stream:
+                yield chunk
+
+    async def _stream_openai_format(self, llm_model: LlmModel, messages: List[ApiChatMessage], mcp_tools: Optional[List[DomainMcpTool]], openai_messages: Optional[List[Dict[str, Any]]], temperature: Optional[float]) -> AsyncGenerator[str, None]:
+        """Stream one completion from a specific model configuration as raw JSON strings."""
         import asyncio
         import json
 
-        from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
+        payload = self._build_stream_payload(messages, llm_model, mcp_tools, openai_messages, temperature)
 
-        llm_model = LlmModel.get_by_model(model)
-        openai_messages = LlmOpenaiUtil.chat_messages_to_openai_format(messages)
-        payload = {
-            "model": llm_model.model_name,
-            "messages": openai_messages,
-            "stream": True,
-            "temperature": 0.7,
-            "max_tokens": 2000,
-        }
+        client = http_client.get_client(llm_model.stream_url)
+        chunk_count = 0
+        timer = StreamTimer(llm_model.model_name, llm_model.provider)
 
-        async with http_client.create_session() as session:
+        with tracer.span("llm.stream", model=llm_model.model_name, provider=llm_model.provider, endpoint=llm_model.endpoint, tools=len(mcp_tools or [])) as span, self.endpoints.track(llm_model) as lease:
             try:
-                async with session.post(llm_model.stream_url, headers=llm_model.get_headers(), json=payload) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        error_chunk = {"error": f"API error {response.status}: {error_text}", "choices": [{"finish_reason": "error"}]}
+                async with client.stream("POST", llm_model.stream_url, headers=llm_model.get_headers(), json=payload) as response:
+                    if response.status_code != 200:
+                        lease.fail()
+                        LLM_ERRORS_TOTAL.inc(llm_model.model_name, llm_model.provider, "stream")
+                        error_text = (await response.aread()).decode("utf-8", errors="replace")
+                        error_chunk = {"error": f"API error {response.status_code}: {error_text}", "choices": [{"finish_reason": "error"}]}
                         yield json.dumps(error_chunk)
                         return
 
-                    chunk_count = 0
-
                     # Parse SSE format and yield only JSON data
-                    async for line in response.content:
+                    async for line in response.aiter_lines():
                         chunk_count += 1
-                        line_text = line.decode("utf-8").strip()
+                        line_text = line.strip()
                         if line_text.startswith("data: "):
                             json_data = line_text[6:]  # Remove "data: " prefix
                             if json_data and json_data != "[DONE]":
+                                timer.on_chunks()
                                 yield json_data
 
             except asyncio.CancelledError:
-                print(f"🛑 LLM CLIENT DISCONNECTION DETECTED! - streamed {chunk_count} chunks")
+                span.add_event("upstream_cancelled", lines=chunk_count)
                 raise  # Re-raise to properly handle the cancellation
             except Exception as e:
+                lease.fail()
+                LLM_ERRORS_TOTAL.inc(llm_model.model_name, llm_model.provider, "stream")
                 print(f"❌ LLM Client: Unexpected error during streaming: {e}")
                 error_chunk = {"error": f"Stream error: {str(e)}", "choices": [{"finish_reason": "error"}]}
                 yield json.dumps(error_chunk)
+            finally:
+                timer.finish()
+                span.set_attribute("chunks", timer.chunks)
+
+    async def raw_stream_sse_bytes(
+        self,
+        messages: List[ApiChatMessage],
+        model: Optional[str],
+        openai_messages: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Passthrough streaming method that forwards upstream `data:` frames as raw bytes.
+
+        Upstream payloads are never decoded: network reads are reassembled into complete
+        lines and re-framed as `event: chunk` SSE events that can be written straight to
+        the ASGI response. All frames completed by one network read are yielded together.
+
+        Args:
+            messages: List of chat messages
+            model: Model name (determines provider and endpoints automatically)
+            openai_messages: Optional pre-encoded `messages` (skips conversion)
+            temperature: Optional sampling temperature (defaults to 0.7)
+            session_id: Optional conversation ID, keeps the session on one Ollama endpoint
+
+        Yields:
+            Ready-to-send SSE event bytes
+        """
+        llm_model = self.endpoints.route(LlmModel.get_by_model(model), session_id)
+        fit = self._fit_per_model(llm_model, messages, openai_messages)
+        primary_messages, primary_openai = await fit(llm_model)
+
+        async def open_stream(target: LlmModel) -> AsyncGenerator[bytes, None]:
+            target_messages, target_openai = await fit(target)
+            async with aclosing(self._stream_sse_bytes(target, target_messages, target_openai, temperature)) as stream:
+                async for frames in stream:
+                    yield frames
+
+        backup = self.hedging.get_backup(llm_model)
+        stream = self._stream_sse_bytes(llm_model, primary_messages, primary_openai, temperature) if backup is None else self.hedging.stream(llm_model, backup, open_stream, self._estimate_prompt_tokens(primary_messages), self._is_error_chunk)
+        async with aclosing(stream):
+            async for frames in stream:
+                yield frames
+
+    async def _stream_sse_bytes(self, llm_model: LlmModel, messages: List[ApiChatMessage], openai_messages: Optional[List[Dict[str, Any]]], temperature: Optional[float]) -> AsyncGenerator[bytes, None]:
+        """Stream one completion from a specific model configuration as SSE event bytes."""
+        import asyncio
+        import json
+
+        payload = self._build_stream_payload(messages, llm_model, openai_messages=openai_messages, temperature=temperature)
+        frame_buffer = SseFrameBuffer()
+
+        client = http_client.get_client(llm_model.stream_url)
+        timer = StreamTimer(llm_model.model_name, llm_model.provider)
+
+        with tracer.span("llm.stream_passthrough", model=llm_model.model_name, provider=llm_model.provider, endpoint=llm_model.endpoint) as span, self.endpoints.track(llm_model) as lease:
+            try:
+                async with client.stream("POST", llm_model.stream_url, headers=llm_model.get_headers(), json=payload) as response:
+                    if response.status_code != 200:
+                        lease.fail()
+                        LLM_ERRORS_TOTAL.inc(llm_model.model_name, llm_model.provider, "passthrough")
+                        error_text = (await response.aread()).decode("utf-8", errors="replace")
+                        error_chunk = {"error": f"API error {response.status_code}: {error_text}", "choices": [{"finish_reason": "error"}]}
+                        yield frame_buffer.encode_frame(json.dumps(error_chunk).encode("utf-8"))
+                        return
+
+                    async for data in response.aiter_bytes():
+                        frame_count = frame_buffer.frame_count
+                        frames = frame_buffer.feed(data)
+                        if frames:
+                            timer.on_chunks(frame_buffer.frame_count - frame_count)
+                            yield frames
+
+                    frame_count = frame_buffer.frame_count
+                    frames = frame_buffer.flush()
+                    if frames:
+                        timer.on_chunks(frame_buffer.frame_count - frame_count)
+                        yield frames
+
+            except asyncio.CancelledError:
+                span.add_event("upstream_cancelled", frames=frame_buffer.frame_count)
+                raise  # Re-raise to properly handle the cancellation
+            except Exception as e:
+                lease.fail()
+                LLM_ERRORS_TOTAL.inc(llm_model.model_name, llm_model.provider, "passthrough")
+                print(f"❌ LLM Client: Unexpected error during passthrough streaming: {e}")
+                error_chunk = {"error": f"Stream error: {str(e)}", "choices": [{"finish_reason": "error"}]}
+                yield frame_buffer.encode_frame(json.dumps(error_chunk).encode("utf-8"))
+            finally:
+                timer.finish()
+                span.set_attribute("chunks", timer.chunks)
+
+    @staticmethod
+    def _estimate_prompt_tokens(messages: List[ApiChatMessage]) -> int:
+        """Estimate the prompt size of a request, used to cap max_tokens and account for hedging waste."""
+        return sum(message.estimate_tokens() for message in messages)
+
+    def _build_stream_payload(self, messages: List[ApiChatMessage], llm_model: LlmModel, mcp_tools: Optional[List[DomainMcpTool]] = None, openai_messages: Optional[List[Dict[str, Any]]] = None, temperature: Optional[float] = None) -> dict:
+        """
+        Build the OpenAI-compatible request body shared by both streaming modes.
+
+        max_tokens is capped so that the counted prompt plus the completion fit the
+        model's context window.
+        """
+        if openai_messages is None:
+            openai_messages = LlmOpenaiUtil.chat_messages_to_openai_format(messages)
+
+        payload = {
+            "model": llm_model.model_name,
+            "messages": openai_messages,
+            "stream": True,
+            "temperature": 0.7 if temperature is None else temperature,
+            "max_tokens": llm_model.max_tokens_for(self._estimate_prompt_tokens(messages)),
+        }
+
+        if mcp_tools:
+            payload["tools"] = LlmOpenaiUtil.mcp_to_openai_functions(mcp_tools)
+            payload["tool_choice"] = "auto"
+
+        return payload
 
     async def test_connection(self, model: Optional[str] = None) -> bool:
         """
@@ -96,13 +310,86 @@ class _LLMClient(ClosableService):
             True if connection successful, False otherwise
         """
         llm_model = LlmModel.get_by_model(model)
-        provider = self._providers.get_by_name(llm_model.provider)
+        provider = self._providers.get_by_name(llm_model.provider, llm_model.endpoint)
         return await provider.test_connection()
 
+    async def warm_up_model(self, model: str, keep_alive: str) -> str:
+        """
+        Create the provider client for a model and, for Ollama, load the model into memory.
+
+        Provider construction imports its SDK, so it runs in a worker thread. Ollama loads a
+        model when it receives a generate request without a prompt; `keep_alive` controls
+        how long it then stays resident. Every endpoint serving the model is warmed up.
+
+        Args:
+            model: Model name
+            keep_alive: Ollama keep-alive duration (e.g. "30m", "-1" to keep indefinitely)
+
+        Returns:
+            Short description of what was warmed up
+        """
+        import asyncio
+
+        llm_model = LlmModel.get_by_model(model)
+        if llm_model.provider != "ollama":
+            await asyncio.to_thread(self._providers.get_by_name, llm_model.provider)
+            return f"{llm_model.provider} client ready"
+
+        async def load(endpoint: str):
+            await asyncio.to_thread(self._providers.get_by_name, llm_model.provider, endpoint)
+            response = await http_client.get_client(endpoint).post(f"{endpoint}/api/generate", json={"model": llm_model.model_name, "keep_alive": keep_alive}, timeout=120.0)
+            response.raise_for_status()
+
+        endpoints = self.endpoints.get_endpoints(llm_model)
+        await asyncio.gather(*(load(endpoint) for endpoint in endpoints))
+        return f"{llm_model.model_name} loaded on {len(endpoints)} endpoint(s) (keep_alive={keep_alive})"
+
+    async def probe_endpoints(self, timeout: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Check every configured LLM endpoint by listing its models, which generates no tokens.
+
+        Ollama endpoints are always checked; OpenAI only when OPENAI_API_KEY is set.
+
+        Args:
+            timeout: Seconds to wait for each endpoint
+
+        Returns:
+            Mapping of endpoint URL to {"healthy", "latency_ms", and "error" on failure}
+        """
+        import asyncio
+        import os
+
+        targets = {endpoint: (f"{endpoint}/api/tags", {}) for endpoint in self.endpoints.get_all_endpoints()}
+        api_key = os.getenv("OPENAI_API_KEY")
+        if api_key:
+            base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+            targets[base_url] = (f"{base_url}/models", {"Authorization": f"Bearer {api_key}"})
+
+        async def probe(url: str, headers: Dict[str, str]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                response = await http_client.get_client(url).get(url, headers=headers, timeout=timeout)
+                response.raise_for_status()
+                result = {"healthy": True}
+            except Exception as e:
+                result = {"healthy": False, "error": str(e) or type(e).__name__}
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+
+        results = await asyncio.gather(*(probe(url, headers) for url, headers in targets.values()))
+        return dict(zip(targets, results))
+
+    def get_connection_stats(self) -> dict:
+        """Get connection pool statistics of the shared HTTP transport used by all providers."""
+        return http_client.get_connection_stats()
+
+    def get_endpoint_stats(self) -> Dict[str, Any]:
+        """Get routing statistics of the Ollama endpoints."""
+        return self.endpoints.get_stats()
+
     async def disconnect(self):
         """Disconnect and cleanup LLM client resources."""
-        # LLM client doesn't maintain persistent connections
-        # but we implement this for interface compliance
+        # Pooled connections belong to http_client, which is closed by the singleton manager
         pass
 
 
@@ -1,12 +1,20 @@
 import asyncio
 import json
-from typing import Any, Dict, List, Optional
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
 
-from github_mingzilla.llm_mcp.config import load_enabled_mcp_servers
+from github_mingzilla.llm_mcp.config import get_shared_state_path, load_enabled_mcp_servers
 from github_mingzilla.llm_mcp.mcp_clients.single_server_mcp_client import SingleServerMCPClient
 from github_mingzilla.llm_mcp.models import ApiChatMessage, DomainMcpTool, DomainToolExecutionRequest, DomainToolSelection
+from github_mingzilla.llm_mcp.repositories.sqlite_tool_catalogue_store import SqliteToolCatalogueStore
+from github_mingzilla.llm_mcp.repositories.tool_result_cache_repository import tool_result_cache_repo
 from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
+from github_mingzilla.llm_mcp.util.metrics import MCP_TOOL_CALL_SECONDS, MCP_TOOL_CALLS_SAVED_TOTAL
+from github_mingzilla.llm_mcp.util.tracing import tracer
 
 
 class _MCPClient(ClosableService):
@@ -19,61 +27,219 @@ class _MCPClient(ClosableService):
 
         # Dynamic client management
         self._mcp_clients: Dict[str, SingleServerMCPClient] = {}
+        self._client_locks: Dict[str, asyncio.Lock] = {}
+
+        # Aggregated tool catalogue (stale-while-revalidate)
+        self._tools_cache_ttl = float(os.getenv("MCP_TOOLS_CACHE_TTL", "60"))
+        self._server_tools: Dict[str, List[DomainMcpTool]] = {}
+        self._all_tools: Optional[List[DomainMcpTool]] = None
+        self._tool_index: Dict[Tuple[str, str], DomainMcpTool] = {}
+        self._tools_by_name: Dict[str, List[DomainMcpTool]] = {}
+        self._tools_cached_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Shared-state mode: the catalogue is shared with other workers through SQLite
+        catalogue_path = get_shared_state_path("tool_catalogue.db")
+        self._catalogue_store = SqliteToolCatalogueStore(catalogue_path) if catalogue_path else None
+        self._discovery_lease_ttl = float(os.getenv("MCP_DISCOVERY_LEASE_TTL", "30"))
+        self._discovery_backoff_until = 0.0
+        self._worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        # Results of idempotent tool calls (see `tool_cache` in the server configuration)
+        self.tool_result_cache_repo = tool_result_cache_repo
 
     async def get_filtered_tools(self, selected_tools: Optional[List[DomainToolSelection]]) -> List[DomainMcpTool]:
-        """Get filtered tools based on ToolSelection objects."""
+        """Get filtered tools based on ToolSelection objects.
+
+        Selections are resolved against the (server, name) index; a selection without a
+        server matches the tool of that name on every server.
+        """
         if not selected_tools:
             return []
 
-        mcp_tools = await self.discover_tools()
+        await self.discover_tools()
 
         filtered_tools = []
-        for tool in mcp_tools:
-            for selection in selected_tools:
-                # Handle both DomainMcpTool objects and dict fallback
-                tool_name = tool.name if hasattr(tool, "name") else tool.get("name") if isinstance(tool, dict) else None
-                tool_server = tool.server if hasattr(tool, "server") else tool.get("server") if isinstance(tool, dict) else None
-
-                if tool_name and tool_name == selection.name:
-                    if selection.server is None or tool_server == selection.server:
-                        filtered_tools.append(tool)
-                        break
+        seen = set()
+        for selection in selected_tools:
+            if selection.server is None:
+                matches = self._tools_by_name.get(selection.name, [])
+            else:
+                tool = self._tool_index.get((selection.server, selection.name))
+                matches = [tool] if tool else []
+
+            for tool in matches:
+                key = (tool.server, tool.name)
+                if key not in seen:
+                    seen.add(key)
+                    filtered_tools.append(tool)
         return filtered_tools
 
     async def discover_tools(self) -> List[DomainMcpTool]:
         """
         Discover available tools from all MCP servers.
+
+        The catalogue is cached for MCP_TOOLS_CACHE_TTL seconds. Once it is stale the
+        cached tools are returned immediately while a single background refresh runs;
+        only the very first call waits for the servers.
+
+        In shared-state mode the catalogue stored by other workers is picked up first,
+        so a worker only contacts the servers if no worker has discovered them yet or
+        the stored catalogue is stale. A worker that finds the discovery lease taken
+        waits for the lease TTL before trying again.
+
         Returns:
             List of tool definitions from all servers
         """
-        all_tools = []
+        if self._catalogue_store is not None:
+            await self._sync_shared_catalogue()
 
-        # Discover tools from all enabled servers
-        for server_name, server_config in self._server_config.items():
-            try:
-                client = await self._get_or_create_client(server_name)
+        now = time.monotonic()
+        if self._all_tools is None:
+            await self._refresh_tools()
+        elif now - self._tools_cached_at > self._tools_cache_ttl and now >= self._discovery_backoff_until:
+            self._start_tools_refresh()
 
-                if client:
-                    server_tools = await client.discover_tools()
+        return list(self._all_tools or [])
 
-                    # Convert to DomainMcpTool objects with server metadata using boundary model
-                    for tool_item in server_tools:
-                        mcp_tool = DomainMcpTool.from_dict(tool_item, server=server_name, server_url=server_config["url"], server_description=server_config.get("description", ""))
-                        all_tools.append(mcp_tool)
-                    print(f"Found {len(server_tools)} tools from {server_name} server")
-                else:
+    def invalidate_tools_cache(self, server_name: Optional[str] = None):
+        """
+        Mark the tool catalogue as stale and refresh it in the background.
+
+        Called when a server sends a tools/list_changed notification.
+
+        Args:
+            server_name: Server whose tool list changed (informational)
+        """
+        tracer.current_span().add_event("tools_cache_invalidated", server=server_name)
+        self._tools_cached_at = 0.0
+        self._start_tools_refresh(force=True)
+
+    def _start_tools_refresh(self, force: bool = False) -> asyncio.Task:
+        """Start a catalogue refresh unless one is already running (single-flight)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._discover_all_servers(force))
+        return self._refresh_task
+
+    async def _refresh_tools(self):
+        """Wait for the shared refresh without letting a cancelled caller cancel it."""
+        await asyncio.shield(self._start_tools_refresh())
+
+    async def _discover_all_servers(self, force: bool = False):
+        """
+        Fetch tools from all enabled servers concurrently and rebuild the index.
+
+        In shared-state mode a routine refresh only runs on the worker holding the
+        discovery lease; the others receive its result through the store and back off
+        until the lease would have expired. A worker without any catalogue, or one told
+        that a tool list changed, always refreshes.
+
+        Args:
+            force: Refresh even if another worker holds the discovery lease
+        """
+        store = self._catalogue_store
+        if store is not None and self._all_tools is not None and not force:
+            if not await asyncio.to_thread(store.try_acquire_lease, "tool_discovery", self._worker_id, self._discovery_lease_ttl):
+                self._discovery_backoff_until = time.monotonic() + self._discovery_lease_ttl
+                return
+
+        try:
+            server_names = list(self._server_config)
+            results = await asyncio.gather(*(self._discover_server_tools(server_name) for server_name in server_names))
+
+            discovered = {}
+            for server_name, server_tools in zip(server_names, results):
+                # Failed servers keep their last known tools
+                if server_tools is not None:
+                    self._server_tools[server_name] = server_tools
+                    discovered[server_name] = [tool.model_dump() for tool in server_tools]
+
+            if store is not None and discovered:
+                await asyncio.to_thread(store.save, discovered)
+        finally:
+            if store is not None:
+                await asyncio.to_thread(store.release_lease, "tool_discovery", self._worker_id)
+
+        self._rebuild_tool_index()
+        self._tools_cached_at = time.monotonic()
+        tracer.current_span().add_event("tools_discovered", tools=len(self._all_tools), servers=len(server_names))
+
+    async def _sync_shared_catalogue(self):
+        """Adopt the stored catalogue if another worker has saved it since the last check."""
+        changed = await asyncio.to_thread(self._catalogue_store.load_if_changed)
+        if not changed:
+            return
+
+        stored = {server_name: entry for server_name, entry in changed.items() if server_name in self._server_config}
+        if not stored:
+            return
+
+        for server_name, (tool_dicts, _) in stored.items():
+            self._server_tools[server_name] = [DomainMcpTool.model_validate(tool_dict) for tool_dict in tool_dicts]
+        self._rebuild_tool_index()
+
+        # The catalogue is as old as its least recently discovered server
+        oldest_discovery = min(updated_at for _, updated_at in stored.values())
+        self._tools_cached_at = time.monotonic() - max(time.time() - oldest_discovery, 0.0)
+
+    def _rebuild_tool_index(self):
+        """Rebuild the aggregated catalogue and lookup indexes from the per-server tools."""
+        all_tools = [tool for server_name in self._server_config for tool in self._server_tools.get(server_name, [])]
+        self._tool_index = {(tool.server, tool.name): tool for tool in all_tools}
+        self._tools_by_name = {}
+        for tool in all_tools:
+            self._tools_by_name.setdefault(tool.name, []).append(tool)
+
+        self._all_tools = all_tools
+        LlmOpenaiUtil.clear_tool_schema_cache()
+
+    async def _discover_server_tools(self, server_name: str) -> Optional[List[DomainMcpTool]]:
+        """
+        Discover tools from one server within its discovery timeout.
+
+        Args:
+            server_name: Name of the server to query
+
+        Returns:
+            List of tools, or None if the server could not be reached
+        """
+        server_config = self._server_config[server_name]
+        try:
+            async with asyncio.timeout(server_config.get("discovery_timeout", 5.0)):
+                # A newly created client has just fetched its tools while connecting
+                refresh = server_name in self._mcp_clients
+                client = await self._get_or_create_client(server_name)
+                if not client:
                     print(f"Failed to connect to {server_name} server")
+                    return None
 
-            except Exception as e:
-                print(f"Error discovering tools from {server_name} server: {e}")
+                server_tools = await client.discover_tools(refresh=refresh)
 
-        print(f"Total tools discovered: {len(all_tools)} from {len(self._server_config)} servers")
-        return all_tools
+            # Convert to DomainMcpTool objects with server metadata using boundary model
+            mcp_tools = [DomainMcpTool.from_dict(tool_item, server=server_name, server_url=server_config["url"], server_description=server_config.get("description", "")) for tool_item in server_tools]
+            tracer.current_span().add_event("server_tools_discovered", server=server_name, tools=len(mcp_tools))
+            return mcp_tools
+
+        except Exception as e:
+            print(f"Error discovering tools from {server_name} server: {e}")
+            return None
 
     async def _get_or_create_client(self, server_name: str):
-        """Get existing client or create new one for the specified server."""
-        if server_name not in self._mcp_clients:
-            self._mcp_clients[server_name] = await self._create_mcp_client(server_name)
+        """Get existing client or create new one for the specified server.
+
+        Creation is serialized per server so concurrent callers share one client (and
+        its session pool). Failed creations are not cached, so the next call retries.
+        """
+        if server_name in self._mcp_clients:
+            return self._mcp_clients[server_name]
+
+        lock = self._client_locks.setdefault(server_name, asyncio.Lock())
+        async with lock:
+            if server_name not in self._mcp_clients:
+                client = await self._create_mcp_client(server_name)
+                if client is None:
+                    return None
+                self._mcp_clients[server_name] = client
         return self._mcp_clients[server_name]
 
     async def _create_mcp_client(self, server_name: str) -> SingleServerMCPClient:
@@ -88,62 +254,161 @@ class _MCPClient(ClosableService):
             server_url = server_config["url"]
 
             # Create client for the specified server
-            client = SingleServerMCPClient(server_name, server_url)
+            client = SingleServerMCPClient(server_name, server_url, server_config, on_tools_changed=self.invalidate_tools_cache)
 
             if await client.connect():
                 return client
             else:
+                await client.disconnect()
                 return None
 
         except Exception as e:
             print(f"Failed to create MCP client for {server_name}: {e}")
             return None
 
-    async def execute_tools_parallel(self, tool_execution_data: List[DomainToolExecutionRequest]) -> List[ApiChatMessage]:
+    async def execute_tool(self, tool_data: DomainToolExecutionRequest, deadline: Optional[float] = None) -> ApiChatMessage:
         """
-        Execute multiple tools in parallel and return ChatMessage objects.
+        Execute a single tool call and return the result as ChatMessage.
+
+        Results of tools listed in the server's `tool_cache` are served from the tool
+        result cache (when enabled); a call to any other tool drops the server's cached
+        results. Failures, including tool results flagged as errors and calls to tools
+        without a server (names the model made up), are reported as tool messages with
+        an error payload instead of raising.
 
         Args:
-            tool_execution_data: List of DomainToolExecutionRequest objects with tool execution details
+            tool_data: DomainToolExecutionRequest with tool execution details
+            deadline: Request deadline (`time.monotonic()` value); a call still running
+                then is cancelled and reported with `"deadline_exceeded": true`
 
         Returns:
-            List of ApiChatMessage objects with role='tool'
+            ApiChatMessage with role='tool'
         """
+        if tool_data.server is None:
+            return ApiChatMessage(
+                role="tool",
+                content=json.dumps({"error": f"Unknown tool '{tool_data.name}': it is not one of the tools offered"}),
+                tool_call_id=tool_data.id,
+                name=tool_data.name,
+            )
 
-        async def execute_single_tool(tool_data: DomainToolExecutionRequest) -> ApiChatMessage:
-            """Execute a single tool call and return the result as ChatMessage."""
+        try:
+            async with asyncio.timeout(None if deadline is None else deadline - time.monotonic()):
+                tool_result = await self._run_tool(tool_data)
+
+            return ApiChatMessage(
+                role="tool",
+                content=json.dumps(tool_result),
+                tool_call_id=tool_data.id,
+                name=tool_data.name,
+            )
+        except TimeoutError:
+            return ApiChatMessage(
+                role="tool",
+                content=json.dumps({"error": "Tool call cancelled: request deadline exceeded", "deadline_exceeded": True}),
+                tool_call_id=tool_data.id,
+                name=tool_data.name,
+            )
+        except Exception as e:
+            error_message = f"Tool execution failed: {str(e)}"
+            print(f"Error executing tool {tool_data.name}: {e}")
+            return ApiChatMessage(
+                role="tool",
+                content=json.dumps({"error": error_message}),
+                tool_call_id=tool_data.id,
+                name=tool_data.name,
+            )
+
+    async def _run_tool(self, tool_data: DomainToolExecutionRequest) -> Any:
+        """Run a tool call through the tool result cache if the tool is idempotent."""
+        tool_name = tool_data.name
+        # Use the typed method to handle both string and dict arguments
+        arguments = tool_data.get_parsed_arguments()
+
+        server_name = tool_data.server
+        ttl = self.get_tool_cache_ttl(server_name, tool_name)
+        if not self.tool_result_cache_repo.enabled:
+            return await self._call_tool(server_name, tool_name, arguments)
+        if ttl is None:
+            try:
+                return await self._call_tool(server_name, tool_name, arguments)
+            finally:
+                # Even a failed write may have changed the server's state
+                await self.tool_result_cache_repo.invalidate_server(server_name)
+
+        called = False
+
+        async def call_tool():
+            nonlocal called
+            called = True
+            return await self._call_tool(server_name, tool_name, arguments)
+
+        cache_key = self.tool_result_cache_repo.build_key(server_name, tool_name, arguments)
+        tool_result = await self.tool_result_cache_repo.get_or_compute(cache_key, server_name, ttl, call_tool)
+        if not called:
+            MCP_TOOL_CALLS_SAVED_TOTAL.inc(server_name, "cached")
+        return tool_result
+
+    async def _call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool on its server, recording the call duration."""
+        client = await self._get_or_create_client(server_name)
+        if not client:
+            raise RuntimeError(f"Server '{server_name}' not available for tool '{tool_name}'")
+
+        started = time.perf_counter()
+        with tracer.span("tool.call", server=server_name, tool=tool_name):
             try:
-                tool_name = tool_data.name
-                # Use the typed method to handle both string and dict arguments
-                arguments = tool_data.get_parsed_arguments()
-
-                server_name = tool_data.server
-                client = await self._get_or_create_client(server_name)
-                if not client:
-                    raise RuntimeError(f"Server '{server_name}' not available for tool '{tool_name}'")
                 tool_result = await client.call_tool(tool_name, arguments)
+            except Exception:
+                MCP_TOOL_CALL_SECONDS.observe(time.perf_counter() - started, server_name, "error")
+                raise
+        MCP_TOOL_CALL_SECONDS.observe(time.perf_counter() - started, server_name, "ok")
+        return tool_result
 
-                return ApiChatMessage(
-                    role="tool",
-                    content=json.dumps(tool_result),
-                    tool_call_id=tool_data.id,
-                    name=tool_name,
-                )
-            except Exception as e:
-                error_message = f"Tool execution failed: {str(e)}"
-                print(f"Error executing tool {tool_data.name}: {e}")
-                return ApiChatMessage(
-                    role="tool",
-                    content=json.dumps({"error": error_message}),
-                    tool_call_id=tool_data.id,
-                    name=tool_data.name,
-                )
+    def get_tool_cache_ttl(self, server_name: Optional[str], tool_name: str) -> Optional[float]:
+        """
+        Get the result TTL of an idempotent tool from the server's `tool_cache` setting.
 
+        Returns:
+            Seconds its results are reused (0 = deduplicate within a turn only), or None
+            if the tool is not declared idempotent
+        """
+        server_config = self._server_config.get(server_name) or {}
+        ttl = (server_config.get("tool_cache") or {}).get(tool_name)
+        return None if ttl is None else float(ttl)
+
+    async def execute_tools_parallel(self, tool_execution_data: List[DomainToolExecutionRequest], deadline: Optional[float] = None) -> List[ApiChatMessage]:
+        """
+        Execute multiple tools in parallel and return ChatMessage objects.
+
+        Identical calls (same server, tool and arguments) to idempotent tools run once;
+        the duplicates receive a copy of the result under their own tool call ID. Each
+        server's `max_concurrency` and `max_queue` bound how many of the calls run or
+        wait at once; calls still running at the deadline are cancelled, so the results
+        may be partial.
+
+        Args:
+            tool_execution_data: List of DomainToolExecutionRequest objects with tool execution details
+            deadline: Request deadline (`time.monotonic()` value), see execute_tool()
+
+        Returns:
+            List of ApiChatMessage objects with role='tool'
+        """
         if not tool_execution_data:
             return []
 
-        # Execute all tool calls in parallel
-        tool_execution_tasks = [execute_single_tool(tool_data) for tool_data in tool_execution_data]
+        # Execute all tool calls in parallel, each distinct idempotent call once
+        tool_execution_tasks = []
+        first_calls: Dict[str, asyncio.Future] = {}
+        for tool_data in tool_execution_data:
+            dedupe_key = self._get_dedupe_key(tool_data)
+            if dedupe_key is None:
+                tool_execution_tasks.append(self.execute_tool(tool_data, deadline))
+            elif dedupe_key in first_calls:
+                tool_execution_tasks.append(self._reuse_tool_result(first_calls[dedupe_key], tool_data))
+            else:
+                first_calls[dedupe_key] = asyncio.ensure_future(self.execute_tool(tool_data, deadline))
+                tool_execution_tasks.append(first_calls[dedupe_key])
 
         tool_messages = await asyncio.gather(*tool_execution_tasks, return_exceptions=True)
 
@@ -165,6 +430,23 @@ class _MCPClient(ClosableService):
 
         return result_messages
 
+    def _get_dedupe_key(self, tool_data: DomainToolExecutionRequest) -> Optional[str]:
+        """Get the key identifying a call to an idempotent tool (None if the call must always run)."""
+        if self.get_tool_cache_ttl(tool_data.server, tool_data.name) is None:
+            return None
+        try:
+            return self.tool_result_cache_repo.build_key(tool_data.server, tool_data.name, tool_data.get_parsed_arguments())
+        except (ValueError, TypeError):
+            # Invalid arguments are reported by execute_tool
+            return None
+
+    @staticmethod
+    async def _reuse_tool_result(first_call: "asyncio.Future[ApiChatMessage]", tool_data: DomainToolExecutionRequest) -> ApiChatMessage:
+        """Answer a duplicate call with the result of the identical call in the same turn."""
+        tool_message = await asyncio.shield(first_call)
+        MCP_TOOL_CALLS_SAVED_TOTAL.inc(tool_data.server, "deduplicated")
+        return tool_message.model_copy(update={"tool_call_id": tool_data.id})
+
     async def connect(self) -> Dict[str, bool]:
         """Connect to all MCP servers in parallel.
 
@@ -203,12 +485,22 @@ class _MCPClient(ClosableService):
         """Disconnect from all MCP servers."""
         for server_name, client in self._mcp_clients.items():
             try:
-                client.disconnect()
+                await client.disconnect()
             except Exception as e:
                 print(f"Error disconnecting from {server_name}: {e}")
 
         self._mcp_clients.clear()
 
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._server_tools.clear()
+        self._all_tools = None
+        self._tool_index = {}
+        self._tools_by_name = {}
+
+        if self._catalogue_store is not None:
+            self._catalogue_store.close()
+
     async def test_connection(self) -> bool:
         """
         Test multi-MCP server connections.
@@ -225,6 +517,39 @@ class _MCPClient(ClosableService):
             print(f"Test connection failed: {e}")
             return False
 
+    async def ping_servers(self, timeout: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Ping every enabled MCP server in parallel (a cheap check that lists no tools).
+
+        Servers with a client are pinged over its session pool; the others over a
+        one-off session, so probing a server never creates a client or discovers tools.
+
+        Args:
+            timeout: Seconds to wait for each server
+
+        Returns:
+            Mapping of server name to {"healthy", "latency_ms", and "error" on failure}
+        """
+
+        async def ping(server_name: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                async with asyncio.timeout(timeout):
+                    client = self._mcp_clients.get(server_name)
+                    if client is not None:
+                        await client.ping()
+                    else:
+                        await SingleServerMCPClient.ping_url(self._server_config[server_name]["url"], timeout)
+                result = {"healthy": True}
+            except Exception as e:
+                result = {"healthy": False, "error": str(e) or type(e).__name__}
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+
+        server_names = list(self._server_config)
+        results = await asyncio.gather(*(ping(server_name) for server_name in server_names))
+        return dict(zip(server_names, results))
+
     def get_server_config(self) -> Dict[str, Any]:
         """Get the current server configuration."""
         return self._server_config.copy()
@@ -238,6 +563,10 @@ class _MCPClient(ClosableService):
         """Get list of enabled server names."""
         return list(self._server_config.keys())
 
+    def get_pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get MCP session pool statistics per connected server."""
+        return {server_name: client.get_pool_stats() for server_name, client in self._mcp_clients.items()}
+
     async def get_server_health(self) -> Dict[str, bool]:
         """Get health status of all enabled servers."""
         health_status = {}
@@ -1,5 +1,6 @@
-"""MCP configuration management."""
+"""MCP and shared-state configuration management."""
 
 from github_mingzilla.llm_mcp.config.mcp_servers import MCP_SERVERS, load_enabled_mcp_servers, load_mcp_server_config, validate_server_config
+from github_mingzilla.llm_mcp.config.shared_state import get_shared_state_path, is_shared_state_enabled
 
-__all__ = ["MCP_SERVERS", "load_enabled_mcp_servers", "load_mcp_server_config", "validate_server_config"]
+__all__ = ["MCP_SERVERS", "load_enabled_mcp_servers", "load_mcp_server_config", "validate_server_config", "get_shared_state_path", "is_shared_state_enabled"]
@@ -3,6 +3,22 @@ MCP Server Configuration
 
 This file defines all available MCP servers and their configuration.
 Adding a new MCP server requires only adding an entry here.
+
+Optional per-server session pool settings:
+- pool_size: Maximum idle sessions kept open (default 4)
+- pool_idle_ttl: Seconds an idle session is kept before it is closed (default 60)
+- max_concurrency: Maximum in-flight requests against the server (default 8)
+- max_queue: Requests allowed to wait for a free slot; more are rejected (default 32)
+- queue_timeout: Seconds a request waits for a free slot before it is rejected (default 10)
+- connect_timeout: Seconds to open and initialize a new session (default 5)
+- call_timeout: Seconds to wait for a tool call result once a slot and session are held
+  (default 10); the wait for them is bounded by queue_timeout and connect_timeout
+- discovery_timeout: Seconds to wait for the server's tool list (default 5)
+
+Optional per-server tool result caching:
+- tool_cache: Mapping of idempotent tool name to the seconds its results are reused
+  (0 = only deduplicate identical calls within one LLM turn). Tools not listed always
+  run, and a successful call to one of them drops the server's cached results.
 """
 
 import json
@@ -17,6 +33,16 @@ MCP_SERVERS = {
         "tools": ["create_api_config", "get_api_config", "get_all_api_configs", "update_api_config", "delete_api_config"],
         "enabled": True,
         "port": 8000,
+        "pool_size": 4,
+        "pool_idle_ttl": 60.0,
+        # Each call holds a database connection on the server; keep bursts within its DB pool
+        "max_concurrency": 4,
+        "max_queue": 16,
+        "queue_timeout": 10.0,
+        "connect_timeout": 5.0,
+        "call_timeout": 10.0,
+        "discovery_timeout": 5.0,
+        "tool_cache": {"get_api_config": 30.0, "get_all_api_configs": 10.0},
     },
     "calculator": {
         "url": "http://localhost:8010/mcp/",
@@ -24,6 +50,15 @@ MCP_SERVERS = {
         "tools": ["add", "multiply"],
         "enabled": True,
         "port": 8010,
+        "pool_size": 4,
+        "pool_idle_ttl": 60.0,
+        "max_concurrency": 8,
+        "max_queue": 32,
+        "queue_timeout": 10.0,
+        "connect_timeout": 5.0,
+        "call_timeout": 10.0,
+        "discovery_timeout": 5.0,
+        "tool_cache": {"add": 3600.0, "multiply": 3600.0},
     },
 }
 
@@ -162,4 +197,19 @@ def validate_server_config(config: Dict[str, Any]) -> bool:
         if not isinstance(enabled, bool):
             raise ValueError(f"Server '{server_name}' enabled flag must be boolean")
 
+        # Validate session pool and discovery settings (if provided)
+        for field in ["pool_size", "pool_idle_ttl", "max_concurrency", "max_queue", "queue_timeout", "connect_timeout", "call_timeout", "discovery_timeout"]:
+            value = server_config.get(field)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                raise ValueError(f"Server '{server_name}' {field} must be a positive number")
+
+        # Validate tool result cache TTLs (if provided)
+        tool_cache = server_config.get("tool_cache")
+        if tool_cache is not None:
+            if not isinstance(tool_cache, dict):
+                raise ValueError(f"Server '{server_name}' tool_cache must be a mapping of tool name to TTL seconds")
+            for tool_name, ttl in tool_cache.items():
+                if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl < 0:
+                    raise ValueError(f"Server '{server_name}' tool_cache TTL of '{tool_name}' must be a non-negative number")
+
     return True
@@ -0,0 +1,37 @@
+"""
+Shared-state configuration for running several gateway workers.
+
+Setting SHARED_STATE_DIR switches the gateway into shared-state mode: state that would
+otherwise diverge between worker processes is kept in SQLite files in that directory.
+- chat_history.db: Chat sessions (unless CHAT_HISTORY_BACKEND is set explicitly)
+- tool_catalogue.db: Discovered MCP tools, with a lease so only one worker rediscovers
+  (workers that miss the lease wait for MCP_DISCOVERY_LEASE_TTL before retrying)
+- completion_cache.db: Completion cache disk tier (unless COMPLETION_CACHE_DISK_PATH is set)
+- tool_result_cache.db: Tool result cache invalidation generations
+"""
+
+import os
+from typing import Optional
+
+
+def is_shared_state_enabled() -> bool:
+    """Check whether shared-state mode is enabled."""
+    return bool(os.getenv("SHARED_STATE_DIR"))
+
+
+def get_shared_state_path(filename: str) -> Optional[str]:
+    """
+    Get the path of a shared-state database file.
+
+    Args:
+        filename: Database file name within SHARED_STATE_DIR
+
+    Returns:
+        Path to the file, or None if shared-state mode is disabled
+    """
+    directory = os.getenv("SHARED_STATE_DIR")
+    if not directory:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
@@ -0,0 +1,53 @@
+"""
+Multi-worker launcher for the LLM-MCP gateway.
+
+Runs the gateway in shared-state mode across several uvicorn worker processes. Before
+the workers are started, the launcher discovers the MCP tool catalogue once and stores
+it in SHARED_STATE_DIR, so every worker starts with a warm catalogue instead of each
+one contacting all MCP servers.
+
+Usage:
+    python -m github_mingzilla.llm_mcp.launcher --workers 4 --port 9000 --state-dir .gateway_state
+"""
+
+import argparse
+import asyncio
+import os
+
+
+async def preload_shared_state() -> None:
+    """Discover the tool catalogue into the shared store, then release all connections."""
+    # Imported here so the singletons see SHARED_STATE_DIR set by main()
+    from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
+    from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+
+    try:
+        tools = await mcp_client.discover_tools()
+        print(f"Preloaded {len(tools)} tools into {os.environ['SHARED_STATE_DIR']}")
+    finally:
+        await singleton_manager.shutdown_all()
+
+
+def main() -> None:
+    """Parse arguments, preload shared state and start the workers."""
+    parser = argparse.ArgumentParser(description="Run the LLM-MCP gateway with multiple workers sharing state")
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address (default 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=9000, help="Bind port (default 9000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--state-dir", default=os.getenv("SHARED_STATE_DIR", ".gateway_state"), help="Directory for the shared SQLite state (default: SHARED_STATE_DIR or .gateway_state)")
+    parser.add_argument("--skip-preload", action="store_true", help="Start workers without discovering tools first")
+    args = parser.parse_args()
+
+    # Workers inherit the environment, so they all join the same shared state
+    os.environ["SHARED_STATE_DIR"] = os.path.abspath(args.state_dir)
+
+    if not args.skip_preload:
+        asyncio.run(preload_shared_state())
+
+    import uvicorn
+
+    uvicorn.run("github_mingzilla.llm_mcp.main:app", host=args.host, port=args.port, workers=args.workers, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
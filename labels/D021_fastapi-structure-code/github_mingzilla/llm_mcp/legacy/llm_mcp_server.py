@@ -12,6 +12,7 @@ from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage, ApiChatRequ
 from github_mingzilla.llm_mcp.clients.llm_client import _LLMClient as LLMClient
 from github_mingzilla.llm_mcp.clients.mcp_client import _MCPClient as MCPClient
 from github_mingzilla.llm_mcp.repositories.chat_history_repository import _ChatHistoryRepository as ChatHistoryRepository
+from github_mingzilla.llm_mcp.util.tracing import tracer
 
 
 @asynccontextmanager
@@ -242,35 +243,32 @@ async def _chat_stream_no_tools(chat_request: ApiChatRequest):
     import json
 
     session_id = chat_request.session_id or str(uuid.uuid4())
-
-    try:
-        user_message = ApiChatMessage(role="user", content=chat_request.message)
-        conversation = chat_history_repo.save_message_and_get_history(session_id, user_message)
-        model = chat_request.model or "tinyllama"
-
-        print(f"🔄 Starting stream for session {session_id[:8]}... (model: {model})")
-        chunk_count = 0
-
-        async for raw_chunk in llm_client.raw_stream_openai_format(conversation, model):
-            chunk_count += 1
-            print(f"📤 Chunk {chunk_count} sent to client (session: {session_id[:8]}...)")
-            yield {
-                "event": "chunk",
-                "data": raw_chunk,  # Forward raw JSON string
-            }
-
-        print(f"✅ Stream completed normally - {chunk_count} chunks sent (session: {session_id[:8]}...)")
-
-    except asyncio.CancelledError:
-        print(f"🛑 CLIENT DISCONNECTED - Stream cancelled after {chunk_count} chunks (session: {session_id[:8]}...)")
-        print("   This proves the server detected client disconnection and stopped processing!")
-        raise  # Re-raise to properly handle the cancellation
-    except NotImplementedError as e:
-        print(f"❌ NotImplementedError in stream (session: {session_id[:8]}...): {str(e)}")
-        yield {"event": "error", "data": json.dumps({"error": str(e)})}
-    except Exception as e:
-        print(f"❌ Stream error (session: {session_id[:8]}...): {str(e)}")
-        yield {"event": "error", "data": json.dumps({"error": f"Proxy stream error: {str(e)}", "session_id": session_id})}
+    model = chat_request.model or "tinyllama"
+    chunk_count = 0
+
+    with tracer.start_trace("legacy.chat.stream", session_id=session_id[:8], model=model) as span:
+        try:
+            user_message = ApiChatMessage(role="user", content=chat_request.message)
+            conversation = chat_history_repo.save_message_and_get_history(session_id, user_message)
+
+            async for raw_chunk in llm_client.raw_stream_openai_format(conversation, model):
+                chunk_count += 1
+                yield {
+                    "event": "chunk",
+                    "data": raw_chunk,  # Forward raw JSON string
+                }
+
+        except asyncio.CancelledError:
+            span.add_event("client_disconnected")
+            raise  # Re-raise to properly handle the cancellation
+        except NotImplementedError as e:
+            print(f"❌ NotImplementedError in stream (session: {session_id[:8]}...): {str(e)}")
+            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+        except Exception as e:
+            print(f"❌ Stream error (session: {session_id[:8]}...): {str(e)}")
+            yield {"event": "error", "data": json.dumps({"error": f"Proxy stream error: {str(e)}", "session_id": session_id})}
+        finally:
+            span.set_attribute("chunks_sent", chunk_count)
 
 
 @app.get("/health")
@@ -1,12 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from github_mingzilla.llm_mcp.models import ApiChatMessage, DomainMcpTool, LlmResponse
 
 
 class AbstractLlmClient(ABC):
     @abstractmethod
-    async def chat_completion(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]]) -> LlmResponse:
+    async def chat_completion(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]], openai_messages: Optional[List[Dict[str, Any]]] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> LlmResponse:
         pass
 
     @abstractmethod
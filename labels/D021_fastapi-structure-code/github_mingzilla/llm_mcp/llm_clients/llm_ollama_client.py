@@ -1,11 +1,13 @@
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, SystemPromptPart, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
+from github_mingzilla.llm_mcp.clients.http_client import http_client
 from github_mingzilla.llm_mcp.llm_clients.abstract_llm_client import AbstractLlmClient
 from github_mingzilla.llm_mcp.models import ApiChatMessage, DomainMcpTool, LlmResponse
 
@@ -15,22 +17,37 @@ load_dotenv()
 class LLMOllamaClient(AbstractLlmClient):
     """PydanticAI-based Ollama client wrapper using OpenAI-compatible API."""
 
-    def __init__(self):
-        """Initialize Ollama client with local server configuration."""
+    def __init__(self, base_url: Optional[str] = None):
+        """
+        Initialize Ollama client with local server configuration.
+
+        Args:
+            base_url: Ollama server URL (defaults to OLLAMA_BASE_URL)
+        """
         # Ollama OpenAI-compatible configuration
-        base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.base_url = base_url.rstrip("/") + "/v1"
         self.default_model = os.getenv("OLLAMA_MODEL", "qwen2.5:3b")
 
-        # Create OpenAI-compatible provider pointing to Ollama
+        # Create OpenAI-compatible provider pointing to Ollama, on the shared pooled transport
         self.provider = OpenAIProvider(
             base_url=self.base_url,
             api_key="ollama",  # Ollama doesn't require real API key but PydanticAI expects one
+            http_client=http_client.get_client(self.base_url),
         )
 
-        self.ollama_model = OpenAIModel(model_name=self.default_model, provider=self.provider)
+        # Agents are stateless between runs, so one per model is reused across requests
+        self._agents: Dict[str, Agent] = {}
+
+    def _get_agent(self, model_name: str) -> Agent:
+        """Get the cached agent for a model, creating it (and its model) on first use."""
+        agent = self._agents.get(model_name)
+        if agent is None:
+            agent = Agent(model=OpenAIModel(model_name=model_name, provider=self.provider))
+            self._agents[model_name] = agent
+        return agent
 
-    async def chat_completion(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]]) -> LlmResponse:
+    async def chat_completion(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]], openai_messages: Optional[List[Dict[str, Any]]] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> LlmResponse:
         """
         Generate chat completion using PydanticAI + Ollama.
 
@@ -38,19 +55,19 @@ class LLMOllamaClient(AbstractLlmClient):
             messages: List of chat messages
             model: Optional model override
             mcp_tools: Optional mcp tools
+            openai_messages: Unused; PydanticAI builds its own messages from `messages`
+            temperature: Optional sampling temperature (model default if omitted)
+            max_tokens: Optional completion token limit
 
         Returns:
             Generic LlmResponse object (provider-agnostic)
         """
         try:
-            current_model = model if model else self.default_model
-            if current_model != self.ollama_model.model_name:
-                self.ollama_model = OpenAIModel(model_name=current_model, provider=self.provider)
-
-            agent = Agent(model=self.ollama_model)
-            prompt = self._messages_to_pydantic_format(messages)
-            result = await agent.run(prompt)
-            content = str(result.data) if result.data else ""
+            agent = self._get_agent(model or self.default_model)
+            prompt, message_history = self._messages_to_pydantic_format(messages)
+            model_settings = {key: value for key, value in (("temperature", temperature), ("max_tokens", max_tokens)) if value is not None} or None
+            result = await agent.run(prompt, message_history=message_history, model_settings=model_settings)
+            content = str(result.output) if result.output else ""
 
             return LlmResponse(
                 content=content,
@@ -63,19 +80,46 @@ class LLMOllamaClient(AbstractLlmClient):
         except Exception as e:
             raise RuntimeError(f"PydanticAI Ollama error: {str(e)}")
 
-    def _messages_to_pydantic_format(self, messages: List[ApiChatMessage]) -> str:
+    @staticmethod
+    def _messages_to_pydantic_format(messages: List[ApiChatMessage]) -> Tuple[Optional[str], List[ModelMessage]]:
         """
-        Convert ChatMessage objects to prompt format for PydanticAI.
-        PydanticAI typically uses a single prompt string, so we'll combine messages.
+        Convert ChatMessage objects to PydanticAI's role-structured messages.
+
+        Keeping roles (instead of one flattened prompt) lets Ollama reuse the KV cache
+        for the unchanged conversation prefix.
+
+        Returns:
+            Tuple of the trailing user prompt (None if the last message is not from the
+            user) and the message history before it
         """
-        prompt_parts = []
+        prompt = None
+        if messages and messages[-1].role == "user":
+            prompt = messages[-1].content or ""
+            messages = messages[:-1]
 
+        history: List[ModelMessage] = []
+        request_parts: list = []
         for msg in messages:
-            role_prefix = f"{msg.role.upper()}: " if msg.role != "user" else ""
-            content = msg.content or ""
-            prompt_parts.append(f"{role_prefix}{content}")
-
-        return "\n\n".join(prompt_parts)
+            if msg.role == "assistant":
+                if request_parts:
+                    history.append(ModelRequest(parts=request_parts))
+                    request_parts = []
+                response_parts: list = [TextPart(content=msg.content)] if msg.content else []
+                for tool_call in msg.tool_calls or []:
+                    function = tool_call.get("function", {})
+                    response_parts.append(ToolCallPart(tool_name=function.get("name", ""), args=function.get("arguments"), tool_call_id=tool_call.get("id", "")))
+                history.append(ModelResponse(parts=response_parts))
+            elif msg.role == "system":
+                request_parts.append(SystemPromptPart(content=msg.content or ""))
+            elif msg.role == "tool":
+                request_parts.append(ToolReturnPart(tool_name=msg.name or "", content=msg.content or "", tool_call_id=msg.tool_call_id or ""))
+            else:
+                request_parts.append(UserPromptPart(content=msg.content or ""))
+
+        if request_parts:
+            history.append(ModelRequest(parts=request_parts))
+
+        return prompt, history
 
     async def test_connection(self) -> bool:
         """
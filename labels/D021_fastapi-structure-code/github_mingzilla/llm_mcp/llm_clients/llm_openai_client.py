@@ -1,9 +1,10 @@
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 
+from github_mingzilla.llm_mcp.clients.http_client import http_client
 from github_mingzilla.llm_mcp.llm_clients.abstract_llm_client import AbstractLlmClient
 from github_mingzilla.llm_mcp.models import ApiChatMessage, DomainMcpTool, LlmResponse, OpenAIMessage
 from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
@@ -20,10 +21,12 @@ class LLMOpenAIClient(AbstractLlmClient):
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
 
-        self.client = AsyncOpenAI(api_key=api_key)
+        # Use the shared pooled transport instead of the SDK's own connection pool
+        base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client.get_client(base_url))
         self.default_model = os.getenv("LLM_MODEL", "gpt-4.1-nano")
 
-    async def chat_completion(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]]) -> LlmResponse:
+    async def chat_completion(self, messages: List[ApiChatMessage], model: Optional[str], mcp_tools: Optional[List[DomainMcpTool]], openai_messages: Optional[List[Dict[str, Any]]] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> LlmResponse:
         """
         Generate chat completion using OpenAI API.
 
@@ -31,20 +34,26 @@ class LLMOpenAIClient(AbstractLlmClient):
             messages: List of chat messages
             model: Optional model override
             mcp_tools: Optional list of DomainMcpTool objects
+            openai_messages: Optional pre-encoded `messages` (skips conversion)
+            temperature: Optional sampling temperature (defaults to 0.7)
+            max_tokens: Optional completion token limit
 
         Returns:
             Generic LlmResponse object (provider-agnostic)
         """
         model = model or self.default_model
-        openai_messages = LlmOpenaiUtil.chat_messages_to_openai_format(messages)
+        if openai_messages is None:
+            openai_messages = LlmOpenaiUtil.chat_messages_to_openai_format(messages)
 
         try:
             completion_kwargs = {
                 "model": model,
                 "messages": openai_messages,
                 "stream": False,
-                "temperature": 0.7,
+                "temperature": 0.7 if temperature is None else temperature,
             }
+            if max_tokens is not None:
+                completion_kwargs["max_tokens"] = max_tokens
 
             # Add tools if provided
             if mcp_tools:
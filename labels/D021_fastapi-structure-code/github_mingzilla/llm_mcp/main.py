@@ -18,10 +18,14 @@ from fastapi.staticfiles import StaticFiles
 
 from github_mingzilla.llm_mcp.routers.chat_router import chat_router
 from github_mingzilla.llm_mcp.routers.conversation_router import conversation_router
+from github_mingzilla.llm_mcp.routers.debug_router import debug_router
 from github_mingzilla.llm_mcp.routers.health_router import health_router
+from github_mingzilla.llm_mcp.routers.metrics_router import metrics_router
 from github_mingzilla.llm_mcp.routers.root_router import root_router
 from github_mingzilla.llm_mcp.routers.tool_router import tool_router
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.services.health_prober_service import health_prober_service
+from github_mingzilla.llm_mcp.services.warmup_service import warmup_service
 
 
 @asynccontextmanager
@@ -32,7 +36,16 @@ async def lifespan(app: FastAPI):
 
     print(f"Singleton manager initialized with {singleton_manager.get_registered_count()} registered services")
     print(f"Services with cleanup: {singleton_manager.get_closable_count()}")
-    print("Services will be initialized on first use (lazy loading)")
+    if warmup_service.enabled:
+        warmup_service.start()
+        if warmup_service.blocking:
+            print("Warming up MCP servers, HTTP pools and LLM models before accepting requests...")
+            await warmup_service.wait()
+        else:
+            print("Warming up in the background; /health/ready reports ready when finished")
+    else:
+        print("Services will be initialized on first use (lazy loading)")
+    health_prober_service.start()
 
     yield
 
@@ -67,6 +80,8 @@ app.include_router(health_router)
 app.include_router(chat_router)
 app.include_router(tool_router)
 app.include_router(conversation_router)
+app.include_router(metrics_router)
+app.include_router(debug_router)
 
 # Mount static files (placed after all API routes to ensure API takes precedence)
 app.mount("/app", StaticFiles(directory="static", html=True), name="app")
@@ -0,0 +1,282 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from mcp.client.session import ClientSession, MessageHandlerFnT
+from mcp.client.streamable_http import streamablehttp_client
+
+
+class McpServerBusyError(RuntimeError):
+    """Raised when a request cannot get a concurrency slot on an MCP server."""
+
+
+class _PooledMcpSession:
+    """
+    An initialized MCP session owned by a dedicated task.
+
+    streamablehttp_client and ClientSession are anyio contexts that must be entered and
+    exited by the same task, so each pooled session lives in its own task and the pool
+    only hands out the ClientSession.
+    """
+
+    def __init__(self, server_url: str, headers: Dict[str, str], message_handler: Optional[MessageHandlerFnT] = None):
+        self.server_url = server_url
+        self.headers = headers
+        self.message_handler = message_handler
+        self.session: Optional[ClientSession] = None
+        self.last_used = 0.0
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def open(self, timeout: float) -> None:
+        """Start the owner task and wait until the session is initialized."""
+        self._task = asyncio.create_task(self._run())
+        try:
+            async with asyncio.timeout(timeout):
+                await self._ready.wait()
+        except BaseException:
+            self._task.cancel()
+            raise
+
+        if self.session is None:
+            raise RuntimeError(f"Failed to open MCP session to {self.server_url}: {self._error}")
+        self.last_used = time.monotonic()
+
+    async def _run(self) -> None:
+        """Own the transport and session contexts until asked to close."""
+        try:
+            async with streamablehttp_client(self.server_url, self.headers) as (read_stream, write_stream, _):
+                async with ClientSession(read_stream, write_stream, message_handler=self.message_handler) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def is_alive(self) -> bool:
+        """Check whether the session is initialized and its owner task still running."""
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    def close(self) -> Optional[asyncio.Task]:
+        """Ask the owner task to exit its contexts; returns the task to await, if any."""
+        self._closing.set()
+        return self._task
+
+
+async def ping_once(server_url: str, headers: Dict[str, str], timeout: float) -> None:
+    """
+    Ping a server over a one-off session that is closed afterwards.
+
+    Args:
+        server_url: MCP endpoint URL
+        headers: HTTP headers for the transport
+        timeout: Seconds to open the session and get the ping answered
+
+    Raises:
+        Exception: If the server cannot be reached or does not answer in time
+    """
+    pooled = _PooledMcpSession(server_url, headers)
+    try:
+        async with asyncio.timeout(timeout):
+            await pooled.open(timeout)
+            await pooled.session.send_ping()
+    finally:
+        task = pooled.close()
+        if task is not None and not task.done():
+            _, pending = await asyncio.wait({task}, timeout=timeout)
+            for task in pending:
+                task.cancel()
+
+
+class McpSessionPool:
+    """
+    Per-server pool of persistent, initialized MCP sessions.
+
+    Borrowing a pooled session skips the transport connect and `initialize()` handshake
+    that a temporary session pays on every call. Sessions idle longer than `idle_ttl` are
+    closed, sessions idle longer than `probe_interval` are pinged before reuse (and
+    transparently replaced if the ping fails), and `max_concurrency` bounds in-flight
+    requests against the server. Requests beyond that limit wait in a queue of at most
+    `max_queue` requests for up to `queue_timeout` seconds, and are rejected with
+    McpServerBusyError otherwise. Server notifications received on any pooled session
+    are passed to `message_handler`.
+    """
+
+    def __init__(
+        self,
+        server_name: str,
+        server_url: str,
+        headers: Dict[str, str],
+        pool_size: int = 4,
+        idle_ttl: float = 60.0,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+        probe_interval: float = 15.0,
+        connect_timeout: float = 5.0,
+        message_handler: Optional[MessageHandlerFnT] = None,
+    ):
+        self.server_name = server_name
+        self.server_url = server_url
+        self.headers = headers
+        self.pool_size = pool_size
+        self.idle_ttl = idle_ttl
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.probe_interval = probe_interval
+        self.connect_timeout = connect_timeout
+        self.message_handler = message_handler
+
+        self._idle: List[_PooledMcpSession] = []  # Most recently used last
+        self._closing_tasks: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_use = 0
+        self._queued = 0
+        self._closed = False
+        self._stats = {"created": 0, "reused": 0, "probe_failures": 0, "discarded": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "max_queue_depth": 0}
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[ClientSession]:
+        """
+        Borrow an initialized session for the duration of the context.
+
+        A session whose request raised (or was cancelled) is discarded rather than
+        returned to the pool, since its state is unknown.
+
+        Yields:
+            Initialized ClientSession
+
+        Raises:
+            McpServerBusyError: If the queue for a concurrency slot is full or the wait times out
+        """
+        if self._closed:
+            raise RuntimeError(f"MCP session pool for {self.server_name} is closed")
+
+        await self._acquire_slot()
+        try:
+            pooled = await self._acquire()
+            self._in_use += 1
+            try:
+                yield pooled.session
+            except BaseException:
+                self._discard(pooled)
+                raise
+            else:
+                self._release(pooled)
+            finally:
+                self._in_use -= 1
+        finally:
+            self._semaphore.release()
+
+    async def _acquire_slot(self) -> None:
+        """Take a concurrency slot, queueing (boundedly) while the server is at its limit."""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return
+
+        if self._queued >= self.max_queue:
+            self._stats["rejected_queue_full"] += 1
+            raise McpServerBusyError(f"MCP server {self.server_name} is busy: {self.max_queue} requests already queued")
+
+        self._queued += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self._stats["rejected_timeout"] += 1
+            raise McpServerBusyError(f"MCP server {self.server_name} is busy: no free slot within {self.queue_timeout:g}s") from None
+        finally:
+            self._queued -= 1
+
+    async def _acquire(self) -> _PooledMcpSession:
+        """Reuse the most recently used healthy session, or open a new one."""
+        now = time.monotonic()
+        while self._idle:
+            pooled = self._idle.pop()
+            idle_for = now - pooled.last_used
+
+            if not pooled.is_alive or idle_for > self.idle_ttl:
+                self._discard(pooled)
+                continue
+
+            if idle_for > self.probe_interval and not await self._probe(pooled):
+                self._stats["probe_failures"] += 1
+                self._discard(pooled)
+                continue
+
+            self._stats["reused"] += 1
+            return pooled
+
+        pooled = _PooledMcpSession(self.server_url, self.headers, self.message_handler)
+        await pooled.open(self.connect_timeout)
+        self._stats["created"] += 1
+        return pooled
+
+    async def _probe(self, pooled: _PooledMcpSession) -> bool:
+        """Ping a session that has been idle for a while."""
+        try:
+            async with asyncio.timeout(self.connect_timeout):
+                await pooled.session.send_ping()
+            return True
+        except Exception:
+            return False
+
+    def _release(self, pooled: _PooledMcpSession) -> None:
+        """Return a session to the pool, closing it if the pool is full or closed."""
+        now = time.monotonic()
+        pooled.last_used = now
+
+        # Oldest idle sessions sit at the front; drop the ones past their TTL
+        while self._idle and now - self._idle[0].last_used > self.idle_ttl:
+            self._discard(self._idle.pop(0))
+
+        if self._closed or not pooled.is_alive or len(self._idle) >= self.pool_size:
+            self._discard(pooled)
+        else:
+            self._idle.append(pooled)
+
+    def _discard(self, pooled: _PooledMcpSession) -> None:
+        """Close a session in the background without blocking the caller."""
+        self._stats["discarded"] += 1
+        task = pooled.close()
+        if task is not None and not task.done():
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+
+    async def close(self) -> None:
+        """Close all idle sessions and wait for their owner tasks to exit."""
+        self._closed = True
+        while self._idle:
+            self._discard(self._idle.pop())
+
+        if self._closing_tasks:
+            _, pending = await asyncio.wait(list(self._closing_tasks), timeout=self.connect_timeout)
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with pool occupancy and lifetime counters
+        """
+        return {
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "queued": self._queued,
+            "pool_size": self.pool_size,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            **self._stats,
+        }
@@ -1,92 +1,131 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from mcp.client.session import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
+from mcp import types
 
 from github_mingzilla.llm_mcp.boundary_models import McpToolDiscoveryItem, McpToolResponse, McpToolsListResponse
+from github_mingzilla.llm_mcp.mcp_clients.mcp_session_pool import McpSessionPool, ping_once
+from github_mingzilla.llm_mcp.util.tracing import tracer
+
+MCP_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream",
+}
 
 
 class SingleServerMCPClient:
-    def __init__(self, server_name: str, server_url: str):
+    def __init__(self, server_name: str, server_url: str, server_config: Optional[Dict[str, Any]] = None, on_tools_changed: Optional[Callable[[str], None]] = None):
         self.server_name = server_name
         self.server_url = server_url
-        self.headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json, text/event-stream",
-        }
+        self.headers = dict(MCP_HEADERS)
         self.tools: Optional[List[McpToolDiscoveryItem]] = None
-
-    async def discover_tools(self) -> List[McpToolDiscoveryItem]:
-        """Discover tools with simple caching - return cached OR fetch->cache->return."""
-        if self.tools is not None:
+        self._on_tools_changed = on_tools_changed
+
+        server_config = server_config or {}
+        self.discovery_timeout = server_config.get("discovery_timeout", 5.0)
+        self.call_timeout = server_config.get("call_timeout", 10.0)
+        self._session_pool = McpSessionPool(
+            server_name,
+            server_url,
+            self.headers,
+            pool_size=server_config.get("pool_size", 4),
+            idle_ttl=server_config.get("pool_idle_ttl", 60.0),
+            max_concurrency=server_config.get("max_concurrency", 8),
+            max_queue=server_config.get("max_queue", 32),
+            queue_timeout=server_config.get("queue_timeout", 10.0),
+            connect_timeout=server_config.get("connect_timeout", 5.0),
+            message_handler=self._handle_server_message,
+        )
+
+    async def discover_tools(self, refresh: bool = False) -> List[McpToolDiscoveryItem]:
+        """Discover tools with simple caching - return cached OR fetch->cache->return.
+
+        Args:
+            refresh: Bypass the cached tools and fetch them from the server again
+        """
+        if self.tools is not None and not refresh:
             return self.tools
 
         try:
-            # Create temporary session for tool discovery
-            async with asyncio.timeout(5.0):
-                client_context = streamablehttp_client(self.server_url, self.headers)
-                streams = await client_context.__aenter__()
-                read_stream, write_stream, _ = streams
-
-                session = ClientSession(read_stream, write_stream)
-                await session.__aenter__()
-                await session.initialize()
-
-                # External library boundary - get raw response
-                raw_tools_response = await session.list_tools()
+            # Borrow pooled session for tool discovery
+            async with asyncio.timeout(self.discovery_timeout):
+                async with self._session_pool.session() as session:
+                    # External library boundary - get raw response
+                    raw_tools_response = await session.list_tools()
 
                 # Convert to typed model at boundary
                 typed_response = McpToolsListResponse.from_dict(raw_tools_response)
 
                 # Cache and return typed tools
                 self.tools = typed_response.tools
-
-                # Cleanup temporary session
-                await session.__aexit__(None, None, None)
-                await client_context.__aexit__(None, None, None)
-
                 return self.tools
 
         except Exception as e:
             print(f"Error discovering tools from {self.server_url}: {e}")
-            return []
+            # Keep serving the last known tools if a refresh fails
+            return self.tools if self.tools is not None else []
 
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]):
-        """Execute tool call with temporary session."""
-        try:
-            # Create temporary session for tool execution
-            async with asyncio.timeout(10.0):
-                client_context = streamablehttp_client(self.server_url, self.headers)
-                streams = await client_context.__aenter__()
-                read_stream, write_stream, _ = streams
+        """Execute tool call with a pooled session.
 
-                session = ClientSession(read_stream, write_stream)
-                await session.__aenter__()
-                await session.initialize()
+        The call timeout starts once a slot and session are held; waiting for them is
+        bounded by the pool's queue and connect timeouts.
+        """
+        try:
+            # Borrow pooled session for tool execution
+            async with self._session_pool.session() as session:
+                try:
+                    async with asyncio.timeout(self.call_timeout):
+                        # External library boundary - get raw response
+                        raw_result = await session.call_tool(tool_name, arguments)
+                except TimeoutError:
+                    raise RuntimeError(f"no result within {self.call_timeout:g}s") from None
+
+            # Tool errors come back as a normal result flagged with isError
+            if raw_result and raw_result.isError:
+                error_text = " ".join(item.text for item in raw_result.content if item.type == "text")
+                raise RuntimeError(f"MCP Tool Error: {error_text or 'no details'}")
+
+            if raw_result and raw_result.content:
+                # Convert to typed model at boundary
+                typed_result = McpToolResponse.from_dict(raw_result)
+                return typed_result.parse_content()
 
-                # External library boundary - get raw response
-                raw_result = await session.call_tool(tool_name, arguments)
+            return {}
 
-                # Cleanup temporary session
-                await session.__aexit__(None, None, None)
-                await client_context.__aexit__(None, None, None)
+        except TimeoutError:
+            raise RuntimeError(f"Tool call failed: no session within {self._session_pool.connect_timeout:g}s") from None
+        except Exception as e:
+            raise RuntimeError(f"Tool call failed: {str(e)}")
 
-                if raw_result and raw_result.content:
-                    # Convert to typed model at boundary
-                    typed_result = McpToolResponse.from_dict(raw_result)
-                    return typed_result.parse_content()
+    async def ping(self) -> None:
+        """Ping the server over a pooled session; raises if it does not answer."""
+        async with self._session_pool.session() as session:
+            await session.send_ping()
 
-                return {}
+    @staticmethod
+    async def ping_url(server_url: str, timeout: float) -> None:
+        """Ping a server without a client (no pool, no tool discovery); raises if it does not answer."""
+        await ping_once(server_url, MCP_HEADERS, timeout)
 
-        except Exception as e:
-            raise RuntimeError(f"Tool call failed: {str(e)}")
+    async def _handle_server_message(self, message) -> None:
+        """Drop cached tools when the server reports that its tool list changed."""
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+            tracer.current_span().add_event("tool_list_changed", server=self.server_name)
+            self.tools = None
+            if self._on_tools_changed:
+                self._on_tools_changed(self.server_name)
 
     async def connect(self) -> bool:
         """Simple connect - just call discover_tools() and return success."""
         tools = await self.discover_tools()
         return len(tools) > 0
 
-    def disconnect(self):
-        """Simple disconnect - clear the tools cache."""
+    async def disconnect(self):
+        """Close pooled sessions and clear the tools cache."""
         self.tools = None
+        await self._session_pool.close()
+
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Get session pool statistics for this server."""
+        return self._session_pool.get_stats()
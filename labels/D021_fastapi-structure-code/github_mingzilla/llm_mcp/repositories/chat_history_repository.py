@@ -2,25 +2,106 @@
 Chat history repository for conversation storage and retrieval.
 
 Provides singleton-based conversation management with repository pattern methods.
+
+Storage is unbounded by default. Any of these environment variables switches it to a
+bounded mode (0 disables the individual limit):
+- CHAT_HISTORY_MAX_SESSIONS: Least recently used sessions are evicted beyond this count
+- CHAT_HISTORY_IDLE_TTL: Seconds of inactivity after which a session is evicted
+- CHAT_HISTORY_MEMORY_BUDGET_BYTES: Estimated size of all messages across sessions
+- CHAT_HISTORY_MAX_MESSAGES_PER_SESSION: Oldest messages are trimmed from memory (and
+  from the prompt) beyond this count; persisted messages are kept
+
+Set CHAT_HISTORY_BACKEND=sqlite to persist history in CHAT_HISTORY_SQLITE_PATH (default
+chat_history.db, or chat_history.db in SHARED_STATE_DIR, where sqlite is the default).
+The in-memory store then acts as a read cache of active sessions: evicted sessions are
+reloaded from the database on their next access, and a session changed by another
+worker is reloaded as well, once CHAT_HISTORY_STALE_CHECK_INTERVAL seconds (default 1,
+0 = every access) have passed since the last check. Async callers preload() a session
+first so that the database is read in a worker thread.
 """
 
-from typing import Dict, List, Optional
+import json
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
 
+from github_mingzilla.llm_mcp.config import get_shared_state_path, is_shared_state_enabled
 from github_mingzilla.llm_mcp.models import ApiChatMessage
+from github_mingzilla.llm_mcp.repositories.sqlite_chat_history_store import SqliteChatHistoryStore
+from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
+from github_mingzilla.llm_mcp.util.tracing import tracer
+
+# Rough per-message overhead of the pydantic model and list slot, in bytes
+MESSAGE_OVERHEAD_BYTES = 200
 
 
-class _ChatHistoryRepository:
+class _ChatHistoryRepository(ClosableService):
     """
     Repository for chat conversation storage and retrieval.
 
     Provides conversation management using repository pattern.
-    Current implementation uses in-memory storage.
+    Conversations are held in memory, optionally backed by a SQLite store.
+
+    Alongside each conversation, an append-only list of OpenAI-formatted messages is
+    kept so that a turn only encodes the messages added since the previous one.
+
+    Sessions are kept in least-recently-used order, so LRU, idle-TTL and memory-budget
+    eviction all remove sessions from the front. The session being accessed is never
+    evicted by its own access.
     """
 
     def __init__(self):
         """Initialize chat history repository."""
-        self._conversations: Dict[str, List[ApiChatMessage]] = {}
+        self._conversations: "OrderedDict[str, List[ApiChatMessage]]" = OrderedDict()
+        self._openai_messages: Dict[str, List[Dict[str, Any]]] = {}
+
+        # Limits (0 = unlimited)
+        self.max_sessions = int(os.getenv("CHAT_HISTORY_MAX_SESSIONS", "0"))
+        self.idle_ttl = float(os.getenv("CHAT_HISTORY_IDLE_TTL", "0"))
+        self.memory_budget_bytes = int(os.getenv("CHAT_HISTORY_MEMORY_BUDGET_BYTES", "0"))
+        self.max_messages_per_session = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES_PER_SESSION", "0"))
+
+        # Occupancy tracking
+        self._last_access: Dict[str, float] = {}
+        self._session_bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._total_messages = 0
+        self._stats = {"evicted_lru": 0, "evicted_idle": 0, "evicted_memory": 0, "trimmed_messages": 0}
+
+        # Optional durable backend (the default in shared-state mode, so workers share sessions)
+        self.backend = os.getenv("CHAT_HISTORY_BACKEND", "sqlite" if is_shared_state_enabled() else "memory").lower()
+        self._store: Optional[SqliteChatHistoryStore] = None
+        if self.backend == "sqlite":
+            self._store = SqliteChatHistoryStore(
+                os.getenv("CHAT_HISTORY_SQLITE_PATH") or get_shared_state_path("chat_history.db") or "chat_history.db",
+                stale_check_interval=float(os.getenv("CHAT_HISTORY_STALE_CHECK_INTERVAL", "1")),
+            )
+
+    async def preload(self, session_id: str) -> None:
+        """
+        Load a persisted session into memory, reading the database in a worker thread.
+
+        Does nothing without a durable backend, for sessions already cached and current,
+        and for unknown sessions, so the synchronous methods that follow only touch the
+        database on the event loop when a session is new.
+
+        Args:
+            session_id: Unique session identifier
+        """
+        if not self._store:
+            return
+        if session_id in self._conversations:
+            if not self._store.is_stale(session_id):
+                return
+            self._remove_session(session_id)
+
+        conversation = await self._store.load_messages_async(session_id)
+        # A synchronous access may have loaded (and written to) the session meanwhile
+        if conversation and session_id not in self._conversations and not self._store.has_pending_writes(session_id):
+            self._load_session(session_id, conversation)
 
     def save_message_and_get_history(self, session_id: str, message: ApiChatMessage) -> List[ApiChatMessage]:
         """
@@ -46,8 +127,14 @@ class _ChatHistoryRepository:
         Returns:
             List of messages in chronological order
         """
+        self._evict_idle()
+        if self._store and session_id in self._conversations and self._store.is_stale(session_id):
+            self._remove_session(session_id)
+
         if session_id not in self._conversations:
-            self._conversations[session_id] = []
+            self._load_session(session_id)
+        self._touch(session_id)
+        self._evict_over_limits()
         return self._conversations[session_id]
 
     def save_message(self, session_id: str, message: ApiChatMessage) -> None:
@@ -58,8 +145,71 @@ class _ChatHistoryRepository:
             session_id: Unique session identifier
             message: Message to save
         """
+        with tracer.span("history.write", role=message.role):
+            conversation = self.get_conversation_history(session_id)
+            conversation.append(message)
+
+            message_bytes = self._estimate_message_size(message)
+            self._session_bytes[session_id] += message_bytes
+            self._total_bytes += message_bytes
+            self._total_messages += 1
+            if self._store:
+                self._store.append(session_id, message)
+
+            if self.max_messages_per_session and len(conversation) > self.max_messages_per_session:
+                self._trim_conversation(session_id)
+            self._evict_over_limits()
+
+    def close_unanswered_tool_calls(self, session_id: str) -> int:
+        """
+        Answer the tool calls of the last assistant message that have no result with an error result.
+
+        An interrupted tool orchestration can leave tool calls without results, and OpenAI
+        rejects a conversation in which tool calls are not followed by their results. Call
+        this before adding a message that continues the conversation.
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            Number of error results that were added
+        """
+        conversation = self.get_conversation_history(session_id)
+        answered: Counter = Counter()
+        for message in reversed(conversation):
+            if message.role == "tool":
+                answered[message.tool_call_id] += 1
+                continue
+            if message.role != "assistant" or not message.tool_calls:
+                return 0
+
+            unanswered = LlmOpenaiUtil.get_unanswered_tool_calls(message.tool_calls, answered)
+            for tool_call in unanswered:
+                error = json.dumps({"error": "Tool call interrupted before it returned a result"})
+                self.save_message(session_id, ApiChatMessage(role="tool", content=error, tool_call_id=tool_call["id"], name=tool_call["function"]["name"]))
+            return len(unanswered)
+        return 0
+
+    def get_openai_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the conversation in OpenAI API format, encoding only new messages.
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            OpenAI-formatted message dictionaries in chronological order
+        """
         conversation = self.get_conversation_history(session_id)
-        conversation.append(message)
+        encoded = self._openai_messages.setdefault(session_id, [])
+
+        # History shorter than the cache means it was rewritten; start over
+        if len(encoded) > len(conversation):
+            encoded.clear()
+
+        if len(encoded) < len(conversation):
+            encoded.extend(LlmOpenaiUtil.chat_messages_to_openai_format(conversation[len(encoded) :]))
+        return list(encoded)
 
     def find_conversation_by_id(self, session_id: str) -> Optional[List[ApiChatMessage]]:
         """
@@ -71,7 +221,10 @@ class _ChatHistoryRepository:
         Returns:
             Conversation messages if found, None otherwise
         """
-        return self._conversations.get(session_id)
+        self._evict_idle()
+        if session_id not in self._conversations and not (self._store and self._store.session_exists(session_id)):
+            return None
+        return self.get_conversation_history(session_id)
 
     def delete_conversation(self, session_id: str) -> bool:
         """
@@ -83,10 +236,12 @@ class _ChatHistoryRepository:
         Returns:
             True if conversation was deleted, False if not found
         """
+        existed = self.conversation_exists(session_id)
         if session_id in self._conversations:
-            del self._conversations[session_id]
-            return True
-        return False
+            self._remove_session(session_id)
+        if existed and self._store:
+            self._store.delete_session(session_id)
+        return existed
 
     def conversation_exists(self, session_id: str) -> bool:
         """
@@ -98,7 +253,8 @@ class _ChatHistoryRepository:
         Returns:
             True if conversation exists, False otherwise
         """
-        return session_id in self._conversations
+        self._evict_idle()
+        return session_id in self._conversations or bool(self._store and self._store.session_exists(session_id))
 
     def get_message_count(self, session_id: str) -> int:
         """
@@ -110,7 +266,7 @@ class _ChatHistoryRepository:
         Returns:
             Number of messages in the conversation
         """
-        conversation = self._conversations.get(session_id, [])
+        conversation = self.find_conversation_by_id(session_id) or []
         return len(conversation)
 
     def get_all_session_ids(self) -> List[str]:
@@ -120,7 +276,7 @@ class _ChatHistoryRepository:
         Returns:
             List of session identifiers
         """
-        return list(self._conversations.keys())
+        return list(self.get_conversation_summary().keys())
 
     def clear_all_conversations(self) -> int:
         """
@@ -129,8 +285,15 @@ class _ChatHistoryRepository:
         Returns:
             Number of conversations that were cleared
         """
-        count = len(self._conversations)
+        count = len(self.get_conversation_summary())
+        if self._store:
+            self._store.clear()
         self._conversations.clear()
+        self._openai_messages.clear()
+        self._last_access.clear()
+        self._session_bytes.clear()
+        self._total_bytes = 0
+        self._total_messages = 0
         return count
 
     def get_conversation_summary(self) -> Dict[str, int]:
@@ -140,7 +303,128 @@ class _ChatHistoryRepository:
         Returns:
             Dictionary mapping session_id to message count
         """
-        return {session_id: len(messages) for session_id, messages in self._conversations.items()}
+        # Cached sessions may hold writes that are not persisted yet
+        summary = self._store.get_message_counts() if self._store else {}
+        summary.update({session_id: len(messages) for session_id, messages in self._conversations.items()})
+        return summary
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get occupancy, limit and eviction statistics.
+
+        Returns:
+            Dictionary with current occupancy, configured limits and eviction counters
+        """
+        stats = {
+            "backend": self.backend,
+            "sessions": len(self._conversations),
+            "messages": self._total_messages,
+            "estimated_bytes": self._total_bytes,
+            "limits": {
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "max_messages_per_session": self.max_messages_per_session,
+            },
+            **self._stats,
+        }
+        if self._store:
+            stats["store"] = self._store.get_stats()
+        return stats
+
+    async def disconnect(self):
+        """Flush pending writes and close the durable store, if any."""
+        if self._store:
+            await self._store.close()
+
+    def _load_session(self, session_id: str, conversation: Optional[List[ApiChatMessage]] = None) -> None:
+        """Add a session to the in-memory store, loading persisted messages if there is a backend and none are given."""
+        if conversation is None:
+            conversation = self._store.load_messages(session_id) if self._store else []
+        self._conversations[session_id] = conversation
+        self._session_bytes[session_id] = sum(self._estimate_message_size(message) for message in conversation)
+        self._total_bytes += self._session_bytes[session_id]
+        self._total_messages += len(conversation)
+
+        if self.max_messages_per_session and len(conversation) > self.max_messages_per_session:
+            self._trim_conversation(session_id)
+
+    def _touch(self, session_id: str) -> None:
+        """Mark a session as most recently used."""
+        self._conversations.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+
+    def _evict_idle(self) -> None:
+        """Evict sessions idle longer than the TTL (oldest first, so stop at the first active one)."""
+        if not self.idle_ttl:
+            return
+
+        now = time.monotonic()
+        while self._conversations:
+            oldest = next(iter(self._conversations))
+            if now - self._last_access[oldest] <= self.idle_ttl:
+                break
+            self._remove_session(oldest)
+            self._stats["evicted_idle"] += 1
+
+    def _evict_over_limits(self) -> None:
+        """Evict least recently used sessions beyond the session limit or memory budget."""
+        while self.max_sessions and len(self._conversations) > self.max_sessions:
+            self._remove_session(next(iter(self._conversations)))
+            self._stats["evicted_lru"] += 1
+
+        # Keep at least the most recently used session, even if it alone exceeds the budget
+        while self.memory_budget_bytes and self._total_bytes > self.memory_budget_bytes and len(self._conversations) > 1:
+            self._remove_session(next(iter(self._conversations)))
+            self._stats["evicted_memory"] += 1
+
+    def _remove_session(self, session_id: str) -> None:
+        """Remove a session and its bookkeeping from memory (persisted messages are kept)."""
+        conversation = self._conversations.pop(session_id)
+        self._openai_messages.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        self._total_bytes -= self._session_bytes.pop(session_id, 0)
+        self._total_messages -= len(conversation)
+        if self._store:
+            self._store.forget(session_id)
+
+    def _trim_conversation(self, session_id: str) -> None:
+        """
+        Drop the oldest in-memory messages of a session down to the per-session cap.
+
+        A leading system message is kept, and tool results are never left without the
+        assistant message that requested them. Persisted messages are not deleted; a
+        reloaded session is trimmed the same way.
+        """
+        conversation = self._conversations[session_id]
+        start = 1 if conversation and conversation[0].role == "system" else 0
+
+        end = start + max(len(conversation) - self.max_messages_per_session, 0)
+        while end < len(conversation) and conversation[end].role == "tool":
+            end += 1
+        if end <= start:
+            return
+
+        removed_bytes = sum(self._estimate_message_size(message) for message in conversation[start:end])
+        del conversation[start:end]
+
+        # Encoded messages are a prefix of the conversation, so the same slice keeps them aligned
+        encoded = self._openai_messages.get(session_id)
+        if encoded is not None:
+            del encoded[start:end]
+
+        self._session_bytes[session_id] -= removed_bytes
+        self._total_bytes -= removed_bytes
+        self._total_messages -= end - start
+        self._stats["trimmed_messages"] += end - start
+
+    @staticmethod
+    def _estimate_message_size(message: ApiChatMessage) -> int:
+        """Estimate the memory held by a message from its text and tool call payloads."""
+        size = MESSAGE_OVERHEAD_BYTES + len(message.content or "")
+        if message.tool_calls:
+            size += len(json.dumps(message.tool_calls))
+        return size
 
 
 # Module-level singleton instance
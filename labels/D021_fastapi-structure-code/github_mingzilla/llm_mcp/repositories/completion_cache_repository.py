@@ -0,0 +1,235 @@
+"""
+Completion cache repository for exact-match reuse of deterministic LLM responses.
+
+Opt-in via environment variables:
+- COMPLETION_CACHE_ENABLED: Enable the cache (default false)
+- COMPLETION_CACHE_MAX_ENTRIES: In-memory LRU capacity (default 1000)
+- COMPLETION_CACHE_TTL: Seconds an entry stays valid (default 3600, 0 = no expiry)
+- COMPLETION_CACHE_DISK_PATH: Optional SQLite file for a persistent second tier (defaults
+  to completion_cache.db in SHARED_STATE_DIR, so workers share cached completions)
+
+Only deterministic requests (temperature 0) are cached. Concurrent identical requests
+are coalesced so that a single upstream call serves all of them.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from github_mingzilla.llm_mcp.config import get_shared_state_path
+from github_mingzilla.llm_mcp.models import LlmResponse
+from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
+from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+
+
+class _CompletionCacheRepository(ClosableService):
+    """
+    Two-tier completion cache: in-memory LRU with an optional SQLite tier behind it.
+    """
+
+    def __init__(self):
+        """Initialize the cache from environment configuration."""
+        self.enabled = os.getenv("COMPLETION_CACHE_ENABLED", "false").lower() == "true"
+        self.max_entries = int(os.getenv("COMPLETION_CACHE_MAX_ENTRIES", "1000"))
+        self.ttl = float(os.getenv("COMPLETION_CACHE_TTL", "3600"))
+        self.disk_path = os.getenv("COMPLETION_CACHE_DISK_PATH") or (get_shared_state_path("completion_cache.db") if self.enabled else None)
+
+        self._entries: "OrderedDict[str, Tuple[float, LlmResponse]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def is_cacheable(self, temperature: Optional[float]) -> bool:
+        """
+        Check whether a request may be served from the cache.
+
+        Args:
+            temperature: Sampling temperature of the request (None = provider default)
+
+        Returns:
+            True if the cache is enabled and sampling is deterministic
+        """
+        return self.enabled and temperature == 0
+
+    @staticmethod
+    def build_key(model: str, openai_messages: List[Dict[str, Any]], sampling: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model: Resolved model name
+            openai_messages: Conversation in OpenAI format
+            sampling: Sampling parameters that affect the output
+
+        Returns:
+            Hex digest identifying the request
+        """
+        # Surrounding whitespace does not change the meaning of a message
+        messages = [{**message, "content": message["content"].strip()} if isinstance(message.get("content"), str) else message for message in openai_messages]
+        key_data = json.dumps({"model": model, "messages": messages, "sampling": sampling}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[LlmResponse]]) -> LlmResponse:
+        """
+        Return the cached response for a key, computing and storing it on a miss.
+
+        Concurrent callers with the same key wait for the first caller's upstream call
+        instead of starting their own. Failures are not cached.
+
+        Args:
+            key: Cache key from build_key()
+            compute: Coroutine factory that performs the upstream call
+
+        Returns:
+            Cached or freshly computed response
+        """
+        while True:
+            cached = self._get_from_memory(key)
+            if cached is None and key not in self._inflight:
+                cached = await self._get_from_disk(key)
+            if cached is not None:
+                return cached
+
+            # Checked after the disk lookup, which may have let another caller start the call
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Retry only if the first caller was cancelled, not this one
+                if not inflight.cancelled():
+                    raise
+
+        self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(response)
+        await self._put(key, response)
+        return response
+
+    def _get_from_memory(self, key: str) -> Optional[LlmResponse]:
+        """Look up a key in the in-memory tier."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, response = entry
+            if not self._is_expired(stored_at):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return response
+            del self._entries[key]
+        return None
+
+    async def _get_from_disk(self, key: str) -> Optional[LlmResponse]:
+        """Look up a key in the disk tier, promoting hits to memory."""
+        if self.disk_path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None and not self._is_expired(row[0]):
+                response = LlmResponse.model_validate_json(row[1])
+                self._store_in_memory(key, row[0], response)
+                self._stats["disk_hits"] += 1
+                return response
+
+        return None
+
+    async def _put(self, key: str, response: LlmResponse) -> None:
+        """Store a response in memory and, if configured, on disk."""
+        stored_at = time.time()
+        self._store_in_memory(key, stored_at, response)
+        if self.disk_path:
+            try:
+                await asyncio.to_thread(self._disk_put, key, stored_at, response.model_dump_json())
+            except Exception as e:
+                print(f"Error writing completion cache entry to disk: {e}")
+
+    def _store_in_memory(self, key: str, stored_at: float, response: LlmResponse) -> None:
+        """Insert an entry as most recently used and evict beyond capacity."""
+        self._entries[key] = (stored_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _is_expired(self, stored_at: float) -> bool:
+        """Check an entry timestamp against the TTL."""
+        return bool(self.ttl) and time.time() - stored_at > self.ttl
+
+    def _get_disk(self) -> sqlite3.Connection:
+        """Open the disk tier on first use (callers hold the disk lock)."""
+        if self._disk is None:
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute("CREATE TABLE IF NOT EXISTS completion_cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, response TEXT NOT NULL)")
+        return self._disk
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        """Read an entry from the disk tier (runs in a worker thread)."""
+        with self._disk_lock:
+            return self._get_disk().execute("SELECT stored_at, response FROM completion_cache WHERE key = ?", (key,)).fetchone()
+
+    def _disk_put(self, key: str, stored_at: float, response_json: str) -> None:
+        """Write an entry to the disk tier (runs in a worker thread)."""
+        with self._disk_lock:
+            self._get_disk().execute("INSERT OR REPLACE INTO completion_cache (key, stored_at, response) VALUES (?, ?, ?)", (key, stored_at, response_json))
+
+    def clear(self) -> int:
+        """
+        Clear the in-memory tier.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with configuration, occupancy and hit/miss counters
+        """
+        lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"] + self._stats["coalesced"]
+        served = lookups - self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_tier": self.disk_path is not None,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+    async def disconnect(self):
+        """Close the disk tier connection."""
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+
+# Module-level singleton instance
+completion_cache_repo = _CompletionCacheRepository()
+singleton_manager.register(completion_cache_repo)
@@ -0,0 +1,240 @@
+"""
+Semantic cache repository for reusing responses to paraphrased questions.
+
+Opt-in via environment variables:
+- SEMANTIC_CACHE_ENABLED: Enable the cache (default false; requires NumPy)
+- SEMANTIC_CACHE_THRESHOLD: Default cosine similarity needed for a hit (default 0.92)
+- SEMANTIC_CACHE_MODEL_THRESHOLDS: Per-model overrides, e.g. "gpt-4o=0.95,tinyllama=0.9"
+- SEMANTIC_CACHE_MAX_ENTRIES: Entries kept per model (default 1000)
+- SEMANTIC_CACHE_TTL: Seconds an entry stays valid (default 3600, 0 = no expiry)
+- SEMANTIC_CACHE_DIMENSIONS: Size of the default hashing embedder vectors (default 512)
+- SEMANTIC_CACHE_SAMPLED: Also cache requests sampled above temperature 0, including
+  those without a temperature (provider default 0.7) (default false)
+
+Only standalone questions (the first user message of a conversation, optionally after
+system messages) are cached, since later turns depend on the conversation before them.
+By default only deterministic (temperature 0) requests are cached, since reusing one
+sample for every similar question removes the variety sampling asks for.
+"""
+
+import inspect
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from github_mingzilla.llm_mcp.models import ApiChatMessage, LlmResponse
+from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.util.vector_index import CosineVectorIndex, HashingEmbedder, numpy_available
+
+# Maps text to an embedding vector; may be sync or async (e.g. a remote embedding API)
+Embedder = Callable[[str], Union[Any, Awaitable[Any]]]
+
+
+class _SemanticCacheEntry:
+    """Cached response with its bookkeeping timestamps."""
+
+    __slots__ = ("response", "stored_at", "last_used")
+
+    def __init__(self, response: LlmResponse):
+        self.response = response
+        self.stored_at = time.time()
+        self.last_used = self.stored_at
+
+
+class _SemanticCacheRepository:
+    """
+    Similarity-based response cache with one cosine vector index per model.
+    """
+
+    def __init__(self):
+        """Initialize the cache from environment configuration."""
+        self.enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+        if self.enabled and not numpy_available():
+            print("SEMANTIC_CACHE_ENABLED is set but the 'numpy' package is not installed; semantic cache disabled")
+            self.enabled = False
+
+        self.default_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+        self.thresholds = self._parse_thresholds(os.getenv("SEMANTIC_CACHE_MODEL_THRESHOLDS", ""))
+        self.max_entries = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+        self.ttl = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+        self.cache_sampled = os.getenv("SEMANTIC_CACHE_SAMPLED", "false").lower() == "true"
+
+        self.embedder: Embedder = HashingEmbedder(int(os.getenv("SEMANTIC_CACHE_DIMENSIONS", "512"))) if numpy_available() else None
+        self._indexes: Dict[str, CosineVectorIndex] = {}
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "embedding_errors": 0}
+
+    @staticmethod
+    def _parse_thresholds(value: str) -> Dict[str, float]:
+        """Parse "model=threshold" pairs separated by commas."""
+        thresholds = {}
+        for pair in value.split(","):
+            if "=" in pair:
+                model, threshold = pair.rsplit("=", 1)
+                thresholds[model.strip()] = float(threshold)
+        return thresholds
+
+    def set_embedder(self, embedder: Embedder) -> None:
+        """
+        Replace the embedding function.
+
+        Existing entries were embedded with the previous function and are dropped.
+
+        Args:
+            embedder: Callable mapping text to a vector (sync or async)
+        """
+        self.embedder = embedder
+        self.clear()
+
+    def set_threshold(self, model: str, threshold: float) -> None:
+        """
+        Set the similarity threshold for a model.
+
+        Args:
+            model: Resolved model name
+            threshold: Minimum cosine similarity for a hit
+        """
+        self.thresholds[model] = threshold
+
+    def get_threshold(self, model: str) -> float:
+        """Get the similarity threshold for a model."""
+        return self.thresholds.get(model, self.default_threshold)
+
+    def get_cacheable_question(self, messages: List[ApiChatMessage], temperature: Optional[float]) -> Optional[str]:
+        """
+        Get the question to look up, if a request may be served from the cache.
+
+        Args:
+            messages: Conversation history ending with the new user message
+            temperature: Sampling temperature of the request (None = provider default of
+                0.7); only 0 is cacheable unless SEMANTIC_CACHE_SAMPLED is set
+
+        Returns:
+            Text of the standalone question, or None if the request is not cacheable
+        """
+        if not self.enabled or not messages or (temperature != 0 and not self.cache_sampled):
+            return None
+
+        question = messages[-1]
+        if question.role != "user" or not question.content or any(message.role != "system" for message in messages[:-1]):
+            return None
+
+        return question.content.strip()
+
+    async def lookup(self, model: str, question: str) -> Optional[LlmResponse]:
+        """
+        Find a cached response to a similar question.
+
+        Args:
+            model: Resolved model name
+            question: Question from get_cacheable_question()
+
+        Returns:
+            Cached response if a live entry meets the model's threshold, None otherwise
+        """
+        index = self._indexes.get(model)
+        vector = await self._embed(question) if index is not None and len(index) else None
+        match = index.search(vector) if vector is not None else None
+
+        if match is not None:
+            row, similarity, entry = match
+            if self._is_expired(entry):
+                self._remove(model, [row])
+            elif similarity >= self.get_threshold(model):
+                entry.last_used = time.time()
+                self._stats["hits"] += 1
+                return entry.response
+
+        self._stats["misses"] += 1
+        return None
+
+    async def store(self, model: str, question: str, response: LlmResponse) -> None:
+        """
+        Cache a response to a question.
+
+        Args:
+            model: Resolved model name
+            question: Question from get_cacheable_question()
+            response: Response to reuse for similar questions
+        """
+        if not response.content:
+            return
+
+        vector = await self._embed(question)
+        if vector is None:
+            return
+
+        index = self._indexes.get(model)
+        if index is None:
+            index = self._indexes[model] = CosineVectorIndex(len(vector))
+
+        index.add(vector, _SemanticCacheEntry(response))
+        self._stats["stores"] += 1
+
+        if len(index) > self.max_entries:
+            self._evict(model)
+
+    async def _embed(self, text: str) -> Any:
+        """Embed text, returning None (a cache miss) if the embedder fails."""
+        try:
+            vector = self.embedder(text)
+            if inspect.isawaitable(vector):
+                vector = await vector
+            return vector
+        except Exception as e:
+            self._stats["embedding_errors"] += 1
+            print(f"Semantic cache embedding failed: {e}")
+            return None
+
+    def _evict(self, model: str) -> None:
+        """Drop expired entries, then least recently used ones down to 90% of capacity."""
+        rows = self._indexes[model].rows()
+        expired = [row for row, entry in rows if self._is_expired(entry)]
+        live = sorted((entry.last_used, row) for row, entry in rows if not self._is_expired(entry))
+
+        # Evicting in batches keeps compaction (which copies the matrix) infrequent
+        excess = len(live) - int(self.max_entries * 0.9)
+        self._remove(model, expired + [row for _, row in live[: max(excess, 0)]])
+
+    def _remove(self, model: str, rows: List[int]) -> None:
+        """Remove rows from a model's index."""
+        self._indexes[model].remove(rows)
+        self._stats["evictions"] += len(rows)
+
+    def _is_expired(self, entry: _SemanticCacheEntry) -> bool:
+        """Check an entry against the TTL."""
+        return bool(self.ttl) and time.time() - entry.stored_at > self.ttl
+
+    def clear(self) -> int:
+        """
+        Clear all indexes.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        count = sum(len(index) for index in self._indexes.values())
+        self._indexes.clear()
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with configuration, per-model occupancy and hit/miss counters
+        """
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "cache_sampled": self.cache_sampled,
+            "default_threshold": self.default_threshold,
+            "thresholds": dict(self.thresholds),
+            "max_entries_per_model": self.max_entries,
+            "entries": {model: len(index) for model, index in self._indexes.items()},
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+
+# Module-level singleton instance
+semantic_cache_repo = _SemanticCacheRepository()
+singleton_manager.register(semantic_cache_repo)
@@ -0,0 +1,312 @@
+"""
+SQLite storage backend for chat history.
+
+Messages are stored one row per message in a WAL-mode database. Writes are queued and
+applied in batches by a background writer task running in a worker thread, so request
+handlers never wait for a commit. Reads use a separate connection, which WAL allows to
+run alongside the writer.
+
+Changes by other processes are detected by polling `PRAGMA data_version`, which costs
+no table reads, at most once per `stale_check_interval`; a session's rows are only
+checked again after the database has changed.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from github_mingzilla.llm_mcp.models import ApiChatMessage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages (session_id, id);
+"""
+
+
+class SqliteChatHistoryStore:
+    """
+    Durable chat history store with write-behind batching.
+
+    Write operations are applied in the order they were queued. Until the writer has
+    applied them, the repository's in-process cache is the source of truth for the
+    sessions involved (see `has_pending_writes`).
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, stale_check_interval: float = 1.0):
+        """
+        Open the database and create the schema if needed.
+
+        Args:
+            path: SQLite database file path
+            batch_size: Maximum queued operations applied per transaction
+            stale_check_interval: Seconds between checks for changes by other processes
+                (0 = check on every access)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.stale_check_interval = stale_check_interval
+
+        self._write_conn = self._connect()
+        self._write_conn.executescript(SCHEMA)
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()  # The read connection is also used from worker threads
+
+        # Database version at the last poll, and the version each session was last verified at
+        self._data_version: Optional[int] = None
+        self._version_checked_at = float("-inf")
+        self._verified_versions: Dict[str, Optional[int]] = {}
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, int] = {}
+        self._pending_deletes: Dict[str, int] = {}  # Persisted rows that are already gone for readers
+        self._last_ids: Dict[str, Optional[int]] = {}
+        self._stats = {"batches_written": 0, "operations_written": 0, "write_errors": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a WAL-mode connection usable from the writer thread."""
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _read(self, sql: str, parameters: Tuple = ()) -> List[Tuple]:
+        """Run a query on the read connection (blocking; safe to call from a worker thread)."""
+        with self._read_lock:
+            return self._read_conn.execute(sql, parameters).fetchall()
+
+    def _read_session(self, session_id: str) -> List[Tuple[int, str]]:
+        """Read the persisted rows of a session (blocking)."""
+        return self._read("SELECT id, message FROM chat_messages WHERE session_id = ? ORDER BY id", (session_id,))
+
+    def load_messages(self, session_id: str) -> List[ApiChatMessage]:
+        """
+        Load all persisted messages of a session, reading on the calling thread.
+
+        Async callers should prefer load_messages_async().
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            Messages in chronological order (empty if the session is unknown)
+        """
+        if self._is_deleted(session_id):
+            return self._loaded(session_id, [])
+        return self._loaded(session_id, self._read_session(session_id))
+
+    async def load_messages_async(self, session_id: str) -> List[ApiChatMessage]:
+        """
+        Load all persisted messages of a session, reading in a worker thread.
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            Messages in chronological order (empty if the session is unknown)
+        """
+        if self._is_deleted(session_id):
+            return self._loaded(session_id, [])
+        version = self._data_version
+        rows = await asyncio.to_thread(self._read_session, session_id)
+        # Unknown sessions are not cached, so there is nothing to track for them
+        return self._loaded(session_id, rows, version) if rows else []
+
+    def _loaded(self, session_id: str, rows: List[Tuple[int, str]], version: Optional[int] = None) -> List[ApiChatMessage]:
+        """Record the last persisted row of a freshly read session and decode its messages."""
+        self._last_ids[session_id] = rows[-1][0] if rows else None
+        self._verified_versions[session_id] = self._data_version if version is None else version
+        return [ApiChatMessage.model_validate_json(message) for _, message in rows]
+
+    def is_stale(self, session_id: str) -> bool:
+        """
+        Check whether another process changed a session since it was loaded or written here.
+
+        The database version is polled at most once per `stale_check_interval`, and a
+        session's rows are only read once the version has changed since it was last
+        verified, so a change by another process is noticed within that interval.
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            True if the cached copy of the session should be reloaded
+        """
+        if self.has_pending_writes(session_id):
+            return False
+
+        now = time.monotonic()
+        if now - self._version_checked_at >= self.stale_check_interval:
+            self._data_version = self._read("PRAGMA data_version")[0][0]
+            self._version_checked_at = now
+        if session_id in self._verified_versions and self._verified_versions[session_id] == self._data_version:
+            return False
+
+        self._verified_versions[session_id] = self._data_version
+        return self._read("SELECT MAX(id) FROM chat_messages WHERE session_id = ?", (session_id,))[0][0] != self._last_ids.get(session_id)
+
+    def forget(self, session_id: str) -> None:
+        """Drop bookkeeping for a session that left the in-process cache."""
+        self._last_ids.pop(session_id, None)
+        self._verified_versions.pop(session_id, None)
+
+    def session_exists(self, session_id: str) -> bool:
+        """Check whether any message of the session is persisted."""
+        if self._is_deleted(session_id):
+            return False
+        return bool(self._read("SELECT 1 FROM chat_messages WHERE session_id = ? LIMIT 1", (session_id,)))
+
+    def get_message_counts(self) -> Dict[str, int]:
+        """Get persisted message counts per session."""
+        if "" in self._pending_deletes:
+            return {}
+        counts = dict(self._read("SELECT session_id, COUNT(*) FROM chat_messages GROUP BY session_id"))
+        return {session_id: count for session_id, count in counts.items() if session_id not in self._pending_deletes}
+
+    def has_pending_writes(self, session_id: str) -> bool:
+        """Check whether queued writes for the session have not been applied yet."""
+        return self._pending.get(session_id, 0) > 0
+
+    def _is_deleted(self, session_id: str) -> bool:
+        """Check whether a queued delete covers the session."""
+        return session_id in self._pending_deletes or "" in self._pending_deletes
+
+    def append(self, session_id: str, message: ApiChatMessage) -> None:
+        """Queue a message append."""
+        self._enqueue(("append", session_id, message.model_dump_json()))
+
+    def delete_session(self, session_id: str) -> None:
+        """Queue deletion of a whole session."""
+        self._enqueue(("delete_session", session_id, None))
+
+    def clear(self) -> None:
+        """Queue deletion of all sessions (tracked under the empty session id)."""
+        self._enqueue(("clear", "", None))
+
+    def _enqueue(self, operation: Tuple[str, str, Any]) -> None:
+        """Queue an operation for the writer, starting it on first use.
+
+        Outside an event loop (e.g. scripts) the operation is applied immediately.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._record_batch([operation], self._apply_batch([operation]))
+            return
+
+        if self._writer_task is None or self._writer_task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._run_writer())
+
+        kind, session_id, _ = operation
+        self._pending[session_id] = self._pending.get(session_id, 0) + 1
+        if kind in ("delete_session", "clear"):
+            self._pending_deletes[session_id] = self._pending_deletes.get(session_id, 0) + 1
+        self._queue.put_nowait(operation)
+
+    async def _run_writer(self) -> None:
+        """Apply queued operations in batches, one transaction per batch."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                last_ids = await asyncio.to_thread(self._apply_batch, batch)
+                # Bookkeeping is only updated on the event loop thread
+                self._record_batch(batch, last_ids)
+            except Exception as e:
+                self._stats["write_errors"] += 1
+                print(f"Error writing chat history batch of {len(batch)} operations: {e}")
+            finally:
+                for kind, session_id, _ in batch:
+                    self._release_pending(self._pending, session_id)
+                    if kind in ("delete_session", "clear"):
+                        self._release_pending(self._pending_deletes, session_id)
+                    self._queue.task_done()
+
+    @staticmethod
+    def _release_pending(counter: Dict[str, int], session_id: str) -> None:
+        """Decrement a pending-operation counter, dropping it at zero."""
+        counter[session_id] -= 1
+        if not counter[session_id]:
+            del counter[session_id]
+
+    def _apply_batch(self, batch: List[Tuple[str, str, Any]]) -> Dict[str, Optional[int]]:
+        """
+        Apply operations in a single transaction (runs in the writer thread).
+
+        Returns:
+            Last persisted row ID per session written by the batch
+        """
+        conn = self._write_conn
+        last_ids: Dict[str, Optional[int]] = {}
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for kind, session_id, payload in batch:
+                if kind == "append":
+                    last_ids[session_id] = conn.execute("INSERT INTO chat_messages (session_id, message) VALUES (?, ?)", (session_id, payload)).lastrowid
+                elif kind == "delete_session":
+                    conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+                    last_ids[session_id] = None
+                elif kind == "clear":
+                    conn.execute("DELETE FROM chat_messages")
+                    last_ids.clear()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return last_ids
+
+    def _record_batch(self, batch: List[Tuple[str, str, Any]], last_ids: Dict[str, Optional[int]]) -> None:
+        """Update bookkeeping after a batch was committed (only for sessions still tracked)."""
+        if any(kind == "clear" for kind, _, _ in batch):
+            self._last_ids.clear()
+            self._verified_versions.clear()
+        for session_id, last_id in last_ids.items():
+            if last_id is None:
+                self.forget(session_id)
+            elif session_id in self._last_ids:
+                self._last_ids[session_id] = last_id
+        self._stats["batches_written"] += 1
+        self._stats["operations_written"] += len(batch)
+
+    async def flush(self) -> None:
+        """Wait until all queued operations are applied."""
+        if self._queue is not None and self._writer_task is not None and not self._writer_task.done():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush queued operations, stop the writer and close both connections."""
+        await self.flush()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+        self._read_conn.close()
+        self._write_conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get writer statistics.
+
+        Returns:
+            Dictionary with database path, queue depth and write counters
+        """
+        return {
+            "path": self.path,
+            "queued_operations": self._queue.qsize() if self._queue is not None else 0,
+            **self._stats,
+        }
@@ -0,0 +1,75 @@
+"""
+SQLite store for tool result cache generations shared by gateway workers.
+
+Each MCP server has a generation counter that is bumped whenever a call may have
+changed its state. Workers tag cached results with the generation they were computed
+under and only serve entries whose generation is still current, so a write on one
+worker invalidates the cached reads of every worker.
+"""
+
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    server TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+
+class SqliteToolCacheGenerationStore:
+    """
+    Per-server invalidation generations shared across processes.
+
+    Methods are blocking; async callers run them in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the database and create the schema if needed.
+
+        Args:
+            path: SQLite database file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, server: str) -> int:
+        """
+        Get the current generation of a server.
+
+        Args:
+            server: Server name
+
+        Returns:
+            Generation number (0 if the server was never invalidated)
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT generation FROM generations WHERE server = ?", (server,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, server: str) -> int:
+        """
+        Increment the generation of a server.
+
+        Args:
+            server: Server name
+
+        Returns:
+            The new generation number
+        """
+        with self._lock:
+            return self._conn.execute(
+                "INSERT INTO generations (server, generation) VALUES (?, 1) ON CONFLICT(server) DO UPDATE SET generation = generation + 1 RETURNING generation",
+                (server,),
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,147 @@
+"""
+SQLite store for the MCP tool catalogue shared by gateway workers.
+
+Each server's discovered tools are stored as one JSON row, and every save bumps an
+explicit catalogue version. Workers first poll `PRAGMA data_version`, which changes
+whenever another connection commits and costs no table reads, and only compare the
+catalogue version after that; lease renewals therefore never cause a reload. A lease
+row lets one worker at a time rediscover tools while the others keep serving the
+stored catalogue.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tool_catalogue (
+    server TEXT PRIMARY KEY,
+    tools TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS catalogue_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SqliteToolCatalogueStore:
+    """
+    Shared tool catalogue with cross-process change detection and a discovery lease.
+
+    Methods are blocking; async callers run them in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the database and create the schema if needed.
+
+        Args:
+            path: SQLite database file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._seen_data_version = None
+        self._seen_version = None
+
+    def load_if_changed(self) -> Optional[Dict[str, Tuple[List[Dict[str, Any]], float]]]:
+        """
+        Load the stored catalogue if another process saved it since the last call.
+
+        Returns:
+            Same mapping as load(), or None if the catalogue is unchanged
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._seen_data_version:
+                return None
+            self._seen_data_version = data_version
+
+            row = self._conn.execute("SELECT version FROM catalogue_version").fetchone()
+            version = row[0] if row else 0
+            if version == self._seen_version:
+                return None
+            self._seen_version = version
+        return self.load()
+
+    def load(self) -> Dict[str, Tuple[List[Dict[str, Any]], float]]:
+        """
+        Load the stored catalogue.
+
+        Returns:
+            Mapping of server name to (tool dicts, wall-clock time of discovery)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT server, tools, updated_at FROM tool_catalogue").fetchall()
+        return {server: (json.loads(tools), updated_at) for server, tools, updated_at in rows}
+
+    def save(self, server_tools: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        Replace the stored tools of the given servers in one transaction.
+
+        Args:
+            server_tools: Mapping of server name to tool dicts
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO tool_catalogue (server, tools, updated_at) VALUES (?, ?, ?)",
+                    [(server, json.dumps(tools), now) for server, tools in server_tools.items()],
+                )
+                version = self._conn.execute("INSERT INTO catalogue_version (id, version) VALUES (0, 1) ON CONFLICT(id) DO UPDATE SET version = version + 1 RETURNING version").fetchone()[0]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            # This worker already holds what it saved
+            self._seen_version = version
+
+    def try_acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Acquire or renew a named lease unless another owner holds an unexpired one.
+
+        Args:
+            name: Lease name
+            owner: Identifier of the acquiring worker
+            ttl: Seconds until the lease expires if it is not released
+
+        Returns:
+            True if the caller now holds the lease
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+                acquired = row is None or row[0] == owner or row[1] < now
+                if acquired:
+                    self._conn.execute("INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)", (name, owner, now + ttl))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return acquired
+
+    def release_lease(self, name: str, owner: str) -> None:
+        """Release a lease held by the given owner."""
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,223 @@
+"""
+Tool result cache repository for reusing results of idempotent MCP tool calls.
+
+Which tools are cacheable, and for how long, is declared per server with the
+`tool_cache` setting in config/mcp_servers.py. Keys combine server, tool and the
+canonicalized arguments, so argument order and formatting do not matter.
+
+Configuration via environment variables:
+- TOOL_RESULT_CACHE_ENABLED: Enable the cache (default false)
+- TOOL_RESULT_CACHE_MAX_ENTRIES: In-memory LRU capacity (default 1000)
+
+Concurrent identical calls are coalesced so that a single tool call serves all of them.
+
+Entries are tagged with their server's invalidation generation when the call starts,
+and only entries of the current generation are served. A result that was being computed
+while a write invalidated its server is therefore never reused. In shared-state mode
+the generations live in SQLite, so a write on one worker invalidates every worker.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from github_mingzilla.llm_mcp.config import get_shared_state_path
+from github_mingzilla.llm_mcp.repositories.sqlite_tool_cache_generation_store import SqliteToolCacheGenerationStore
+from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
+from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+
+# (local generation, shared generation) of a server
+Generation = Tuple[int, int]
+
+
+class _ToolResultCacheRepository(ClosableService):
+    """
+    In-memory LRU cache of tool results with per-entry TTLs.
+    """
+
+    def __init__(self):
+        """Initialize the cache from environment configuration."""
+        self.enabled = os.getenv("TOOL_RESULT_CACHE_ENABLED", "false").lower() == "true"
+        self.max_entries = int(os.getenv("TOOL_RESULT_CACHE_MAX_ENTRIES", "1000"))
+
+        # key -> (server, generation, expires_at, result)
+        self._entries: "OrderedDict[str, Tuple[str, Generation, float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Generation], asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "invalidations": 0, "stale_stores": 0}
+
+        # Invalidation generations: local ones are bumped synchronously by this worker,
+        # shared ones (shared-state mode only) by any worker
+        self._local_generations: Dict[str, int] = {}
+        self._shared_generations: Dict[str, int] = {}
+        generation_path = get_shared_state_path("tool_result_cache.db")
+        self._generation_store = SqliteToolCacheGenerationStore(generation_path) if generation_path else None
+
+    @staticmethod
+    def build_key(server: str, tool: str, arguments: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a tool call.
+
+        Args:
+            server: Server name providing the tool
+            tool: Tool name
+            arguments: Parsed tool arguments
+
+        Returns:
+            Key identifying the call
+        """
+        canonical_arguments = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return f"{server}/{tool}/{hashlib.sha256(canonical_arguments.encode('utf-8')).hexdigest()}"
+
+    async def get_or_compute(self, key: str, server: str, ttl: float, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached result for a key, calling the tool and storing its result on a miss.
+
+        Concurrent callers with the same key and generation wait for the first caller's
+        tool call instead of starting their own. Failures are not cached, and neither is
+        a result whose server was invalidated while it was being computed.
+
+        Args:
+            key: Cache key from build_key()
+            server: Server name, used to invalidate its entries
+            ttl: Seconds the result stays valid (0 = coalesce concurrent calls only)
+            compute: Coroutine factory that performs the tool call
+
+        Returns:
+            Cached or freshly computed tool result
+        """
+        generation = await self._sync_generation(server)
+        inflight_key = (key, generation)
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] == generation and entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[3]
+                del self._entries[key]
+
+            inflight = self._inflight.get(inflight_key)
+            if inflight is None:
+                break
+
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Retry only if the first caller was cancelled, not this one
+                if not inflight.cancelled():
+                    raise
+
+        self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(inflight_key, None)
+
+        future.set_result(result)
+        if ttl > 0:
+            if self._get_generation(server) == generation:
+                self._store(key, server, generation, ttl, result)
+            else:
+                self._stats["stale_stores"] += 1
+        return result
+
+    def _get_generation(self, server: str) -> Generation:
+        """Get the generation of a server as last seen by this worker."""
+        return self._local_generations.get(server, 0), self._shared_generations.get(server, 0)
+
+    async def _sync_generation(self, server: str) -> Generation:
+        """Pick up invalidations made by other workers, then return the current generation."""
+        if self._generation_store is not None:
+            shared_generation = await asyncio.to_thread(self._generation_store.get, server)
+            # Generations only grow; a read that raced a local bump must not undo it
+            self._shared_generations[server] = max(self._shared_generations.get(server, 0), shared_generation)
+        return self._get_generation(server)
+
+    def _store(self, key: str, server: str, generation: Generation, ttl: float, result: Any) -> None:
+        """Insert an entry as most recently used and evict beyond capacity."""
+        self._entries[key] = (server, generation, time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def invalidate_server(self, server: str) -> int:
+        """
+        Drop the cached results of one server, e.g. after a call that may have changed its state.
+
+        Bumps the server's generation, so results of calls still in flight are not stored
+        either. In shared-state mode the other workers drop theirs on their next lookup.
+
+        Args:
+            server: Server name
+
+        Returns:
+            Number of local entries that were dropped
+        """
+        # Bump synchronously first so that no result computed before the write is stored
+        self._local_generations[server] = self._local_generations.get(server, 0) + 1
+        keys = [key for key, entry in self._entries.items() if entry[0] == server]
+        for key in keys:
+            del self._entries[key]
+        self._stats["invalidations"] += 1
+
+        if self._generation_store is not None:
+            try:
+                shared_generation = await asyncio.to_thread(self._generation_store.bump, server)
+                self._shared_generations[server] = max(self._shared_generations.get(server, 0), shared_generation)
+            except Exception as e:
+                print(f"Failed to share tool cache invalidation of {server}: {e}")
+        return len(keys)
+
+    def clear(self) -> int:
+        """
+        Clear the cache.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with configuration, occupancy and hit/miss counters
+        """
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        served = lookups - self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "shared": self._generation_store is not None,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+    async def disconnect(self):
+        """Close the shared generation store."""
+        if self._generation_store is not None:
+            self._generation_store.close()
+
+
+# Module-level singleton instance
+tool_result_cache_repo = _ToolResultCacheRepository()
+singleton_manager.register(tool_result_cache_repo)
@@ -5,14 +5,23 @@ Handles HTTP concerns for chat functionality, delegating business logic to ChatS
 """
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sse_starlette import EventSourceResponse
+from starlette.background import BackgroundTask, BackgroundTasks
 
-from github_mingzilla.llm_mcp.boundary_models import ApiChatRequest, ApiChatResponse
+from github_mingzilla.llm_mcp.boundary_models import ApiBatchChatRequest, ApiChatRequest, ApiChatResponse
+from github_mingzilla.llm_mcp.services.admission_control_service import AdmissionRejectedError
 from github_mingzilla.llm_mcp.services.chat_service import chat_service
+from github_mingzilla.llm_mcp.services.tool_orchestration_service import OrchestrationInProgressError
 
 router = APIRouter(prefix="/api/v1", tags=["chat"])
 
 
+def _admission_error(e: AdmissionRejectedError) -> HTTPException:
+    """Map an admission rejection to a 429/503 response telling the client when to retry."""
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
 @router.post("/chat", response_model=ApiChatResponse)
 async def chat(chat_request: ApiChatRequest):
     """
@@ -26,12 +35,31 @@ async def chat(chat_request: ApiChatRequest):
         response = await chat_service.handle_batch_chat(chat_request)
         return response
 
+    except AdmissionRejectedError as e:
+        raise _admission_error(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
 
+@router.post("/chat/batch")
+async def chat_batch(batch_request: ApiBatchChatRequest):
+    """
+    Bulk chat endpoint for offline jobs.
+    - Runs each request like /api/v1/chat, with bounded concurrency per provider
+    - Streams NDJSON, one line per request in completion order, carrying the request's index
+    - A failed request yields a line with its error and status code; the others are unaffected
+    """
+    try:
+        chat_service.validate_bulk_chat_request(batch_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    lines = (result.model_dump_json(exclude_none=True) + "\n" async for result in chat_service.handle_bulk_chat(batch_request))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
 @router.post("/chat/stream")
 async def chat_stream(chat_request: ApiChatRequest, request: Request):
     """
@@ -39,6 +67,7 @@ async def chat_stream(chat_request: ApiChatRequest, request: Request):
     - Always returns Server-Sent Events (SSE)
     - Returns real-time text chunks without tool orchestration
     - For tool-enabled chat, use /api/v1/chat/stream-tools endpoint
+    - With LLM_STREAM_PASSTHROUGH=true, upstream frames are forwarded as raw bytes
 
     Requires client to send: Accept: text/event-stream
     """
@@ -52,9 +81,22 @@ async def chat_stream(chat_request: ApiChatRequest, request: Request):
         if chat_request.selected_tools:
             raise HTTPException(status_code=400, detail="Tools are not supported on this endpoint. Use /api/v1/chat/stream-tools for tool-enabled chat.")
 
+        # Passthrough mode writes upstream SSE bytes directly to the ASGI response
+        if chat_service.stream_passthrough:
+            stream, ticket = await chat_service.admit_stream(chat_request, chat_service.handle_streaming_chat_passthrough(chat_request))
+            return StreamingResponse(
+                stream,
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                background=BackgroundTask(ticket.release),
+            )
+
         # Handle streaming chat
-        return EventSourceResponse(chat_service.handle_streaming_chat(chat_request))
+        stream, ticket = await chat_service.admit_stream(chat_request, chat_service.handle_streaming_chat(chat_request))
+        return EventSourceResponse(stream, background=BackgroundTask(ticket.release))
 
+    except AdmissionRejectedError as e:
+        raise _admission_error(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -68,6 +110,7 @@ async def chat_stream_tools(chat_request: ApiChatRequest, request: Request):
     - Always returns Server-Sent Events (SSE)
     - Requires tools to be specified in selected_tools
     - SSE events contain complete JSON responses with tool execution results
+    - Returns 409 while another tool orchestration of the same session is running
 
     Requires client to send: Accept: text/event-stream
     """
@@ -75,11 +118,26 @@ async def chat_stream_tools(chat_request: ApiChatRequest, request: Request):
         # Validate Accept header and request
         accept_header = request.headers.get("accept", "")
         chat_service.validate_sse_headers(accept_header)
+        await chat_service.preload_history(chat_request)
         chat_service.validate_chat_request(chat_request, require_tools=True)
 
-        # Handle tool orchestration
-        return EventSourceResponse(chat_service.handle_tool_orchestration(chat_request))
-
+        # Handle tool orchestration, one at a time per session
+        claim = chat_service.claim_tool_session(chat_request)
+        try:
+            stream, ticket = await chat_service.admit_stream(chat_request, chat_service.handle_tool_orchestration(chat_request, claim))
+        except BaseException:
+            claim.release()
+            raise
+
+        background = BackgroundTasks()
+        background.add_task(ticket.release)
+        background.add_task(claim.release)
+        return EventSourceResponse(stream, background=background)
+
+    except OrchestrationInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except AdmissionRejectedError as e:
+        raise _admission_error(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
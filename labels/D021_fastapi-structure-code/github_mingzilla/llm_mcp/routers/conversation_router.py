@@ -15,6 +15,7 @@ router = APIRouter(prefix="/api/v1", tags=["conversation"])
 async def get_conversation(session_id: str):
     """Get conversation history for a session."""
     try:
+        await conversation_service.preload(session_id)
         conversation_data = conversation_service.get_conversation_details(session_id)
 
         return conversation_data
@@ -55,6 +56,7 @@ async def add_message_to_conversation(session_id: str, request: Request):
     try:
         body = await request.json()
 
+        await conversation_service.preload(session_id)
         result = conversation_service.add_message_to_conversation(session_id, body)
 
         return result
@@ -0,0 +1,25 @@
+"""
+FastAPI router for debug endpoints.
+
+Exposes recently recorded request traces for diagnosing latency on a live server.
+"""
+
+from fastapi import APIRouter, Query
+
+from github_mingzilla.llm_mcp.util.tracing import tracer
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/traces")
+async def recent_traces(limit: int = Query(50, ge=1, le=1000)):
+    """
+    Dump the most recent sampled traces as JSON, newest first.
+
+    Sampling is controlled by TRACE_SAMPLE_RATE; unsampled requests are not recorded.
+    """
+    return {"stats": tracer.get_stats(), "traces": tracer.get_recent_traces(limit)}
+
+
+# Module-level singleton instance
+debug_router = router
@@ -5,6 +5,7 @@ Handles HTTP concerns for health check functionality, delegating business logic
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 
 from github_mingzilla.llm_mcp.services.health_service import health_service
 
@@ -36,18 +37,17 @@ async def basic_health_check():
         return {"status": "unhealthy", "error": f"Basic health check error: {str(e)}", "basic_check": True}
 
 
-@router.get("/health/{component}")
-async def component_health_check(component: str):
-    """Get health status for a specific component."""
-    try:
-        component_status = await health_service.get_component_health(component)
+@router.get("/health/live")
+async def liveness_check():
+    """Liveness probe: 200 whenever the process can answer; never touches upstreams."""
+    return health_service.get_liveness_status()
 
-        return component_status
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Component health check error: {str(e)}")
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 200 once warm-up has finished and an LLM endpoint is reachable, 503 before."""
+    readiness = health_service.get_readiness_status()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
 
 
 @router.get("/health/summary")
@@ -62,5 +62,19 @@ async def health_summary():
         return {"service": "health_service", "status": "error", "error": str(e)}
 
 
+@router.get("/health/{component}")
+async def component_health_check(component: str):
+    """Get health status for a specific component."""
+    try:
+        component_status = await health_service.get_component_health(component)
+
+        return component_status
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Component health check error: {str(e)}")
+
+
 # Module-level singleton instance
 health_router = router
@@ -0,0 +1,22 @@
+"""
+FastAPI router for the metrics endpoint.
+
+Handles HTTP concerns for metrics exposition, delegating rendering to MetricsService.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from github_mingzilla.llm_mcp.services.metrics_service import metrics_service
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of gateway and upstream latency metrics."""
+    return PlainTextResponse(metrics_service.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Module-level singleton instance
+metrics_router = router
@@ -24,5 +24,15 @@ async def get_tools():
         raise HTTPException(status_code=500, detail=f"Failed to get tools: {str(e)}")
 
 
+@router.get("/tools/orchestrations/{session_id}")
+async def get_orchestration_status(session_id: str):
+    """Get the tool orchestration progress of a session, e.g. before resuming it with an empty message."""
+    try:
+        return tool_orchestration_service.get_orchestration_status(session_id)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get orchestration status: {str(e)}")
+
+
 # Module-level singleton instance
 tool_router = router
@@ -0,0 +1,305 @@
+"""
+Admission control service for shedding load before it reaches the LLM providers.
+
+Each LLM call holds a slot of its provider and of its model. Requests that find no free
+slot wait in one bounded FIFO queue until a slot frees up or their deadline passes.
+When the queue is full, requests are rejected immediately so clients can back off.
+
+Configuration via environment variables:
+- ADMISSION_CONTROL_ENABLED: Enable admission control (default false, i.e. unlimited)
+- ADMISSION_MAX_CONCURRENT_PER_PROVIDER: Slots per provider (default 32)
+- ADMISSION_MAX_CONCURRENT_PER_MODEL: Slots per model (default 16)
+- ADMISSION_MODEL_LIMITS: Per-model overrides, e.g. "tinyllama=2,gpt-4o=32"
+- ADMISSION_MAX_QUEUE: Requests allowed to wait for a slot (default 64)
+- ADMISSION_QUEUE_TIMEOUT: Seconds a request may wait for a slot (default 15)
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Deque, Dict, List, Optional, TypeVar
+
+from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+
+T = TypeVar("T")
+
+# Number of recent wait and hold times kept for percentiles and Retry-After estimates
+_SAMPLE_WINDOW = 1000
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request cannot be admitted; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        """
+        Initialize the error.
+
+        Args:
+            message: Human-readable reason
+            status_code: HTTP status to return (429 queue full, 503 deadline passed)
+            retry_after: Seconds the client should wait before retrying
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """Slot held by an admitted request; releasing it more than once is a no-op."""
+
+    def __init__(self, service: Optional["_AdmissionControlService"], provider: str, model: str):
+        self._service = service
+        self.provider = provider
+        self.model = model
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        """Return the slot and admit waiting requests."""
+        if not self._released:
+            self._released = True
+            if self._service is not None:
+                self._service._release(self)
+
+
+class _Waiter:
+    """Queued request waiting for a slot."""
+
+    __slots__ = ("provider", "model", "future", "enqueued_at")
+
+    def __init__(self, provider: str, model: str, future: asyncio.Future):
+        self.provider = provider
+        self.model = model
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class _AdmissionControlService:
+    """
+    Service for per-provider and per-model concurrency limits with a bounded wait queue.
+    """
+
+    def __init__(self):
+        """Initialize admission control from environment configuration."""
+        self.enabled = os.getenv("ADMISSION_CONTROL_ENABLED", "false").lower() == "true"
+        self.max_per_provider = int(os.getenv("ADMISSION_MAX_CONCURRENT_PER_PROVIDER", "32"))
+        self.max_per_model = int(os.getenv("ADMISSION_MAX_CONCURRENT_PER_MODEL", "16"))
+        self.model_limits = self._parse_limits(os.getenv("ADMISSION_MODEL_LIMITS", ""))
+        self.max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+        self.queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "15"))
+
+        self._active_by_provider: Dict[str, int] = {}
+        self._active_by_model: Dict[str, int] = {}
+        self._waiters: Deque[_Waiter] = deque()
+        self._wait_times: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self._hold_times: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "cancelled_while_queued": 0, "rejected_optional": 0, "max_queue_depth": 0}
+
+    @staticmethod
+    def _parse_limits(value: str) -> Dict[str, int]:
+        """Parse "model=limit" pairs separated by commas."""
+        limits = {}
+        for pair in value.split(","):
+            if "=" in pair:
+                model, limit = pair.rsplit("=", 1)
+                limits[model.strip()] = int(limit)
+        return limits
+
+    async def acquire(self, model: Optional[str]) -> AdmissionTicket:
+        """
+        Acquire a slot for an LLM call, waiting in the queue if necessary.
+
+        Args:
+            model: Requested model name (None = default model)
+
+        Returns:
+            Ticket that must be released when the call (or stream) ends
+
+        Raises:
+            AdmissionRejectedError: If the queue is full (429) or the deadline passed (503)
+        """
+        llm_model = LlmModel.get_by_model(model)
+        provider, model_name = llm_model.provider, llm_model.model_name
+
+        if not self.enabled:
+            return AdmissionTicket(None, provider, model_name)
+
+        # Queued requests go first, so a free slot is only taken directly when nobody waits
+        if not self._waiters and self._has_capacity(provider, model_name):
+            self._wait_times.append(0.0)
+            return self._admit(provider, model_name)
+
+        if len(self._waiters) >= self.max_queue:
+            self._stats["rejected_queue_full"] += 1
+            raise AdmissionRejectedError(f"Server busy: admission queue is full ({self.max_queue} waiting)", 429, self._estimate_retry_after())
+
+        waiter = _Waiter(provider, model_name, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            # A slot may have been granted just as the deadline passed
+            if waiter.future.done() and not waiter.future.cancelled():
+                return waiter.future.result()
+            self._abandon(waiter)
+            self._stats["rejected_timeout"] += 1
+            raise AdmissionRejectedError(f"Server busy: no capacity for model '{model_name}' within {self.queue_timeout:g}s", 503, self._estimate_retry_after())
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                waiter.future.result().release()
+            else:
+                self._abandon(waiter)
+            self._stats["cancelled_while_queued"] += 1
+            raise
+
+    def try_acquire(self, model: Optional[str]) -> Optional[AdmissionTicket]:
+        """
+        Take a slot only if one is free right away, without queueing.
+
+        For optional extra calls, such as hedged backups, which should neither wait nor
+        get ahead of queued requests.
+
+        Args:
+            model: Requested model name (None = default model)
+
+        Returns:
+            Ticket that must be released when the call ends, or None if there is no free slot
+        """
+        llm_model = LlmModel.get_by_model(model)
+        provider, model_name = llm_model.provider, llm_model.model_name
+
+        if not self.enabled:
+            return AdmissionTicket(None, provider, model_name)
+        if self._waiters or not self._has_capacity(provider, model_name):
+            self._stats["rejected_optional"] += 1
+            return None
+        return self._admit(provider, model_name)
+
+    @asynccontextmanager
+    async def admit(self, model: Optional[str]) -> AsyncIterator[AdmissionTicket]:
+        """
+        Hold a slot for the duration of a block.
+
+        Args:
+            model: Requested model name (None = default model)
+
+        Yields:
+            Ticket for the held slot
+
+        Raises:
+            AdmissionRejectedError: If the request cannot be admitted
+        """
+        ticket = await self.acquire(model)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    async def release_after(self, stream: AsyncGenerator[T, None], ticket: AdmissionTicket) -> AsyncGenerator[T, None]:
+        """
+        Forward a stream and release its ticket when the stream ends, fails or is cancelled.
+
+        Args:
+            stream: Stream produced under the ticket
+            ticket: Ticket to release afterwards
+
+        Yields:
+            Items of the wrapped stream
+        """
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            ticket.release()
+
+    def _has_capacity(self, provider: str, model: str) -> bool:
+        """Check whether both the provider and the model have a free slot."""
+        model_limit = self.model_limits.get(model, self.max_per_model)
+        return self._active_by_provider.get(provider, 0) < self.max_per_provider and self._active_by_model.get(model, 0) < model_limit
+
+    def _admit(self, provider: str, model: str) -> AdmissionTicket:
+        """Take a slot of the provider and the model."""
+        self._active_by_provider[provider] = self._active_by_provider.get(provider, 0) + 1
+        self._active_by_model[model] = self._active_by_model.get(model, 0) + 1
+        self._stats["admitted"] += 1
+        return AdmissionTicket(self, provider, model)
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        """Return a ticket's slots and hand them to waiting requests."""
+        self._active_by_provider[ticket.provider] -= 1
+        self._active_by_model[ticket.model] -= 1
+        self._hold_times.append(time.monotonic() - ticket.admitted_at)
+        self._grant_waiters()
+
+    def _grant_waiters(self) -> None:
+        """Admit queued requests in FIFO order, skipping those whose model or provider is still full."""
+        still_waiting: Deque[_Waiter] = deque()
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if waiter.future.done():
+                continue
+            if self._has_capacity(waiter.provider, waiter.model):
+                self._wait_times.append(time.monotonic() - waiter.enqueued_at)
+                waiter.future.set_result(self._admit(waiter.provider, waiter.model))
+            else:
+                still_waiting.append(waiter)
+        self._waiters = still_waiting
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up."""
+        waiter.future.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _estimate_retry_after(self) -> int:
+        """Estimate seconds until a slot frees up from recent slot hold times."""
+        if not self._hold_times:
+            return 1
+        average_hold = sum(self._hold_times) / len(self._hold_times)
+        return min(max(math.ceil(average_hold), 1), 60)
+
+    @staticmethod
+    def _percentile(samples: List[float], fraction: float) -> float:
+        """Get a percentile of sorted samples."""
+        return samples[min(int(len(samples) * fraction), len(samples) - 1)] if samples else 0.0
+
+    def get_stats(self) -> Dict:
+        """
+        Get admission statistics.
+
+        Returns:
+            Dictionary with limits, active slots, queue depth, counters and wait times
+        """
+        wait_times = sorted(self._wait_times)
+        return {
+            "enabled": self.enabled,
+            "max_per_provider": self.max_per_provider,
+            "max_per_model": self.max_per_model,
+            "model_limits": dict(self.model_limits),
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "queue_depth": len(self._waiters),
+            "active_by_provider": {provider: count for provider, count in self._active_by_provider.items() if count},
+            "active_by_model": {model: count for model, count in self._active_by_model.items() if count},
+            "wait_time_ms": {
+                "avg": round(sum(wait_times) / len(wait_times) * 1000, 2) if wait_times else 0.0,
+                "p50": round(self._percentile(wait_times, 0.5) * 1000, 2),
+                "p95": round(self._percentile(wait_times, 0.95) * 1000, 2),
+                "max": round(wait_times[-1] * 1000, 2) if wait_times else 0.0,
+            },
+            **self._stats,
+        }
+
+
+# Module-level singleton instance
+admission_control_service = _AdmissionControlService()
+singleton_manager.register(admission_control_service)
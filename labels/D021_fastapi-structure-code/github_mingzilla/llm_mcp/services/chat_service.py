@@ -4,14 +4,30 @@ Chat service for handling chat business logic.
 Coordinates between LLM clients, chat history repository, and tool orchestration.
 """
 
+import asyncio
+import json
+import os
+import time
 import uuid
-from typing import AsyncGenerator
+from collections import deque
+from typing import AsyncGenerator, Deque, Dict, Optional, Tuple, TypeVar
 
-from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage, ApiChatRequest, ApiChatResponse
+from github_mingzilla.llm_mcp.boundary_models import ApiBatchChatRequest, ApiBatchChatResult, ApiChatMessage, ApiChatRequest, ApiChatResponse, DomainOrchestrationEvent, LlmResponse
 from github_mingzilla.llm_mcp.clients.llm_client import llm_client
 from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
 from github_mingzilla.llm_mcp.repositories.chat_history_repository import chat_history_repo
+from github_mingzilla.llm_mcp.repositories.completion_cache_repository import completion_cache_repo
+from github_mingzilla.llm_mcp.repositories.semantic_cache_repository import semantic_cache_repo
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.services.admission_control_service import AdmissionRejectedError, AdmissionTicket, admission_control_service
+from github_mingzilla.llm_mcp.services.tool_orchestration_service import OrchestrationClaim, tool_orchestration_service
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
+from github_mingzilla.llm_mcp.util.metrics import GATEWAY_TTFT_SECONDS
+from github_mingzilla.llm_mcp.util.sse_util import DeltaContentAccumulator
+from github_mingzilla.llm_mcp.util.tracing import tracer
+
+T = TypeVar("T")
 
 
 class _ChatService:
@@ -24,6 +40,14 @@ class _ChatService:
         self.llm_client = llm_client
         self.mcp_client = mcp_client
         self.chat_history_repo = chat_history_repo
+        self.completion_cache_repo = completion_cache_repo
+        self.semantic_cache_repo = semantic_cache_repo
+        self.admission_control_service = admission_control_service
+        # Passthrough mode forwards upstream SSE bytes without per-chunk decode/encode
+        self.stream_passthrough = os.getenv("LLM_STREAM_PASSTHROUGH", "false").lower() == "true"
+        # Bulk chat limits
+        self.bulk_max_requests = int(os.getenv("CHAT_BATCH_MAX_REQUESTS", "10000"))
+        self.bulk_concurrency_per_provider = int(os.getenv("CHAT_BATCH_CONCURRENCY_PER_PROVIDER", "8"))
 
     async def handle_batch_chat(self, chat_request: ApiChatRequest) -> ApiChatResponse:
         """
@@ -36,34 +60,148 @@ class _ChatService:
             Complete chat response
 
         Raises:
+            AdmissionRejectedError: If the LLM call cannot be admitted under current load
             Exception: If chat processing fails
         """
-        session_id = chat_request.session_id or str(uuid.uuid4())
-        user_message = ApiChatMessage(role="user", content=chat_request.message)
+        with tracer.start_trace("chat.batch", model=chat_request.model) as span:
+            session_id = chat_request.session_id or str(uuid.uuid4())
+            user_message = ApiChatMessage(role="user", content=chat_request.message)
 
-        # Save user message and get conversation history
-        messages = self.chat_history_repo.save_message_and_get_history(session_id, user_message)
+            # Build the prompt from the history plus the user message, which is only saved once
+            # it has a response, so a rejected or failed LLM call leaves no orphaned user turn
+            await self.preload_history(chat_request)
+            history = self.chat_history_repo.find_conversation_by_id(session_id)
+            if history:
+                self.chat_history_repo.close_unanswered_tool_calls(session_id)
+            messages = [*(history or []), user_message]
+
+            # Get LLM response without tools (batch mode doesn't support tools)
+            openai_messages = (self.chat_history_repo.get_openai_messages(session_id) if history else []) + LlmOpenaiUtil.chat_messages_to_openai_format([user_message])
+
+            # Only upstream calls hold an admission slot; cache hits are served regardless of load
+            async def invoke_llm() -> LlmResponse:
+                async with self.admission_control_service.admit(chat_request.model):
+                    return await self.llm_client.invoke(messages=messages, model=chat_request.model, mcp_tools=None, openai_messages=openai_messages, temperature=chat_request.temperature, session_id=session_id)
+
+            model_name = LlmModel.get_by_model(chat_request.model).model_name
+
+            # Standalone questions may be answered from a cached response to a paraphrase
+            question = self.semantic_cache_repo.get_cacheable_question(messages, chat_request.temperature)
+            llm_response = await self.semantic_cache_repo.lookup(model_name, question) if question else None
+            span.set_attribute("semantic_cache_hit", llm_response is not None)
+
+            if llm_response is None:
+                # Deterministic requests may be answered from the completion cache
+                if self.completion_cache_repo.is_cacheable(chat_request.temperature):
+                    cache_key = self.completion_cache_repo.build_key(model_name, openai_messages, {"temperature": chat_request.temperature})
+                    llm_response = await self.completion_cache_repo.get_or_compute(cache_key, invoke_llm)
+                else:
+                    llm_response = await invoke_llm()
+
+                if question:
+                    await self.semantic_cache_repo.store(model_name, question, llm_response)
+            response_content = llm_response.content or ""
+
+            # Save the turn
+            assistant_message = ApiChatMessage(role="assistant", content=response_content)
+            self.chat_history_repo.save_message(session_id, user_message)
+            self.chat_history_repo.save_message(session_id, assistant_message)
+
+            return ApiChatResponse(
+                response=response_content,
+                session_id=session_id,
+                model=llm_response.model or "",
+                usage=llm_response.usage,
+                tool_calls=None,  # Batch mode doesn't support tools
+            )
 
-        # Get LLM response without tools (batch mode doesn't support tools)
-        llm_response = await self.llm_client.invoke(messages=messages, model=chat_request.model, mcp_tools=None)
-        response_content = llm_response.content or ""
+    async def handle_bulk_chat(self, batch_request: ApiBatchChatRequest) -> AsyncGenerator[ApiBatchChatResult, None]:
+        """
+        Handle a bulk chat request, yielding results in completion order.
 
-        # Save assistant response
-        assistant_message = ApiChatMessage(role="assistant", content=response_content)
-        self.chat_history_repo.save_message(session_id, assistant_message)
+        Each request runs like a batch chat request. Requests are grouped by provider and
+        every provider gets its own bounded pool of workers, so a slow provider does not
+        hold up requests for another one. A failed request yields a result with its error
+        and does not affect the others.
+
+        Args:
+            batch_request: Chat requests and optional concurrency limit
+
+        Yields:
+            One result per request, carrying the request's index
+        """
+        concurrency = min(batch_request.max_concurrency or self.bulk_concurrency_per_provider, self.bulk_concurrency_per_provider)
+        pending_by_provider: Dict[str, Deque[int]] = {}
+        for index, chat_request in enumerate(batch_request.requests):
+            provider = LlmModel.get_by_model(chat_request.model).provider
+            pending_by_provider.setdefault(provider, deque()).append(index)
 
-        return ApiChatResponse(
-            response=response_content,
-            session_id=session_id,
-            model=llm_response.model or "",
-            usage=llm_response.usage,
-            tool_calls=None,  # Batch mode doesn't support tools
-        )
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker(pending: Deque[int]):
+            while pending:
+                index = pending.popleft()
+                await results.put(await self._run_bulk_item(index, batch_request.requests[index]))
+
+        workers = [asyncio.create_task(worker(pending)) for pending in pending_by_provider.values() for _ in range(min(concurrency, len(pending)))]
+        try:
+            for _ in batch_request.requests:
+                yield await results.get()
+        finally:
+            # Client disconnected or all results sent; stop whatever is still running
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _run_bulk_item(self, index: int, chat_request: ApiChatRequest) -> ApiBatchChatResult:
+        """Run one request of a bulk chat, mapping failures to the status the chat endpoint would return."""
+        try:
+            self.validate_chat_request(chat_request, require_tools=False)
+            return ApiBatchChatResult(index=index, response=await self.handle_batch_chat(chat_request))
+        except AdmissionRejectedError as e:
+            return ApiBatchChatResult(index=index, error=str(e), status_code=e.status_code)
+        except ValueError as e:
+            return ApiBatchChatResult(index=index, error=str(e), status_code=400)
+        except Exception as e:
+            return ApiBatchChatResult(index=index, error=f"Chat error: {str(e)}", status_code=500)
+
+    async def preload_history(self, chat_request: ApiChatRequest) -> None:
+        """
+        Load the persisted history of the request's session without blocking the event loop.
+
+        Args:
+            chat_request: Request whose session is about to be read
+        """
+        if chat_request.session_id:
+            await self.chat_history_repo.preload(chat_request.session_id)
+
+    async def admit_stream(self, chat_request: ApiChatRequest, stream: AsyncGenerator[T, None]) -> Tuple[AsyncGenerator[T, None], AdmissionTicket]:
+        """
+        Admit a streaming request before its response starts.
+
+        The slot is held for the whole stream, since the upstream call runs until the
+        stream ends, and is released when the returned stream finishes or is cancelled.
+
+        Args:
+            chat_request: Chat request to admit
+            stream: Unstarted stream produced by one of the handle_* methods
+
+        Returns:
+            Tuple of the wrapped stream and its ticket (release it if the stream never starts)
+
+        Raises:
+            AdmissionRejectedError: If the request cannot be admitted under current load
+        """
+        ticket = await self.admission_control_service.acquire(chat_request.model)
+        return self.admission_control_service.release_after(stream, ticket), ticket
 
     async def handle_streaming_chat(self, chat_request: ApiChatRequest) -> AsyncGenerator[dict, None]:
         """
         Handle streaming chat request without tools.
 
+        When `persist_response` is set, delta content is accumulated server-side and the
+        assistant reply is saved to history when the stream ends or is cancelled.
+
         Args:
             chat_request: Chat request with message and configuration
 
@@ -73,46 +211,122 @@ class _ChatService:
         Raises:
             Exception: If streaming fails
         """
-        import asyncio
-        import json
-
+        started = time.perf_counter()
         session_id = chat_request.session_id or str(uuid.uuid4())
+        accumulator = DeltaContentAccumulator() if chat_request.persist_response else None
+        chunk_count = 0
+        model = chat_request.model or "tinyllama"
+
+        with tracer.start_trace("chat.stream", session_id=session_id[:8], model=model) as span:
+            try:
+                await self.preload_history(chat_request)
+                user_message = ApiChatMessage(role="user", content=chat_request.message)
+                self.chat_history_repo.close_unanswered_tool_calls(session_id)
+                conversation = self.chat_history_repo.save_message_and_get_history(session_id, user_message)
+
+                openai_messages = self.chat_history_repo.get_openai_messages(session_id)
+                async for raw_chunk in self.llm_client.raw_stream_openai_format(conversation, model, openai_messages=openai_messages, temperature=chat_request.temperature, session_id=session_id):
+                    chunk_count += 1
+                    if chunk_count == 1:
+                        GATEWAY_TTFT_SECONDS.observe(time.perf_counter() - started, model, "stream")
+                        span.add_event("first_chunk_sent")
+                    if accumulator is not None:
+                        accumulator.feed(raw_chunk)
+                    yield {
+                        "event": "chunk",
+                        "data": raw_chunk,  # Forward raw JSON string
+                    }
+
+            except asyncio.CancelledError:
+                span.add_event("client_disconnected")
+                raise  # Re-raise to properly handle the cancellation
+            except NotImplementedError as e:
+                print(f"❌ NotImplementedError in stream (session: {session_id[:8]}...): {str(e)}")
+                yield {"event": "error", "data": json.dumps({"error": str(e)})}
+            except Exception as e:
+                print(f"❌ Stream error (session: {session_id[:8]}...): {str(e)}")
+                yield {"event": "error", "data": json.dumps({"error": f"Proxy stream error: {str(e)}", "session_id": session_id})}
+            finally:
+                span.set_attribute("chunks_sent", chunk_count)
+                self._save_accumulated_response(session_id, accumulator)
+
+    async def handle_streaming_chat_passthrough(self, chat_request: ApiChatRequest) -> AsyncGenerator[bytes, None]:
+        """
+        Handle streaming chat request without tools, forwarding raw SSE bytes.
 
-        try:
-            user_message = ApiChatMessage(role="user", content=chat_request.message)
-            conversation = self.chat_history_repo.save_message_and_get_history(session_id, user_message)
-            model = chat_request.model or "tinyllama"
+        Upstream frames are written to the response as-is instead of being wrapped in
+        dicts for sse-starlette to re-encode. `persist_response` is honoured the same way
+        as in `handle_streaming_chat`.
 
-            print(f"🔄 Starting stream for session {session_id[:8]}... (model: {model})")
-            chunk_count = 0
+        Args:
+            chat_request: Chat request with message and configuration
 
-            async for raw_chunk in self.llm_client.raw_stream_openai_format(conversation, model):
-                chunk_count += 1
-                print(f"📤 Chunk {chunk_count} sent to client (session: {session_id[:8]}...)")
-                yield {
-                    "event": "chunk",
-                    "data": raw_chunk,  # Forward raw JSON string
-                }
+        Yields:
+            Ready-to-send SSE event bytes
 
-            print(f"✅ Stream completed normally - {chunk_count} chunks sent (session: {session_id[:8]}...)")
+        Raises:
+            Exception: If streaming fails
+        """
+        started = time.perf_counter()
+        session_id = chat_request.session_id or str(uuid.uuid4())
+        accumulator = DeltaContentAccumulator() if chat_request.persist_response else None
+        chunk_count = 0
+        model = chat_request.model or "tinyllama"
+
+        with tracer.start_trace("chat.stream_passthrough", session_id=session_id[:8], model=model) as span:
+            try:
+                await self.preload_history(chat_request)
+                user_message = ApiChatMessage(role="user", content=chat_request.message)
+                self.chat_history_repo.close_unanswered_tool_calls(session_id)
+                conversation = self.chat_history_repo.save_message_and_get_history(session_id, user_message)
+
+                openai_messages = self.chat_history_repo.get_openai_messages(session_id)
+                async for frames in self.llm_client.raw_stream_sse_bytes(conversation, model, openai_messages=openai_messages, temperature=chat_request.temperature, session_id=session_id):
+                    chunk_count += 1
+                    if chunk_count == 1:
+                        GATEWAY_TTFT_SECONDS.observe(time.perf_counter() - started, model, "passthrough")
+                        span.add_event("first_chunk_sent")
+                    if accumulator is not None:
+                        accumulator.feed(frames)
+                    yield frames
+
+            except asyncio.CancelledError:
+                span.add_event("client_disconnected")
+                raise  # Re-raise to properly handle the cancellation
+            except Exception as e:
+                print(f"❌ Passthrough stream error (session: {session_id[:8]}...): {str(e)}")
+                error_data = json.dumps({"error": f"Proxy stream error: {str(e)}", "session_id": session_id})
+                yield f"event: error\ndata: {error_data}\n\n".encode("utf-8")
+            finally:
+                span.set_attribute("writes_sent", chunk_count)
+                self._save_accumulated_response(session_id, accumulator)
+
+    def claim_tool_session(self, chat_request: ApiChatRequest) -> OrchestrationClaim:
+        """
+        Claim the session of a tool request before its stream starts.
 
-        except asyncio.CancelledError:
-            print(f"🛑 CLIENT DISCONNECTED - Stream cancelled after {chunk_count} chunks (session: {session_id[:8]}...)")
-            print("   This proves the server detected client disconnection and stopped processing!")
-            raise  # Re-raise to properly handle the cancellation
-        except NotImplementedError as e:
-            print(f"❌ NotImplementedError in stream (session: {session_id[:8]}...): {str(e)}")
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
-        except Exception as e:
-            print(f"❌ Stream error (session: {session_id[:8]}...): {str(e)}")
-            yield {"event": "error", "data": json.dumps({"error": f"Proxy stream error: {str(e)}", "session_id": session_id})}
+        A request without a session ID is assigned a new one here, so the claim and the
+        orchestration refer to the same session.
+
+        Args:
+            chat_request: Chat request with selected tools
+
+        Returns:
+            Claim to pass to handle_tool_orchestration() (release it if the stream never starts)
 
-    async def handle_tool_orchestration(self, chat_request: ApiChatRequest) -> AsyncGenerator[dict, None]:
+        Raises:
+            OrchestrationInProgressError: If the session already has an orchestration running
+        """
+        chat_request.session_id = chat_request.session_id or str(uuid.uuid4())
+        return tool_orchestration_service.claim_session(chat_request.session_id)
+
+    async def handle_tool_orchestration(self, chat_request: ApiChatRequest, claim: Optional[OrchestrationClaim] = None) -> AsyncGenerator[dict, None]:
         """
         Handle chat request with tool orchestration.
 
         Args:
             chat_request: Chat request with selected tools
+            claim: Claim on the session from claim_tool_session(), released when the stream ends
 
         Yields:
             SSE-formatted responses with tool orchestration results
@@ -122,40 +336,85 @@ class _ChatService:
         """
         session_id = chat_request.session_id or str(uuid.uuid4())
 
-        try:
-            user_message = ApiChatMessage(role="user", content=chat_request.message)
-            self.chat_history_repo.save_message(session_id, user_message)
-
-            # Get filtered tools
-            filtered_tools = await self.mcp_client.get_filtered_tools(chat_request.selected_tools)
-
-            # Import here to avoid circular imports
-            from github_mingzilla.llm_mcp.services.tool_orchestration_service import tool_orchestration_service
+        resume = not chat_request.message.strip()
+
+        with tracer.start_trace("chat.tools", session_id=session_id[:8], model=chat_request.model, stream_tool_calls=chat_request.stream_tool_calls, resume=resume):
+            try:
+                await self.preload_history(chat_request)
+                # An empty message resumes the orchestration checkpointed in the session's history
+                if not resume:
+                    user_message = ApiChatMessage(role="user", content=chat_request.message)
+                    self.chat_history_repo.close_unanswered_tool_calls(session_id)
+                    self.chat_history_repo.save_message(session_id, user_message)
+
+                # Get filtered tools
+                filtered_tools = await self.mcp_client.get_filtered_tools(chat_request.selected_tools)
+
+                tool_service = tool_orchestration_service
+                deadline = tool_service.get_deadline(chat_request.timeout)
+
+                # Overlapped mode - stream progress events while tools run during generation
+                if chat_request.stream_tool_calls:
+                    async for event in tool_service.orchestrate_tools_overlapped(session_id=session_id, model=chat_request.model, mcp_tools=filtered_tools, max_iterations=chat_request.max_iterations, deadline=deadline):
+                        yield self._orchestration_event_to_sse(event, session_id)
+                    return
+
+                # Progressive tool orchestration - yield each LLM response immediately
+                async for iteration_response in tool_service.orchestrate_tools_streaming(session_id=session_id, model=chat_request.model, mcp_tools=filtered_tools, deadline=deadline, max_iterations=chat_request.max_iterations):
+                    # Yield each LLM response as SSE event containing JSON
+                    chat_response = ApiChatResponse(
+                        response=iteration_response.get_status_text(),
+                        session_id=session_id,
+                        model=iteration_response.model,
+                        usage=iteration_response.usage,
+                        tool_calls=None,  # Tool calls handled separately in orchestration
+                    )
+
+                    with tracer.span("serialize"):
+                        data = chat_response.model_dump_json()
+
+                    yield {
+                        "event": "complete",
+                        "data": data,
+                    }
+
+            except Exception as e:
+                # Yield error as SSE event
+                yield {
+                    "event": "error",
+                    "data": f'{{"error": "Chat error: {str(e)}", "session_id": "{session_id}"}}',
+                }
+            finally:
+                if claim is not None:
+                    claim.release()
 
-            tool_service = tool_orchestration_service
+    def _orchestration_event_to_sse(self, event: DomainOrchestrationEvent, session_id: str) -> dict:
+        """
+        Convert an overlapped orchestration event to an SSE event.
 
-            # Progressive tool orchestration - yield each LLM response immediately
-            async for iteration_response in tool_service.orchestrate_tools_streaming(session_id=session_id, model=chat_request.model, mcp_tools=filtered_tools, iteration=0):
-                # Yield each LLM response as SSE event containing JSON
-                chat_response = ApiChatResponse(
-                    response=iteration_response.get_status_text(),
-                    session_id=session_id,
-                    model=iteration_response.model,
-                    usage=iteration_response.usage,
-                    tool_calls=None,  # Tool calls handled separately in orchestration
-                )
+        LLM responses keep the `complete` event format of the non-overlapped mode, so
+        existing clients keep working; progress events are passed through by name.
 
-                yield {
-                    "event": "complete",
-                    "data": chat_response.model_dump_json(),
-                }
+        Args:
+            event: Orchestration progress event
+            session_id: Session identifier
 
-        except Exception as e:
-            # Yield error as SSE event
-            yield {
-                "event": "error",
-                "data": f'{{"error": "Chat error: {str(e)}", "session_id": "{session_id}"}}',
-            }
+        Returns:
+            SSE-formatted dict with event and data keys
+        """
+        if event.event == "llm_response":
+            llm_response: LlmResponse = event.data["response"]
+            chat_response = ApiChatResponse(
+                response=llm_response.get_status_text(),
+                session_id=session_id,
+                model=llm_response.model or "",
+                usage=llm_response.usage,
+                tool_calls=llm_response.to_chat_message_dict(),
+            )
+            with tracer.span("serialize"):
+                return {"event": "complete", "data": chat_response.model_dump_json()}
+
+        return {"event": event.event, "data": json.dumps({**event.data, "session_id": session_id})}
 
     def validate_chat_request(self, chat_request: ApiChatRequest, require_tools: bool = False) -> None:
         """
@@ -169,7 +428,11 @@ class _ChatService:
             ValueError: If validation fails
         """
         if not chat_request.message or not chat_request.message.strip():
-            raise ValueError("Message cannot be empty")
+            if not require_tools:
+                raise ValueError("Message cannot be empty")
+            # Tool orchestration accepts an empty message to resume an existing session
+            if not chat_request.session_id or not self.chat_history_repo.conversation_exists(chat_request.session_id):
+                raise ValueError("Message cannot be empty unless resuming the tool orchestration of an existing session")
 
         if require_tools and not chat_request.selected_tools:
             raise ValueError("Tools are required for this endpoint")
@@ -177,6 +440,19 @@ class _ChatService:
         if not require_tools and chat_request.selected_tools:
             raise ValueError("Tools are not supported on this endpoint")
 
+    def validate_bulk_chat_request(self, batch_request: ApiBatchChatRequest) -> None:
+        """
+        Validate bulk chat request size; individual requests are validated as they run.
+
+        Args:
+            batch_request: Request to validate
+
+        Raises:
+            ValueError: If the batch has too many requests
+        """
+        if len(batch_request.requests) > self.bulk_max_requests:
+            raise ValueError(f"Batch has {len(batch_request.requests)} requests; the maximum is {self.bulk_max_requests}")
+
     def validate_sse_headers(self, accept_header: str) -> None:
         """
         Validate that client accepts Server-Sent Events.
@@ -190,6 +466,21 @@ class _ChatService:
         if "text/event-stream" not in accept_header:
             raise ValueError("Accept header must include 'text/event-stream'")
 
+    def _save_accumulated_response(self, session_id: str, accumulator: Optional[DeltaContentAccumulator]) -> None:
+        """
+        Save the server-side accumulated assistant reply once a stream ends or is cancelled.
+
+        Args:
+            session_id: Session identifier
+            accumulator: Accumulator fed during streaming, or None if persistence was not requested
+        """
+        if accumulator is None:
+            return
+
+        content = accumulator.get_content()
+        if content:
+            self.chat_history_repo.save_message(session_id, ApiChatMessage(role="assistant", content=content))
+
     def _extract_content_from_chunk(self, chunk: str) -> str:
         """
         Extract content from streaming chunk.
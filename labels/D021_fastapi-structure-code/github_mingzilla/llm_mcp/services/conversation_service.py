@@ -20,6 +20,15 @@ class _ConversationService:
         """Initialize conversation service with singleton repository."""
         self.chat_history_repo = chat_history_repo
 
+    async def preload(self, session_id: str) -> None:
+        """
+        Load a persisted conversation without blocking the event loop.
+
+        Args:
+            session_id: Session identifier
+        """
+        await self.chat_history_repo.preload(session_id)
+
     def get_conversation_details(self, session_id: str) -> Dict:
         """
         Get complete conversation details for a session.
@@ -0,0 +1,116 @@
+"""
+Background health prober.
+
+Checks the LLM endpoints and MCP servers on an interval with cheap requests (listing
+models, MCP ping) and keeps the latest results, so health endpoints are answered from
+memory instead of sending completions or rediscovering tools on every probe.
+
+Configuration via environment variables:
+- HEALTH_PROBE_INTERVAL: Seconds between probes; 0 probes only on demand (default 15)
+- HEALTH_PROBE_TIMEOUT: Seconds to wait for each endpoint or server (default 5)
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from github_mingzilla.llm_mcp.clients.llm_client import llm_client
+from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
+from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
+from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+
+
+class _HealthProberService(ClosableService):
+    """
+    Service that probes upstream dependencies in the background and caches the results.
+    """
+
+    def __init__(self):
+        """Initialize the prober from environment variables."""
+        self.llm_client = llm_client
+        self.mcp_client = mcp_client
+        self.interval = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))
+        self.timeout = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))
+
+        self._loop_task: Optional[asyncio.Task] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._results: Optional[Dict[str, Any]] = None
+        self._completed_at = 0.0
+
+    def start(self) -> None:
+        """Start probing in the background (no-op if the interval is 0 or already started)."""
+        if self.interval > 0 and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """Probe, then sleep for the interval, until cancelled."""
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    async def probe(self) -> Dict[str, Any]:
+        """
+        Probe all dependencies now; concurrent callers share one probe.
+
+        Returns:
+            Fresh probe results
+        """
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe())
+        return await asyncio.shield(self._probe_task)
+
+    async def _probe(self) -> Dict[str, Any]:
+        """Check LLM endpoints and MCP servers in parallel and store the results."""
+        started = time.perf_counter()
+        llm, mcp = await asyncio.gather(self.llm_client.probe_endpoints(self.timeout), self.mcp_client.ping_servers(self.timeout), return_exceptions=True)
+        if isinstance(llm, Exception):
+            print(f"LLM health probe failed: {llm}")
+            llm = {}
+        if isinstance(mcp, Exception):
+            print(f"MCP health probe failed: {mcp}")
+            mcp = {}
+
+        self._results = {
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "llm": llm,
+            "mcp": mcp,
+        }
+        self._completed_at = time.monotonic()
+        return self._results
+
+    async def get_results(self) -> Dict[str, Any]:
+        """
+        Get the latest probe results, probing first if none exist or they are stale.
+
+        Results count as stale after twice the interval, but never within 1 second, so
+        with background probing disabled (interval 0) one on-demand probe serves the
+        requests of the following second.
+
+        Returns:
+            Probe results with their age in seconds
+        """
+        age = time.monotonic() - self._completed_at
+        if self._results is None or age > max(self.interval * 2, 1.0):
+            await self.probe()
+            age = 0.0
+        return {**self._results, "age_seconds": round(age, 1)}
+
+    def is_ready(self) -> bool:
+        """Check whether the last probe reached at least one LLM endpoint (True while probing is disabled)."""
+        if self.interval <= 0:
+            return True
+        return self._results is not None and any(result["healthy"] for result in self._results["llm"].values())
+
+    async def disconnect(self):
+        """Stop background probing."""
+        for task in (self._loop_task, self._probe_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+# Module-level singleton instance
+health_prober_service = _HealthProberService()
+singleton_manager.register(health_prober_service)
@@ -1,15 +1,22 @@
 """
 Health service for coordinating system health checks.
 
-Aggregates health status from all singleton services and components.
+Aggregates health status from all singleton services and components. LLM and MCP health
+comes from the background prober's cached results, so health checks never send completions.
 """
 
-from typing import Dict
+from typing import Dict, Optional
 
 from github_mingzilla.llm_mcp.clients.llm_client import llm_client
 from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
 from github_mingzilla.llm_mcp.repositories.chat_history_repository import chat_history_repo
+from github_mingzilla.llm_mcp.repositories.completion_cache_repository import completion_cache_repo
+from github_mingzilla.llm_mcp.repositories.semantic_cache_repository import semantic_cache_repo
+from github_mingzilla.llm_mcp.repositories.tool_result_cache_repository import tool_result_cache_repo
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.services.admission_control_service import admission_control_service
+from github_mingzilla.llm_mcp.services.health_prober_service import health_prober_service
+from github_mingzilla.llm_mcp.services.warmup_service import warmup_service
 
 
 class _HealthService:
@@ -22,6 +29,12 @@ class _HealthService:
         self.llm_client = llm_client
         self.mcp_client = mcp_client
         self.chat_history_repo = chat_history_repo
+        self.completion_cache_repo = completion_cache_repo
+        self.semantic_cache_repo = semantic_cache_repo
+        self.tool_result_cache_repo = tool_result_cache_repo
+        self.admission_control_service = admission_control_service
+        self.warmup_service = warmup_service
+        self.health_prober_service = health_prober_service
 
     async def get_comprehensive_health_status(self) -> Dict:
         """
@@ -35,15 +48,23 @@ class _HealthService:
             "components": {},
         }
 
-        # Test LLM client health
-        llm_healthy = await self._check_llm_health(health_status)
-
-        # Test MCP client health
-        mcp_healthy = await self._check_mcp_health(health_status)
+        # LLM and MCP health from the latest background probe
+        probes = await self.health_prober_service.get_results()
+        health_status["checked_at"] = probes["checked_at"]
+        health_status["age_seconds"] = probes["age_seconds"]
+        llm_healthy = await self._check_llm_health(health_status, probes)
+        mcp_healthy = await self._check_mcp_health(health_status, probes)
 
         # Test repository health
         repo_healthy = self._check_repository_health(health_status)
 
+        # Report cache statistics (informational, does not affect overall health)
+        health_status["components"]["completion_cache"] = {"status": "enabled" if self.completion_cache_repo.enabled else "disabled", "stats": self.completion_cache_repo.get_stats()}
+        health_status["components"]["semantic_cache"] = {"status": "enabled" if self.semantic_cache_repo.enabled else "disabled", "stats": self.semantic_cache_repo.get_stats()}
+        health_status["components"]["tool_result_cache"] = {"status": "enabled" if self.tool_result_cache_repo.enabled else "disabled", "stats": self.tool_result_cache_repo.get_stats()}
+        health_status["components"]["admission_control"] = {"status": "enabled" if self.admission_control_service.enabled else "disabled", "stats": self.admission_control_service.get_stats()}
+        health_status["components"]["warmup"] = self.warmup_service.get_stats()
+
         # Calculate overall health
         overall_healthy = llm_healthy and mcp_healthy and repo_healthy
         health_status["status"] = "healthy" if overall_healthy else "unhealthy"
@@ -66,21 +87,49 @@ class _HealthService:
         except Exception as e:
             return {"status": "unhealthy", "error": str(e), "timestamp": self._get_current_timestamp(), "basic_check": True}
 
-    async def _check_llm_health(self, health_status: Dict) -> bool:
+    def get_liveness_status(self) -> Dict:
+        """
+        Get liveness status; the process is alive as long as it can answer.
+
+        Returns:
+            Liveness dictionary
+        """
+        return {"alive": True, "timestamp": self._get_current_timestamp()}
+
+    def get_readiness_status(self) -> Dict:
+        """
+        Get readiness status; the gateway is ready once startup warm-up has finished and
+        the last background probe reached an LLM endpoint.
+
+        Returns:
+            Readiness dictionary with the warm-up outcome
+        """
+        warmed_up = self.warmup_service.is_ready()
+        llm_reachable = self.health_prober_service.is_ready()
+        return {"ready": warmed_up and llm_reachable, "timestamp": self._get_current_timestamp(), "llm_reachable": llm_reachable, "warmup": self.warmup_service.get_stats()}
+
+    async def _check_llm_health(self, health_status: Dict, probes: Optional[Dict] = None) -> bool:
         """
         Check LLM client health and update status.
 
         Args:
             health_status: Health status dictionary to update
+            probes: Probe results (fetched from the prober if not given)
 
         Returns:
-            True if LLM client is healthy
+            True if at least one LLM endpoint answered the last probe
         """
         try:
-            llm_healthy = await self.llm_client.test_connection()
+            probes = probes or await self.health_prober_service.get_results()
+            llm_healthy = any(result["healthy"] for result in probes["llm"].values())
             health_status["components"]["llm"] = {
                 "status": "healthy" if llm_healthy else "unhealthy",
-                "details": "LLM client connection",
+                "details": "LLM endpoints (cached probe)",
+                "checked_at": probes["checked_at"],
+                "probes": probes["llm"],
+                "connections": self.llm_client.get_connection_stats(),
+                "hedging": self.llm_client.hedging.get_stats(),
+                "endpoints": self.llm_client.get_endpoint_stats(),
             }
             return llm_healthy
         except Exception as e:
@@ -90,28 +139,25 @@ class _HealthService:
             }
             return False
 
-    async def _check_mcp_health(self, health_status: Dict) -> bool:
+    async def _check_mcp_health(self, health_status: Dict, probes: Optional[Dict] = None) -> bool:
         """
         Check MCP client health and update status.
 
         Args:
             health_status: Health status dictionary to update
+            probes: Probe results (fetched from the prober if not given)
 
         Returns:
-            True if MCP client is healthy
+            True if at least one MCP server answered the last ping
         """
         try:
-            mcp_healthy = await self.mcp_client.test_connection()
-
-            # Try to get server URL for details (handle potential AttributeError)
-            try:
-                server_details = f"MCP server at {self.mcp_client.server_url}"
-            except AttributeError:
-                server_details = "MCP client connection"
-
+            probes = probes or await self.health_prober_service.get_results()
+            mcp_healthy = any(result["healthy"] for result in probes["mcp"].values())
             health_status["components"]["mcp"] = {
                 "status": "healthy" if mcp_healthy else "unhealthy",
-                "details": server_details,
+                "details": "MCP servers (cached probe)",
+                "checked_at": probes["checked_at"],
+                "servers": probes["mcp"],
             }
             return mcp_healthy
         except Exception as e:
@@ -133,11 +179,12 @@ class _HealthService:
         """
         try:
             # Basic repository functionality test
-            session_count = len(self.chat_history_repo.get_all_session_ids())
+            repo_stats = self.chat_history_repo.get_stats()
 
             health_status["components"]["repository"] = {
                 "status": "healthy",
-                "details": f"Chat history repository operational (active sessions: {session_count})",
+                "details": f"Chat history repository operational (active sessions: {repo_stats['sessions']})",
+                "stats": repo_stats,
             }
             return True
         except Exception as e:
@@ -186,7 +233,7 @@ class _HealthService:
         Returns:
             Basic health summary
         """
-        return {"service": "health_service", "status": "operational", "components_available": ["llm", "mcp", "repository"], "check_endpoints": {"comprehensive": "/health", "basic": "/health/basic", "component": "/health/{component}"}}
+        return {"service": "health_service", "status": "operational", "components_available": ["llm", "mcp", "repository"], "check_endpoints": {"comprehensive": "/health", "basic": "/health/basic", "live": "/health/live", "ready": "/health/ready", "component": "/health/{component}"}}
 
     def _get_current_timestamp(self) -> str:
         """
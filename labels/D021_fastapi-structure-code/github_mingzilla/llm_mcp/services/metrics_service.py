@@ -0,0 +1,78 @@
+"""
+Metrics service for the Prometheus `/metrics` endpoint.
+
+Renders the latency histograms recorded by the clients together with pool and queue
+gauges read from the singletons at scrape time.
+"""
+
+from typing import List
+
+from github_mingzilla.llm_mcp.clients.http_client import http_client
+from github_mingzilla.llm_mcp.clients.llm_client import llm_client
+from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
+from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.services.admission_control_service import admission_control_service
+from github_mingzilla.llm_mcp.util.metrics import metrics_registry, render_collected
+
+
+class _MetricsService:
+    """
+    Service for metrics exposition.
+    """
+
+    def __init__(self):
+        """Initialize metrics service with singleton dependencies."""
+        self.http_client = http_client
+        self.llm_client = llm_client
+        self.mcp_client = mcp_client
+        self.admission_control_service = admission_control_service
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text
+        """
+        lines = metrics_registry.render()
+        lines.extend(self._render_http_pool_gauges())
+        lines.extend(self._render_llm_endpoint_gauges())
+        lines.extend(self._render_mcp_pool_gauges())
+        lines.extend(self._render_admission_gauges())
+        return "\n".join(lines) + "\n"
+
+    def _render_http_pool_gauges(self) -> List[str]:
+        """Render per-host connection pool gauges of the shared HTTP transport."""
+        hosts = self.http_client.get_connection_stats()["hosts"]
+        lines = render_collected("http_pool_connections", "Open upstream HTTP connections per host.", "gauge", ("host",), (((host,), stats["connections"]) for host, stats in hosts.items()))
+        lines += render_collected("http_pool_idle_connections", "Idle keep-alive upstream HTTP connections per host.", "gauge", ("host",), (((host,), stats["idle_connections"]) for host, stats in hosts.items()))
+        lines += render_collected("http_pool_requests_total", "Requests sent per host since the pool was created.", "counter", ("host",), (((host,), stats["requests"]) for host, stats in hosts.items()))
+        return lines
+
+    def _render_llm_endpoint_gauges(self) -> List[str]:
+        """Render routing gauges of the Ollama endpoint pools."""
+        endpoints = self.llm_client.get_endpoint_stats()
+        lines = render_collected("llm_endpoint_outstanding_requests", "Requests in flight per Ollama endpoint.", "gauge", ("endpoint",), (((endpoint,), stats["outstanding"]) for endpoint, stats in endpoints.items()))
+        lines += render_collected("llm_endpoint_ejected", "Whether an Ollama endpoint is ejected after consecutive failures (1) or not (0).", "gauge", ("endpoint",), (((endpoint,), int(stats["ejected"])) for endpoint, stats in endpoints.items()))
+        lines += render_collected("llm_endpoint_errors_total", "Failed requests per Ollama endpoint.", "counter", ("endpoint",), (((endpoint,), stats["errors"]) for endpoint, stats in endpoints.items()))
+        return lines
+
+    def _render_mcp_pool_gauges(self) -> List[str]:
+        """Render per-server MCP session pool gauges."""
+        pools = self.mcp_client.get_pool_stats()
+        lines = render_collected("mcp_pool_idle_sessions", "Idle MCP sessions per server.", "gauge", ("server",), (((server,), stats["idle"]) for server, stats in pools.items()))
+        lines += render_collected("mcp_pool_in_use_sessions", "MCP sessions in use per server.", "gauge", ("server",), (((server,), stats["in_use"]) for server, stats in pools.items()))
+        return lines
+
+    def _render_admission_gauges(self) -> List[str]:
+        """Render admission queue and slot gauges."""
+        stats = self.admission_control_service.get_stats()
+        lines = render_collected("admission_queue_depth", "Requests waiting for an LLM slot.", "gauge", (), [((), stats["queue_depth"])])
+        lines += render_collected("admission_active_slots", "LLM slots in use per model.", "gauge", ("model",), (((model,), count) for model, count in stats["active_by_model"].items()))
+        lines += render_collected("admission_rejected_total", "Requests rejected since startup, by reason.", "counter", ("reason",), [(("queue_full",), stats["rejected_queue_full"]), (("timeout",), stats["rejected_timeout"])])
+        return lines
+
+
+# Module-level singleton instance
+metrics_service = _MetricsService()
+singleton_manager.register(metrics_service)
@@ -1,17 +1,52 @@
 """
 Tool orchestration service for managing complex tool workflows.
 
-Handles progressive tool orchestration with streaming responses.
+Handles progressive tool orchestration with streaming responses. Progress is
+checkpointed in the chat history, so an interrupted orchestration can be resumed.
+
+Configuration via environment variables:
+- TOOL_ORCHESTRATION_TIMEOUT: Default request-wide deadline in seconds covering every
+  LLM round and tool call of an orchestration (default 120, 0 = none)
+- TOOL_ORCHESTRATION_MAX_ITERATIONS: Default iteration budget, i.e. LLM rounds per user
+  message (default 5)
+- TOOL_ORCHESTRATION_MAX_STATES: Orchestration states kept for status queries (default 1000)
 """
 
+import asyncio
+import json
+import os
+import time
+from collections import Counter, OrderedDict
 from collections.abc import AsyncIterator
-from typing import List
+from typing import Dict, List, Optional
 
-from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage, DomainMcpTool, LlmResponse
+from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage, DomainMcpTool, DomainOrchestrationEvent, DomainOrchestrationIteration, DomainOrchestrationState, DomainToolExecutionRequest, LlmResponse, LlmToolCall
 from github_mingzilla.llm_mcp.clients.llm_client import llm_client
 from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
 from github_mingzilla.llm_mcp.repositories.chat_history_repository import chat_history_repo
 from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
+from github_mingzilla.llm_mcp.util.tool_call_assembler import ToolCallStreamAssembler
+
+
+class OrchestrationInProgressError(Exception):
+    """Raised when a session already has a tool orchestration running; maps to HTTP 409."""
+
+
+class OrchestrationClaim:
+    """Exclusive claim on the tool orchestration of a session; releasing it more than once is a no-op."""
+
+    def __init__(self, service: "_ToolOrchestrationService", session_id: str):
+        self._service = service
+        self.session_id = session_id
+        self._released = False
+
+    def release(self) -> None:
+        """Allow the next orchestration of the session to start."""
+        if not self._released:
+            self._released = True
+            self._service._release_session(self)
 
 
 class _ToolOrchestrationService:
@@ -24,72 +59,417 @@ class _ToolOrchestrationService:
         self.llm_client = llm_client
         self.mcp_client = mcp_client
         self.chat_history_repo = chat_history_repo
+        self.default_timeout = float(os.getenv("TOOL_ORCHESTRATION_TIMEOUT", "120"))
+        self.max_iterations = int(os.getenv("TOOL_ORCHESTRATION_MAX_ITERATIONS", "5"))
+        self.max_states = int(os.getenv("TOOL_ORCHESTRATION_MAX_STATES", "1000"))
+        self._states: "OrderedDict[str, DomainOrchestrationState]" = OrderedDict()
+        self._claims: Dict[str, OrchestrationClaim] = {}
+
+    def claim_session(self, session_id: str) -> OrchestrationClaim:
+        """
+        Claim a session for one tool orchestration at a time (within this process).
 
-    async def orchestrate_tools_streaming(self, session_id: str, model: str, mcp_tools: List[DomainMcpTool], iteration: int = 0) -> AsyncIterator[LlmResponse]:
+        Two orchestrations of the same session would both run its pending tool calls and
+        interleave their messages in its history, so the second one is rejected.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Claim to release when the orchestration ends
+
+        Raises:
+            OrchestrationInProgressError: If the session already has an orchestration running
+        """
+        if session_id in self._claims:
+            raise OrchestrationInProgressError(f"Session {session_id} already has a tool orchestration running; retry once it has finished")
+        claim = OrchestrationClaim(self, session_id)
+        self._claims[session_id] = claim
+        return claim
+
+    def _release_session(self, claim: OrchestrationClaim) -> None:
+        """Drop a claim unless the session has been claimed again since."""
+        if self._claims.get(claim.session_id) is claim:
+            del self._claims[claim.session_id]
+
+    def get_deadline(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Get the deadline of an orchestration starting now.
+
+        Args:
+            timeout: Seconds requested by the client (TOOL_ORCHESTRATION_TIMEOUT if None)
+
+        Returns:
+            Deadline as a `time.monotonic()` value, or None without a timeout
+        """
+        timeout = timeout or self.default_timeout
+        return time.monotonic() + timeout if timeout > 0 else None
+
+    @staticmethod
+    def _time_left(deadline: Optional[float]) -> Optional[float]:
+        """Get the seconds left until a deadline (None without a deadline)."""
+        return None if deadline is None else deadline - time.monotonic()
+
+    async def orchestrate_tools_streaming(self, session_id: str, model: str, mcp_tools: List[DomainMcpTool], deadline: Optional[float] = None, max_iterations: Optional[int] = None) -> AsyncIterator[LlmResponse]:
         """
         Progressive tool orchestration with streaming responses.
 
-        Yields each LLM response immediately while continuing tool processing.
-        Follows recursive pattern for multi-step tool workflows.
+        Yields each LLM response immediately while continuing tool processing. Runs as
+        a loop over iterations (an LLM round, then its tool calls) whose progress is
+        checkpointed in the chat history: the assistant message is saved before its
+        tools run, and the tool results once they have finished. Started again on the
+        same session, the orchestration resumes from the checkpoint, running only the
+        tool calls that have no result yet, or replaying the final answer if the
+        orchestration had already completed.
 
         Args:
             session_id: The session ID for the conversation
             model: The model to use for completion
             mcp_tools: Pre-filtered list of DomainMcpTool objects
-            iteration: Current recursion depth (for protection)
+            deadline: Request deadline from get_deadline(); tool calls still running then
+                are cancelled and no further LLM round is started
+            max_iterations: Iteration budget, counting rounds of earlier attempts since
+                the last user message (TOOL_ORCHESTRATION_MAX_ITERATIONS if None)
 
         Yields:
             Each LLM response as it becomes available
-
-        Raises:
-            Exception: If tool orchestration fails
         """
-        # Prevent infinite recursion
-        if iteration >= 5:
-            error_response = self._create_error_response("Maximum tool call iterations reached.")
-            yield error_response
-            return
+        tool_server_map = {tool.name: tool.server for tool in mcp_tools}
+        conversation = self.chat_history_repo.get_conversation_history(session_id)
+        state = self._start_state(session_id, model, max_iterations, conversation, tool_server_map)
 
         try:
-            # Get conversation history
-            conversation = self.chat_history_repo.get_conversation_history(session_id)
+            while True:
+                # Checkpoint: tool calls of the last assistant message without results
+                pending = self._get_unanswered_tool_calls(conversation, tool_server_map)
+                if pending:
+                    await self._run_tool_calls(state, session_id, pending, deadline)
+                    if self._deadline_passed(deadline):
+                        state.status = "deadline_exceeded"
+                        yield self._create_error_response(f"Request deadline exceeded after {state.iteration} tool iteration(s); tool results are partial.")
+                        return
+                    conversation = self.chat_history_repo.get_conversation_history(session_id)
+
+                final_answer = self._get_final_answer(conversation)
+                if final_answer is not None:
+                    # Completed by an earlier attempt: replay instead of calling the LLM again
+                    state.status = "completed"
+                    yield LlmResponse(content=final_answer.content, model=model)
+                    return
+
+                if state.iteration >= state.max_iterations:
+                    state.status = "budget_exhausted"
+                    yield self._create_error_response("Maximum tool call iterations reached.")
+                    return
+
+                # Send conversation + tools to LLM, bounded by the request deadline
+                iteration = state.iteration
+                openai_messages = self.chat_history_repo.get_openai_messages(session_id)
+                started = time.perf_counter()
+                async with asyncio.timeout(self._time_left(deadline)):
+                    llm_response = await self.llm_client.invoke(messages=conversation, model=model, mcp_tools=mcp_tools, openai_messages=openai_messages, session_id=session_id)
+                self._record_llm_round(state, time.perf_counter() - started)
+
+                # Add assistant message to history, checkpointing its round
+                assistant_message = ApiChatMessage(role="assistant", content=llm_response.content, tool_calls=llm_response.to_chat_message_dict(), orchestration_round=iteration)
+                self.chat_history_repo.save_message(session_id, assistant_message)
+
+                # Yield current LLM response
+                yield llm_response
+
+                if not llm_response.has_tool_calls():
+                    # No tools called - orchestration complete
+                    state.status = "completed"
+                    return
+                conversation = self.chat_history_repo.get_conversation_history(session_id)
+
+        except TimeoutError:
+            state.status = "deadline_exceeded"
+            yield self._create_error_response(f"Request deadline exceeded during LLM round {state.iteration + 1}.")
 
-            # Send conversation + tools to LLM
-            llm_response = await self.llm_client.invoke(messages=conversation, model=model, mcp_tools=mcp_tools)
+        except Exception as e:
+            state.status = "failed"
+            error_response = self._create_error_response(f"Error during tool orchestration: {str(e)}")
+            yield error_response
+
+        finally:
+            self._finish_state(state)
+
+    async def orchestrate_tools_overlapped(self, session_id: str, model: str, mcp_tools: List[DomainMcpTool], max_iterations: Optional[int] = None, deadline: Optional[float] = None) -> AsyncIterator[DomainOrchestrationEvent]:
+        """
+        Streaming tool orchestration that starts MCP tools before generation finishes.
 
-            # Convert generic tool calls to ChatMessage dict format
-            tool_calls_dict = llm_response.to_chat_message_dict()
+        The completion is streamed and `tool_calls` are assembled from deltas. Each tool
+        call is sent to its MCP server as soon as its arguments JSON is complete, so tool
+        latency overlaps with the rest of generation instead of following it. Progress is
+        checkpointed and resumed like in orchestrate_tools_streaming(), except that each
+        tool result is saved as soon as its tool finishes.
 
-            # Add assistant message to history
-            assistant_message = ApiChatMessage(
-                role="assistant",
-                content=llm_response.content,
-                tool_calls=tool_calls_dict,
-            )
-            self.chat_history_repo.save_message(session_id, assistant_message)
+        Args:
+            session_id: The session ID for the conversation
+            model: The model to use for completion
+            mcp_tools: Pre-filtered list of DomainMcpTool objects
+            max_iterations: Iteration budget (TOOL_ORCHESTRATION_MAX_ITERATIONS if None)
+            deadline: Request deadline from get_deadline(); tool calls still running then
+                are cancelled and the orchestration stops with an error event
 
-            # Yield current LLM response
-            yield llm_response
+        Yields:
+            Progress events: content deltas, tool call start/completion, and the
+            LLM response of each round
+        """
+        tool_server_map = {tool.name: tool.server for tool in mcp_tools}
+        provider = LlmModel.get_by_model(model).provider
+        conversation = self.chat_history_repo.get_conversation_history(session_id)
+        state = self._start_state(session_id, model, max_iterations, conversation, tool_server_map)
 
-            # Check if tools were called
-            if not llm_response.has_tool_calls():
-                # No tools called - orchestration complete
+        try:
+            try:
+                # Resume from the checkpoint: finish the tool calls an earlier attempt left without results
+                pending = self._get_unanswered_tool_calls(conversation, tool_server_map)
+                if pending:
+                    iteration = state.iteration - 1
+                    for request in pending:
+                        yield DomainOrchestrationEvent(event="tool_call_started", data={"id": request.id, "name": request.name, "server": request.server, "arguments": request.arguments, "iteration": iteration})
+                    for tool_message in await self._run_tool_calls(state, session_id, pending, deadline):
+                        yield DomainOrchestrationEvent(event="tool_call_completed", data={"id": tool_message.tool_call_id, "name": tool_message.name, "result": tool_message.content, "iteration": iteration})
+                else:
+                    final_answer = self._get_final_answer(conversation)
+                    if final_answer is not None:
+                        # Completed by an earlier attempt: replay instead of calling the LLM again
+                        state.status = "completed"
+                        llm_response = LlmResponse(content=final_answer.content, model=model, provider=provider)
+                        yield DomainOrchestrationEvent(event="llm_response", data={"response": llm_response, "iteration": max(state.iteration - 1, 0)})
+                        return
+            except Exception as e:
+                state.status = "failed"
+                yield DomainOrchestrationEvent(event="error", data={"error": f"Error during tool orchestration: {str(e)}", "iteration": state.iteration})
                 return
 
-            # Execute all tool calls in parallel using MCPClient
-            tool_messages = await self.mcp_client.execute_tools_parallel(llm_response.get_tool_execution_data(mcp_tools))
+            while state.iteration < state.max_iterations:
+                iteration = state.iteration
+                if self._deadline_passed(deadline):
+                    state.status = "deadline_exceeded"
+                    yield self._deadline_event(iteration, "tool results are partial")
+                    return
+
+                conversation = self.chat_history_repo.get_conversation_history(session_id)
+                openai_messages = self.chat_history_repo.get_openai_messages(session_id)
+                assembler = ToolCallStreamAssembler()
+                # Keyed by position, since a model may repeat a tool call ID
+                tool_tasks: List[asyncio.Task] = []
+                reported: set = set()
+
+                try:
+                    started = time.perf_counter()
+                    async for raw_chunk in self.llm_client.raw_stream_openai_format(conversation, model, mcp_tools, openai_messages, session_id=session_id):
+                        chunk = json.loads(raw_chunk)
+                        if "error" in chunk:
+                            state.status = "failed"
+                            yield DomainOrchestrationEvent(event="error", data={"error": chunk["error"], "iteration": iteration})
+                            return
+
+                        for tool_call in assembler.feed(chunk):
+                            yield self._start_tool_call(tool_call, tool_server_map, tool_tasks, iteration, deadline)
+
+                        content = self._get_delta_content(chunk)
+                        if content:
+                            yield DomainOrchestrationEvent(event="content", data={"content": content, "iteration": iteration})
+
+                        for event in self._collect_finished_tools(tool_tasks, reported, iteration):
+                            yield event
+
+                        if self._deadline_passed(deadline):
+                            state.status = "deadline_exceeded"
+                            yield self._deadline_event(iteration, "generation was cut off")
+                            return
+
+                    for tool_call in assembler.finish():
+                        yield self._start_tool_call(tool_call, tool_server_map, tool_tasks, iteration, deadline)
+
+                    llm_response = assembler.to_llm_response(model=model, provider=provider)
+                    self._record_llm_round(state, time.perf_counter() - started)
+                    assistant_message = ApiChatMessage(role="assistant", content=llm_response.content, tool_calls=llm_response.to_chat_message_dict(), orchestration_round=iteration)
+                    self.chat_history_repo.save_message(session_id, assistant_message)
+
+                    # Checkpoint the results of tools that finished during generation
+                    saved: set = set()
+                    self._save_finished_tools(session_id, tool_tasks, saved)
+
+                    yield DomainOrchestrationEvent(event="llm_response", data={"response": llm_response, "iteration": iteration})
+
+                    if not llm_response.has_tool_calls():
+                        state.status = "completed"
+                        return
+
+                    # Checkpoint and report the remaining tools as they finish
+                    started = time.perf_counter()
+                    for finished in asyncio.as_completed([task for position, task in enumerate(tool_tasks) if position not in saved]):
+                        await finished
+                        self._save_finished_tools(session_id, tool_tasks, saved)
+                        for event in self._collect_finished_tools(tool_tasks, reported, iteration):
+                            yield event
+
+                    for event in self._collect_finished_tools(tool_tasks, reported, iteration):
+                        yield event
+                    self._record_tool_calls(state, len(llm_response.tool_calls), time.perf_counter() - started)
+
+                except Exception as e:
+                    state.status = "failed"
+                    yield DomainOrchestrationEvent(event="error", data={"error": f"Error during tool orchestration: {str(e)}", "iteration": iteration})
+                    return
+                finally:
+                    for task in tool_tasks:
+                        if not task.done():
+                            task.cancel()
+
+            state.status = "budget_exhausted"
+            yield DomainOrchestrationEvent(event="error", data={"error": "Maximum tool call iterations reached.", "iteration": state.iteration})
+        finally:
+            self._finish_state(state)
+
+    def _start_state(self, session_id: str, model: str, max_iterations: Optional[int], conversation: List[ApiChatMessage], tool_server_map: Dict[str, str]) -> DomainOrchestrationState:
+        """Create the state of an orchestration, counting the iterations already checkpointed in the history."""
+        now = time.time()
+        completed = self._count_completed_iterations(conversation)
+        resumed = completed > 0 or bool(self._get_unanswered_tool_calls(conversation, tool_server_map))
+        state = DomainOrchestrationState(session_id=session_id, model=model, iteration=completed, max_iterations=max_iterations or self.max_iterations, resumed=resumed, started_at=now, updated_at=now)
+
+        self._states[session_id] = state
+        self._states.move_to_end(session_id)
+        while len(self._states) > self.max_states:
+            self._states.popitem(last=False)
+        return state
+
+    @staticmethod
+    def _finish_state(state: DomainOrchestrationState) -> None:
+        """Mark an orchestration that stopped without an outcome (e.g. the client disconnected) as interrupted."""
+        if state.status == "running":
+            state.status = "interrupted"
+        state.updated_at = time.time()
+
+    @staticmethod
+    def _record_llm_round(state: DomainOrchestrationState, seconds: float) -> None:
+        """Record a completed LLM round as a new iteration."""
+        state.iterations.append(DomainOrchestrationIteration(iteration=state.iteration, llm_ms=round(seconds * 1000, 1)))
+        state.iteration += 1
+        state.updated_at = time.time()
+
+    @staticmethod
+    def _record_tool_calls(state: DomainOrchestrationState, tool_calls: int, seconds: float) -> None:
+        """Record the tool calls of the latest iteration (resumed ones get an iteration without an LLM round)."""
+        if not state.iterations or state.iterations[-1].iteration != state.iteration - 1:
+            state.iterations.append(DomainOrchestrationIteration(iteration=max(state.iteration - 1, 0)))
+        record = state.iterations[-1]
+        record.tool_calls += tool_calls
+        record.tools_ms = round((record.tools_ms or 0) + seconds * 1000, 1)
+        state.updated_at = time.time()
+
+    async def _run_tool_calls(self, state: DomainOrchestrationState, session_id: str, tool_calls: List[DomainToolExecutionRequest], deadline: Optional[float]) -> List[ApiChatMessage]:
+        """Execute tool calls in parallel and checkpoint their results in the history."""
+        started = time.perf_counter()
+        tool_messages = await self.mcp_client.execute_tools_parallel(tool_calls, deadline)
+        for tool_message in tool_messages:
+            self.chat_history_repo.save_message(session_id, tool_message)
+        self._record_tool_calls(state, len(tool_calls), time.perf_counter() - started)
+        return tool_messages
+
+    @staticmethod
+    def _count_completed_iterations(conversation: List[ApiChatMessage]) -> int:
+        """
+        Count the LLM rounds since the last user message.
+
+        The count comes from the round checkpointed on the latest assistant message, so
+        it stays right when trimming has dropped the user message that started the
+        orchestration. Assistant messages saved without a checkpoint are counted.
+        """
+        completed = 0
+        for message in reversed(conversation):
+            if message.role == "user":
+                break
+            if message.role == "assistant":
+                if message.orchestration_round is not None:
+                    return completed + message.orchestration_round + 1
+                completed += 1
+        return completed
+
+    @staticmethod
+    def _get_unanswered_tool_calls(conversation: List[ApiChatMessage], tool_server_map: Dict[str, str]) -> List[DomainToolExecutionRequest]:
+        """Get the tool calls of the last assistant message that have no tool result in the history."""
+        answered: Counter = Counter()
+        for message in reversed(conversation):
+            if message.role == "tool":
+                answered[message.tool_call_id] += 1
+            elif message.role == "assistant":
+                unanswered = LlmOpenaiUtil.get_unanswered_tool_calls(message.tool_calls or [], answered)
+                return [DomainToolExecutionRequest(id=tool_call["id"], name=tool_call["function"]["name"], arguments=tool_call["function"]["arguments"], server=tool_server_map.get(tool_call["function"]["name"])) for tool_call in unanswered]
+            else:
+                break
+        return []
+
+    @staticmethod
+    def _get_final_answer(conversation: List[ApiChatMessage]) -> Optional[ApiChatMessage]:
+        """Get the last message if it is an assistant answer without tool calls."""
+        if conversation and conversation[-1].role == "assistant" and not conversation[-1].tool_calls:
+            return conversation[-1]
+        return None
 
-            # Add all tool results to conversation
-            for tool_message in tool_messages:
-                self.chat_history_repo.save_message(session_id, tool_message)
+    def get_orchestration_state(self, session_id: str) -> Optional[DomainOrchestrationState]:
+        """
+        Get the state of the latest orchestration of a session run by this process.
 
-            # Recursive case: tools were called, continue for next LLM round
-            async for next_response in self.orchestrate_tools_streaming(session_id, model, mcp_tools, iteration + 1):
-                yield next_response
+        Args:
+            session_id: Session identifier
 
-        except Exception as e:
-            error_response = self._create_error_response(f"Error during tool orchestration: {str(e)}")
-            yield error_response
+        Returns:
+            Orchestration state, or None if none is known
+        """
+        return self._states.get(session_id)
+
+    def _start_tool_call(self, tool_call: LlmToolCall, tool_server_map: Dict[str, str], tool_tasks: List[asyncio.Task], iteration: int, deadline: Optional[float] = None) -> DomainOrchestrationEvent:
+        """Send a completed tool call to its MCP server in the background and describe it as an event.
+
+        A tool that was not offered has no server; execute_tool() answers it with an error result.
+        """
+        server = tool_server_map.get(tool_call.name)
+        request = DomainToolExecutionRequest(id=tool_call.id, name=tool_call.name, arguments=tool_call.arguments_str, server=server)
+        tool_tasks.append(asyncio.create_task(self.mcp_client.execute_tool(request, deadline)))
+        return DomainOrchestrationEvent(event="tool_call_started", data={"id": tool_call.id, "name": tool_call.name, "server": server, "arguments": tool_call.arguments_str, "iteration": iteration})
+
+    def _save_finished_tools(self, session_id: str, tool_tasks: List[asyncio.Task], saved: set) -> None:
+        """Save the results of tool calls that finished since the last check to the history."""
+        for position, task in enumerate(tool_tasks):
+            if position not in saved and task.done():
+                saved.add(position)
+                self.chat_history_repo.save_message(session_id, task.result())
+
+    def _collect_finished_tools(self, tool_tasks: List[asyncio.Task], reported: set, iteration: int) -> List[DomainOrchestrationEvent]:
+        """Describe tool calls that finished since the last check."""
+        events = []
+        for position, task in enumerate(tool_tasks):
+            if position in reported or not task.done():
+                continue
+            reported.add(position)
+            tool_message = task.result()
+            events.append(DomainOrchestrationEvent(event="tool_call_completed", data={"id": tool_message.tool_call_id, "name": tool_message.name, "result": tool_message.content, "iteration": iteration}))
+        return events
+
+    def _deadline_passed(self, deadline: Optional[float]) -> bool:
+        """Check whether a request deadline has passed."""
+        time_left = self._time_left(deadline)
+        return time_left is not None and time_left <= 0
+
+    @staticmethod
+    def _deadline_event(iteration: int, detail: str) -> DomainOrchestrationEvent:
+        """Describe an orchestration stopped by its request deadline."""
+        return DomainOrchestrationEvent(event="error", data={"error": f"Request deadline exceeded; {detail}.", "deadline_exceeded": True, "iteration": iteration})
+
+    @staticmethod
+    def _get_delta_content(chunk: dict) -> str:
+        """Get the content delta of a parsed stream chunk."""
+        choices = chunk.get("choices") or []
+        if not choices:
+            return ""
+        return (choices[0].get("delta") or {}).get("content") or ""
 
     async def discover_available_tools(self) -> dict:
         """
@@ -141,7 +521,7 @@ class _ToolOrchestrationService:
         filtered_tools = await self.get_filtered_tools(tool_selection)
         responses = []
 
-        async for response in self.orchestrate_tools_streaming(session_id, model, filtered_tools, 0):
+        async for response in self.orchestrate_tools_streaming(session_id, model, filtered_tools, max_iterations=max_iterations):
             responses.append(response)
             # Limit iterations for single workflow
             if len(responses) >= max_iterations:
@@ -181,7 +561,11 @@ class _ToolOrchestrationService:
 
         tool_message_count = sum(1 for msg in conversation if hasattr(msg, "tool_calls") and msg.tool_calls)
 
-        return {"status": "active" if conversation else "no_conversation", "total_messages": len(conversation), "tool_messages": tool_message_count, "last_message_role": conversation[-1].role if conversation else None}
+        status = {"status": "active" if conversation else "no_conversation", "total_messages": len(conversation), "tool_messages": tool_message_count, "last_message_role": conversation[-1].role if conversation else None}
+        state = self.get_orchestration_state(session_id)
+        if state is not None:
+            status["orchestration"] = state.model_dump()
+        return status
 
     def _create_error_response(self, error_message: str) -> LlmResponse:
         """
@@ -0,0 +1,130 @@
+"""
+Warm-up service for eager initialization at startup.
+
+By default every resource is created on first use, so the first user pays for MCP
+connection and discovery, provider SDK imports and Ollama model loading. With warm-up
+enabled these run in parallel during the application lifespan, and `/health/ready`
+reports ready only once they have finished.
+
+Configuration via environment variables:
+- WARMUP_ENABLED: Run warm-up at startup (default false)
+- WARMUP_BLOCKING: Finish warm-up before the server accepts requests; otherwise it
+  runs in the background while readiness reports not ready (default false)
+- WARMUP_TIMEOUT: Seconds before unfinished warm-up steps are abandoned (default 60)
+- WARMUP_MODELS: Comma-separated models to preload (default OLLAMA_MODEL or tinyllama)
+- OLLAMA_KEEP_ALIVE: How long preloaded Ollama models stay in memory (default 30m)
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+
+from github_mingzilla.llm_mcp.clients.llm_client import llm_client
+from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
+from github_mingzilla.llm_mcp.service_manager.interfaces import ClosableService
+from github_mingzilla.llm_mcp.service_manager.singleton_manager import singleton_manager
+
+
+class _WarmupService(ClosableService):
+    """
+    Service that runs the startup warm-up steps and tracks their outcome.
+    """
+
+    def __init__(self):
+        """Initialize warm-up configuration from environment variables."""
+        self.llm_client = llm_client
+        self.mcp_client = mcp_client
+
+        self.enabled = os.getenv("WARMUP_ENABLED", "false").lower() == "true"
+        self.blocking = os.getenv("WARMUP_BLOCKING", "false").lower() == "true"
+        self.timeout = float(os.getenv("WARMUP_TIMEOUT", "60"))
+        self.models = [model.strip() for model in os.getenv("WARMUP_MODELS", os.getenv("OLLAMA_MODEL", "tinyllama")).split(",") if model.strip()]
+        self.keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+        self._task: Optional[asyncio.Task] = None
+        self._status = "disabled" if not self.enabled else "pending"
+        self._steps: Dict[str, Dict[str, Any]] = {}
+        self._duration_ms: Optional[float] = None
+
+    def start(self) -> Optional[asyncio.Task]:
+        """
+        Start warm-up in the background if it is enabled and not yet started.
+
+        Returns:
+            The warm-up task, or None when warm-up is disabled
+        """
+        if not self.enabled:
+            return None
+        if self._task is None:
+            self._task = asyncio.create_task(self.warm_up())
+        return self._task
+
+    async def wait(self):
+        """Wait for a started warm-up to finish."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    def is_ready(self) -> bool:
+        """Check whether the gateway is ready for traffic (warm-up finished or disabled)."""
+        return self._status in ("disabled", "complete")
+
+    async def warm_up(self):
+        """Run all warm-up steps in parallel, bounded by the warm-up timeout."""
+        self._status = "running"
+        started = time.perf_counter()
+
+        steps = {"mcp": self._warm_mcp()}
+        for model in self.models:
+            steps[f"llm:{model}"] = self.llm_client.warm_up_model(model, self.keep_alive)
+
+        await asyncio.gather(*(self._run_step(name, step) for name, step in steps.items()))
+
+        self._duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self._status = "complete"
+        failed = self.get_failed_steps()
+        if failed:
+            print(f"Warm-up finished in {self._duration_ms}ms; failed steps (will initialize lazily): {', '.join(failed)}")
+        else:
+            print(f"Warm-up finished in {self._duration_ms}ms")
+
+    async def _warm_mcp(self) -> str:
+        """Connect to every MCP server in parallel, then prefetch their tools."""
+        connected = await self.mcp_client.connect()
+        tools = await self.mcp_client.discover_tools()
+        return f"{sum(connected.values())}/{len(connected)} servers connected, {len(tools)} tools"
+
+    async def _run_step(self, name: str, step: Awaitable[str]):
+        """Run one warm-up step and record its outcome; failures never propagate."""
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(step, timeout=self.timeout)
+            status = "ok"
+        except asyncio.TimeoutError:
+            detail, status = f"timed out after {self.timeout}s", "timeout"
+        except Exception as e:
+            detail, status = str(e), "error"
+        self._steps[name] = {"status": status, "duration_ms": round((time.perf_counter() - started) * 1000, 1), "detail": detail}
+
+    def get_failed_steps(self) -> List[str]:
+        """Get the names of warm-up steps that did not succeed."""
+        return [name for name, step in self._steps.items() if step["status"] != "ok"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get warm-up status.
+
+        Returns:
+            Dictionary with overall status, duration and per-step outcomes
+        """
+        return {"status": self._status, "ready": self.is_ready(), "blocking": self.blocking, "duration_ms": self._duration_ms, "steps": dict(self._steps)}
+
+    async def disconnect(self):
+        """Cancel a warm-up that is still running at shutdown."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+
+# Module-level singleton instance
+warmup_service = _WarmupService()
+singleton_manager.register(warmup_service)
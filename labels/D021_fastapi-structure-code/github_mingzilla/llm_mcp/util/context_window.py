@@ -0,0 +1,137 @@
+"""Token-budget context windowing for outgoing prompts."""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from github_mingzilla.llm_mcp.models import ApiChatMessage
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+from github_mingzilla.llm_mcp.util.llm_openai_util import LlmOpenaiUtil
+
+# Receives the dropped messages and returns summary text (or None to skip the summary)
+Summarizer = Callable[[List[ApiChatMessage]], Awaitable[Optional[str]]]
+
+
+class ContextWindowManager:
+    """
+    Trims conversation history to a model's prompt token budget.
+
+    Leading system messages are always kept. The remaining history is split into
+    groups that must be sent together (an assistant message with tool calls plus the
+    tool results that follow it), and the newest groups that fit the budget are kept.
+    The most recent group is kept even if it alone exceeds the budget.
+
+    When a summarizer is set, the dropped prefix is replaced by a system message with
+    its summary, as long as the summary fits the budget too.
+    """
+
+    def __init__(self, summarizer: Optional[Summarizer] = None):
+        """
+        Initialize the manager.
+
+        Args:
+            summarizer: Optional async hook that summarizes dropped messages
+        """
+        self.summarizer = summarizer
+        self._stats = {"trimmed_requests": 0, "dropped_messages": 0, "summaries": 0}
+
+    def set_summarizer(self, summarizer: Optional[Summarizer]) -> None:
+        """Set or remove the summarization hook for dropped history."""
+        self.summarizer = summarizer
+
+    async def fit(
+        self,
+        messages: List[ApiChatMessage],
+        llm_model: LlmModel,
+        openai_messages: Optional[List[Dict[str, Any]]] = None,
+    ) -> Tuple[List[ApiChatMessage], Optional[List[Dict[str, Any]]]]:
+        """
+        Fit messages into the model's prompt token budget.
+
+        Args:
+            messages: Full conversation history
+            llm_model: Model configuration providing the budget
+            openai_messages: Optional pre-encoded messages aligned with `messages`
+
+        Returns:
+            Tuple of kept messages and their aligned pre-encoded messages (if given)
+        """
+        budget = llm_model.prompt_token_budget
+        token_counts = [message.estimate_tokens() for message in messages]
+        if not budget or sum(token_counts) <= budget:
+            return messages, openai_messages
+
+        pinned = 0
+        while pinned < len(messages) and messages[pinned].role == "system":
+            pinned += 1
+
+        groups = self._group_messages(messages, pinned)
+        remaining = budget - sum(token_counts[:pinned])
+
+        # Keep the newest groups that fit, always including the last one
+        first_kept = len(groups)
+        for group_start, group_end in reversed(groups):
+            group_tokens = sum(token_counts[group_start:group_end])
+            if first_kept < len(groups) and group_tokens > remaining:
+                break
+            remaining -= group_tokens
+            first_kept -= 1
+
+        if first_kept == 0:
+            return messages, openai_messages
+
+        kept_start = groups[first_kept][0]
+        dropped = messages[pinned:kept_start]
+        summary = await self._summarize(dropped, remaining)
+
+        kept_messages = messages[:pinned] + ([summary] if summary else []) + messages[kept_start:]
+        kept_openai = None
+        if openai_messages is not None:
+            summary_openai = LlmOpenaiUtil.chat_messages_to_openai_format([summary]) if summary else []
+            kept_openai = openai_messages[:pinned] + summary_openai + openai_messages[kept_start:]
+
+        self._stats["trimmed_requests"] += 1
+        self._stats["dropped_messages"] += len(dropped)
+        return kept_messages, kept_openai
+
+    async def _summarize(self, dropped: List[ApiChatMessage], remaining_tokens: int) -> Optional[ApiChatMessage]:
+        """Summarize the dropped prefix with the hook, if the summary fits the remaining budget."""
+        if not self.summarizer or not dropped:
+            return None
+
+        try:
+            summary_text = await self.summarizer(dropped)
+        except Exception as e:
+            print(f"Context summarizer failed, dropping {len(dropped)} messages without summary: {e}")
+            return None
+
+        if not summary_text:
+            return None
+
+        summary = ApiChatMessage(role="system", content=f"Summary of earlier conversation: {summary_text}")
+        if summary.estimate_tokens() > remaining_tokens:
+            return None
+
+        self._stats["summaries"] += 1
+        return summary
+
+    @staticmethod
+    def _group_messages(messages: List[ApiChatMessage], start: int) -> List[Tuple[int, int]]:
+        """Split messages from `start` into (start, end) ranges that must stay together."""
+        groups = []
+        index = start
+        while index < len(messages):
+            group_end = index + 1
+            # Tool results belong to the assistant message (or results) before them
+            while group_end < len(messages) and messages[group_end].role == "tool":
+                group_end += 1
+            groups.append((index, group_end))
+            index = group_end
+        return groups
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get trimming statistics.
+
+        Returns:
+            Dictionary with trimmed request, dropped message and summary counts
+        """
+        return dict(self._stats)
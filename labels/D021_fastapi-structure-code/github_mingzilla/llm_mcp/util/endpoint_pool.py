@@ -0,0 +1,264 @@
+"""
+Ollama endpoint pools with least-outstanding-requests routing.
+
+Each model maps to a pool of Ollama servers. A request goes to the endpoint of the pool
+with the fewest requests in flight, or (with session affinity) back to the endpoint that
+served the conversation before, whose KV cache still holds its prefix. An endpoint that
+fails several times in a row is ejected for a cool-down period; once it expires the
+endpoint gets traffic again, and one more failure ejects it again.
+
+Configuration via environment variables:
+- OLLAMA_ENDPOINTS: Comma-separated Ollama server URLs shared by all Ollama models
+  (default: OLLAMA_BASE_URL only, which disables routing)
+- OLLAMA_MODEL_ENDPOINTS: Per-model pools as `model=url|url;model=url`
+- OLLAMA_SESSION_AFFINITY: Keep a session on the endpoint that served it (default true)
+- OLLAMA_AFFINITY_SLACK: Extra in-flight requests tolerated on a session's endpoint
+  before it is moved to the least loaded one (default 4)
+- OLLAMA_EJECT_AFTER_ERRORS: Consecutive failures that eject an endpoint (default 3)
+- OLLAMA_EJECT_SECONDS: How long an ejected endpoint gets no traffic (default 30)
+"""
+
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+
+MAX_AFFINITY_SESSIONS = 10000
+
+
+class _EndpointState:
+    """Routing state of one endpoint."""
+
+    __slots__ = ("url", "outstanding", "consecutive_errors", "ejected_until", "requests", "errors", "ejections")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+
+
+class EndpointLease:
+    """Outcome of one request tracked by an endpoint pool."""
+
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+    def fail(self) -> None:
+        """Mark the request as failed."""
+        self.failed = True
+
+
+class EndpointPool:
+    """
+    Routes requests across the endpoints serving one model.
+    """
+
+    def __init__(self, urls: List[str], affinity: bool, affinity_slack: int, eject_after_errors: int, eject_seconds: float):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: Endpoint URLs
+            affinity: Route a session back to the endpoint that served it
+            affinity_slack: Extra in-flight requests tolerated on the session's endpoint
+            eject_after_errors: Consecutive failures that eject an endpoint
+            eject_seconds: Cool-down of an ejected endpoint
+        """
+        self.endpoints = [_EndpointState(url) for url in urls]
+        self.affinity = affinity
+        self.affinity_slack = affinity_slack
+        self.eject_after_errors = eject_after_errors
+        self.eject_seconds = eject_seconds
+        self._sessions: "OrderedDict[str, _EndpointState]" = OrderedDict()
+        self._next = 0
+
+    def choose(self, session_id: Optional[str] = None) -> str:
+        """
+        Pick the endpoint for a request.
+
+        Args:
+            session_id: Conversation ID used for session affinity
+
+        Returns:
+            Endpoint URL
+        """
+        now = time.monotonic()
+        available = [endpoint for endpoint in self.endpoints if endpoint.ejected_until <= now]
+        if not available:
+            # Everything is ejected: fail open on the endpoint that comes back first
+            available = [min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)]
+
+        # Rotate the starting point so ties are spread across endpoints
+        self._next = (self._next + 1) % len(available)
+        least = min(available[self._next :] + available[: self._next], key=lambda endpoint: endpoint.outstanding)
+
+        chosen = least
+        if self.affinity and session_id:
+            previous = self._sessions.get(session_id)
+            if previous is not None and previous in available and previous.outstanding <= least.outstanding + self.affinity_slack:
+                chosen = previous
+            self._sessions[session_id] = chosen
+            self._sessions.move_to_end(session_id)
+            if len(self._sessions) > MAX_AFFINITY_SESSIONS:
+                self._sessions.popitem(last=False)
+        return chosen.url
+
+    @contextmanager
+    def track(self, url: str) -> Iterator[EndpointLease]:
+        """
+        Count a request as in flight on an endpoint for the duration of the block.
+
+        An exception raised in the block counts as a failure, as does calling `fail()` on
+        the lease for failures that do not raise (e.g. error chunks in streams). A
+        cancelled request counts as neither.
+
+        Yields:
+            Lease of the request (a no-op lease if the URL does not belong to the pool)
+        """
+        lease = EndpointLease()
+        endpoint = next((endpoint for endpoint in self.endpoints if endpoint.url == url), None)
+        if endpoint is None:
+            yield lease
+            return
+
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        finished = False
+        try:
+            yield lease
+            finished = True
+        except Exception:
+            lease.failed = True
+            raise
+        finally:
+            endpoint.outstanding -= 1
+            if lease.failed:
+                self.record_failure(endpoint)
+            elif finished:
+                endpoint.consecutive_errors = 0
+
+    def record_failure(self, endpoint: _EndpointState) -> None:
+        """Record a failed request and eject the endpoint after too many in a row."""
+        endpoint.errors += 1
+        endpoint.consecutive_errors += 1
+        if endpoint.consecutive_errors >= self.eject_after_errors:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            endpoint.ejections += 1
+            # One more failure after the cool-down ejects it again
+            endpoint.consecutive_errors = self.eject_after_errors - 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-endpoint routing statistics."""
+        now = time.monotonic()
+        return {
+            endpoint.url: {
+                "outstanding": endpoint.outstanding,
+                "requests": endpoint.requests,
+                "errors": endpoint.errors,
+                "consecutive_errors": endpoint.consecutive_errors,
+                "ejected": endpoint.ejected_until > now,
+                "ejections": endpoint.ejections,
+            }
+            for endpoint in self.endpoints
+        }
+
+
+class OllamaEndpointRegistry:
+    """
+    Endpoint pools of the Ollama models, built from environment variables.
+    """
+
+    def __init__(self):
+        """Initialize the registry from environment variables."""
+        self.affinity = os.getenv("OLLAMA_SESSION_AFFINITY", "true").lower() == "true"
+        self.affinity_slack = int(os.getenv("OLLAMA_AFFINITY_SLACK", "4"))
+        self.eject_after_errors = int(os.getenv("OLLAMA_EJECT_AFTER_ERRORS", "3"))
+        self.eject_seconds = float(os.getenv("OLLAMA_EJECT_SECONDS", "30"))
+
+        self._default_urls = self._parse_urls(os.getenv("OLLAMA_ENDPOINTS", ""), ",")
+        self._model_urls: Dict[str, List[str]] = {}
+        for entry in os.getenv("OLLAMA_MODEL_ENDPOINTS", "").split(";"):
+            model, _, urls = entry.partition("=")
+            if model.strip() and urls.strip():
+                self._model_urls[model.strip()] = self._parse_urls(urls, "|")
+
+        self._pools: Dict[str, EndpointPool] = {}
+
+    @staticmethod
+    def _parse_urls(spec: str, separator: str) -> List[str]:
+        return [url.strip().rstrip("/") for url in spec.split(separator) if url.strip()]
+
+    def get_pool(self, model_name: str) -> Optional[EndpointPool]:
+        """
+        Get the pool of a model; pools with the same endpoints share routing state.
+
+        Args:
+            model_name: Ollama model name
+
+        Returns:
+            Endpoint pool, or None if the model is served by a single configured endpoint
+        """
+        urls = self._model_urls.get(model_name, self._default_urls)
+        if not urls:
+            return None
+        key = "|".join(urls)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = EndpointPool(urls, self.affinity, self.affinity_slack, self.eject_after_errors, self.eject_seconds)
+        return pool
+
+    def get_endpoints(self, llm_model: LlmModel) -> List[str]:
+        """Get every endpoint that serves a model (its own endpoint if it has no pool)."""
+        pool = self.get_pool(llm_model.model_name) if llm_model.provider == "ollama" else None
+        if pool is None:
+            return [llm_model.endpoint] if llm_model.endpoint else []
+        return [endpoint.url for endpoint in pool.endpoints]
+
+    def get_all_endpoints(self) -> List[str]:
+        """Get every configured Ollama endpoint, including OLLAMA_BASE_URL."""
+        urls = [os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/"), *self._default_urls]
+        for model_urls in self._model_urls.values():
+            urls.extend(model_urls)
+        return list(dict.fromkeys(urls))
+
+    def route(self, llm_model: LlmModel, session_id: Optional[str] = None) -> LlmModel:
+        """
+        Point an Ollama model configuration at the endpoint chosen for this request.
+
+        Args:
+            llm_model: Model configuration
+            session_id: Conversation ID used for session affinity
+
+        Returns:
+            Model configuration on the chosen endpoint (unchanged without a pool)
+        """
+        pool = self.get_pool(llm_model.model_name) if llm_model.provider == "ollama" else None
+        if pool is None:
+            return llm_model
+        return llm_model.on_endpoint(pool.choose(session_id))
+
+    @contextmanager
+    def track(self, llm_model: LlmModel) -> Iterator[EndpointLease]:
+        """Track a request to the endpoint of a model configuration (see `EndpointPool.track`)."""
+        pool = self.get_pool(llm_model.model_name) if llm_model.provider == "ollama" and llm_model.endpoint else None
+        if pool is None:
+            yield EndpointLease()
+            return
+        with pool.track(llm_model.endpoint) as lease:
+            yield lease
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics of every endpoint, merged across pools."""
+        stats: Dict[str, Any] = {}
+        for pool in self._pools.values():
+            stats.update(pool.get_stats())
+        return stats
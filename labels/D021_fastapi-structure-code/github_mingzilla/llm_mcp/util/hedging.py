@@ -0,0 +1,317 @@
+"""
+Hedged LLM requests: a backup call when the primary is slow to respond.
+
+The time to first result of recent requests is tracked per model. A request that has
+not produced its first result (the whole response for batch calls, the first chunk for
+streams) within the configured latency percentile gets a backup call to a secondary
+endpoint or model. Whichever answers first wins and the other call is cancelled; a call
+that fails, or a stream whose first item is an error, loses to one that is still running.
+At most a fixed fraction of requests is hedged, so a slow upstream cannot double the
+load, and a backup is only sent when the backup gate (admission control) has a free slot
+for it right away.
+
+Configuration via environment variables:
+- LLM_HEDGING_ENABLED: Enable hedging (default false)
+- LLM_HEDGING_BACKUPS: Comma-separated `model=target` pairs. A target is `backup_model`,
+  `@ollama_url` (same model on another Ollama server) or `backup_model@ollama_url`.
+  The model `*` covers every Ollama model without its own entry.
+- LLM_HEDGING_PERCENTILE: Latency percentile that triggers the backup (default 95)
+- LLM_HEDGING_INITIAL_DELAY: Seconds to wait before enough samples exist (default 2.0)
+- LLM_HEDGING_MIN_DELAY: Lower bound of the delay in seconds (default 0.05)
+- LLM_HEDGING_MIN_SAMPLES: Samples needed before the percentile is used (default 20)
+- LLM_HEDGING_WINDOW: Latency samples kept per model (default 200)
+- LLM_HEDGING_MAX_RATIO: Maximum fraction of requests that may be hedged (default 0.1)
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+from github_mingzilla.llm_mcp.util.metrics import LLM_HEDGE_WASTED_TOKENS_TOTAL, LLM_HEDGED_REQUESTS_TOTAL
+from github_mingzilla.llm_mcp.util.tracing import tracer
+
+T = TypeVar("T")
+
+# Takes a slot for a backup call against a model; returns its (idempotent) release function, or None to skip the backup
+BackupGate = Callable[[LlmModel], Optional[Callable[[], None]]]
+
+
+def _no_release() -> None:
+    """Release function of a backup that holds no slot."""
+
+
+class LatencyWindow:
+    """Rolling window of latency samples with nearest-rank percentiles."""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percentile: float) -> float:
+        """Get the given percentile (0-100) of the samples; the window must not be empty."""
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+class HedgingPolicy:
+    """
+    Decides when to hedge a request and races the primary and backup calls.
+    """
+
+    def __init__(self, backup_gate: Optional[BackupGate] = None):
+        """
+        Initialize the policy from environment variables.
+
+        Args:
+            backup_gate: Optional hook that admits backup calls (all admitted if omitted)
+        """
+        self.backup_gate = backup_gate
+        self.enabled = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+        self.percentile = float(os.getenv("LLM_HEDGING_PERCENTILE", "95"))
+        self.initial_delay = float(os.getenv("LLM_HEDGING_INITIAL_DELAY", "2.0"))
+        self.min_delay = float(os.getenv("LLM_HEDGING_MIN_DELAY", "0.05"))
+        self.min_samples = int(os.getenv("LLM_HEDGING_MIN_SAMPLES", "20"))
+        self.window_size = int(os.getenv("LLM_HEDGING_WINDOW", "200"))
+        self.max_ratio = float(os.getenv("LLM_HEDGING_MAX_RATIO", "0.1"))
+        self._backups = self._parse_backups(os.getenv("LLM_HEDGING_BACKUPS", ""))
+
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self._stats = {"requests": 0, "hedged": 0, "primary_won": 0, "backup_won": 0, "skipped_budget": 0, "skipped_admission": 0, "wasted_tokens": 0}
+
+    @staticmethod
+    def _parse_backups(spec: str) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Parse `model=[backup_model][@ollama_url]` pairs into {model: (backup_model, ollama_url)}."""
+        backups = {}
+        for pair in spec.split(","):
+            if "=" not in pair:
+                continue
+            model, target = (part.strip() for part in pair.split("=", 1))
+            backup_model, _, endpoint = target.partition("@")
+            if model and (backup_model or endpoint):
+                backups[model] = (backup_model or None, endpoint or None)
+        return backups
+
+    def get_backup(self, llm_model: LlmModel) -> Optional[LlmModel]:
+        """
+        Get the backup target for a model.
+
+        Args:
+            llm_model: Primary model configuration
+
+        Returns:
+            Backup model configuration, or None if the model is not hedged
+        """
+        if not self.enabled:
+            return None
+        target = self._backups.get(llm_model.model_name)
+        if target is None and llm_model.provider == "ollama":
+            target = self._backups.get("*")
+        if target is None:
+            return None
+
+        backup_model, endpoint = target
+        backup = LlmModel.get_by_model(backup_model) if backup_model else llm_model
+        if endpoint:
+            if backup.provider != "ollama":
+                return None
+            backup = backup.on_endpoint(endpoint)
+        return None if backup == llm_model else backup
+
+    def get_delay(self, model_name: str) -> float:
+        """Get the time to wait for the primary before sending the backup."""
+        window = self._latencies.get(model_name)
+        if window is None or len(window) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, window.percentile(self.percentile))
+
+    async def call(self, llm_model: LlmModel, backup: LlmModel, call: Callable[[LlmModel], Awaitable[T]], prompt_tokens: int) -> T:
+        """
+        Run a batch call, hedged with a backup call.
+
+        Args:
+            llm_model: Primary model configuration
+            backup: Backup model configuration
+            call: Makes the call against a given model configuration
+            prompt_tokens: Estimated prompt size, counted as wasted for a cancelled loser
+
+        Returns:
+            Result of the call that succeeded first
+        """
+        winner, loser, _, release_backup = await self._race(llm_model, backup, lambda: call(llm_model), lambda: call(backup))
+        try:
+            if loser is not None:
+                wasted = prompt_tokens
+                if loser.done() and not loser.cancelled() and loser.exception() is None:
+                    usage = getattr(loser.result(), "usage", None) or {}
+                    wasted += usage.get("completion_tokens", 0)
+                await self._cancel(loser)
+                self._record_waste(llm_model.model_name, wasted)
+            return winner.result()
+        finally:
+            release_backup()
+
+    async def stream(
+        self,
+        llm_model: LlmModel,
+        backup: LlmModel,
+        open_stream: Callable[[LlmModel], AsyncIterator[T]],
+        prompt_tokens: int,
+        is_error: Callable[[T], bool] = lambda item: False,
+    ) -> AsyncIterator[T]:
+        """
+        Run a stream, hedged with a backup stream until one produces its first item.
+
+        Args:
+            llm_model: Primary model configuration
+            backup: Backup model configuration
+            open_stream: Opens the stream against a given model configuration
+            prompt_tokens: Estimated prompt size, counted as wasted for a cancelled loser
+            is_error: Tells whether a first item reports a failed call (it then loses)
+
+        Yields:
+            Items of the stream that produced its first successful item first
+        """
+        streams: Dict[str, AsyncIterator[T]] = {"primary": open_stream(llm_model)}
+        release_backup = _no_release
+
+        def start_backup() -> Awaitable[T]:
+            streams["backup"] = open_stream(backup)
+            return streams["backup"].__anext__()
+
+        try:
+            winner, loser, outcome, release_backup = await self._race(llm_model, backup, streams["primary"].__anext__, start_backup, is_error)
+            if loser is not None:
+                produced = loser.done() and not loser.cancelled() and loser.exception() is None
+                await self._cancel(loser)
+                self._record_waste(llm_model.model_name, prompt_tokens + (1 if produced else 0))
+            # A losing backup gives its slot back now rather than when the primary finishes
+            if outcome == "primary" and "backup" in streams:
+                await streams.pop("backup").aclose()
+                release_backup()
+
+            try:
+                first = winner.result()
+            except StopAsyncIteration:
+                return
+            yield first
+            async for item in streams[outcome]:
+                yield item
+        finally:
+            for stream in streams.values():
+                await stream.aclose()
+            release_backup()
+
+    async def _race(
+        self,
+        llm_model: LlmModel,
+        backup_model: LlmModel,
+        start_primary: Callable[[], Awaitable[T]],
+        start_backup: Callable[[], Awaitable[T]],
+        is_error: Callable[[T], bool] = lambda result: False,
+    ) -> Tuple["asyncio.Future[T]", Optional["asyncio.Future[T]"], str, Callable[[], None]]:
+        """
+        Run the primary, start the backup if the primary is slow, and pick the winner.
+
+        The primary's latency is recorded; when it loses, its elapsed time at that point
+        is recorded instead (a lower bound of its real latency). A call wins by finishing
+        without an exception and with a result that is not an error.
+
+        Returns:
+            Tuple of the finished winning task, the losing task (None if not hedged),
+            which call won ("primary" or "backup") and the function releasing the
+            backup's slot (idempotent; the caller calls it once the backup is done).
+            If every call failed, the primary is returned as the winner.
+        """
+        model_name = llm_model.model_name
+        self._stats["requests"] += 1
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(start_primary())
+        backup = None
+        release_backup = None
+        try:
+            delay = self.get_delay(model_name)
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done:
+                if self._stats["hedged"] >= self.max_ratio * self._stats["requests"]:
+                    self._stats["skipped_budget"] += 1
+                else:
+                    release_backup = self._admit_backup(backup_model)
+                    if release_backup is None:
+                        self._stats["skipped_admission"] += 1
+                if release_backup is None:
+                    await asyncio.wait({primary})
+            if primary.done():
+                self._record_latency(model_name, time.perf_counter() - started)
+                return primary, None, "primary", _no_release
+
+            self._stats["hedged"] += 1
+            tracer.current_span().add_event("hedge_started", delay_ms=round(delay * 1000, 1))
+            backup = asyncio.ensure_future(start_backup())
+            pending = {primary, backup}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task, loser, outcome in ((primary, backup, "primary"), (backup, primary, "backup")):
+                    if task in done and task.exception() is None and not is_error(task.result()):
+                        self._record_latency(model_name, time.perf_counter() - started)
+                        self._stats[f"{outcome}_won"] += 1
+                        LLM_HEDGED_REQUESTS_TOTAL.inc(model_name, outcome)
+                        tracer.current_span().add_event("hedge_won", winner=outcome)
+                        return task, loser, outcome, release_backup
+                if not pending:
+                    return primary, backup, "primary", release_backup
+        except BaseException:
+            for task in (primary, backup):
+                if task is not None:
+                    await self._cancel(task)
+            if release_backup is not None:
+                release_backup()
+            raise
+
+    def _admit_backup(self, backup_model: LlmModel) -> Optional[Callable[[], None]]:
+        """Take a slot for a backup call through the gate; None means the backup is skipped."""
+        if self.backup_gate is None:
+            return _no_release
+        return self.backup_gate(backup_model)
+
+    @staticmethod
+    async def _cancel(task: "asyncio.Future[Any]") -> None:
+        """Cancel a task (if still running) and wait until it has finished."""
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def _record_latency(self, model_name: str, seconds: float) -> None:
+        window = self._latencies.get(model_name)
+        if window is None:
+            window = self._latencies[model_name] = LatencyWindow(self.window_size)
+        window.add(seconds)
+
+    def _record_waste(self, model_name: str, tokens: int) -> None:
+        self._stats["wasted_tokens"] += tokens
+        LLM_HEDGE_WASTED_TOKENS_TOTAL.inc(model_name, amount=tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hedging statistics.
+
+        Returns:
+            Dictionary with configuration, counters and the current delay per model
+        """
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "max_ratio": self.max_ratio,
+            "backups": {model: f"{backup_model or ''}{'@' + endpoint if endpoint else ''}" for model, (backup_model, endpoint) in self._backups.items()},
+            "delays_ms": {model: round(self.get_delay(model) * 1000, 1) for model in self._latencies},
+            **self._stats,
+        }
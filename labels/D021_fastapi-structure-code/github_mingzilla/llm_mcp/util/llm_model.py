@@ -1,12 +1,28 @@
 """LLM Model configuration utility with enum-like behavior for model-to-provider mapping."""
 
 import os
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
 
 # Class-level cache for model configurations
 _MODEL_CACHE: Dict[str, "LlmModel"] = {}
 
+# Context window sizes in tokens; LLM_CONTEXT_WINDOW overrides them for every model
+_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4.1-nano": 1047576,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-3.5-turbo": 16385,
+    "o1-preview": 128000,
+    "o1-mini": 128000,
+    "tinyllama": 2048,
+    "qwen2.5:3b": 32768,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+DEFAULT_MAX_OUTPUT_TOKENS = 2000
+
 
 @dataclass
 class LlmModel:
@@ -16,6 +32,10 @@ class LlmModel:
     batch_url: str
     stream_url: str
     model_name: str
+    context_window: int = DEFAULT_CONTEXT_WINDOW
+    max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS
+    # Ollama server URL the model is served from; None for providers with a fixed endpoint
+    endpoint: Optional[str] = None
 
     @staticmethod
     def get_by_model(model_name: str) -> "LlmModel":
@@ -47,6 +67,8 @@ class LlmModel:
         else:
             config = LlmModel._create_ollama_config(model_name)
 
+        config.context_window = int(os.getenv("LLM_CONTEXT_WINDOW", "0")) or _CONTEXT_WINDOWS.get(model_name, DEFAULT_CONTEXT_WINDOW)
+
         # Cache the configuration
         _MODEL_CACHE[model_name] = config
         return config
@@ -65,7 +87,46 @@ class LlmModel:
     def _create_ollama_config(model_name: str) -> "LlmModel":
         base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         base_url = base_url.rstrip("/")
-        return LlmModel(provider="ollama", batch_url=f"{base_url}/v1/chat/completions", stream_url=f"{base_url}/v1/chat/completions", model_name=model_name)
+        return LlmModel(provider="ollama", batch_url=f"{base_url}/v1/chat/completions", stream_url=f"{base_url}/v1/chat/completions", model_name=model_name, endpoint=base_url)
+
+    def on_endpoint(self, endpoint: str) -> "LlmModel":
+        """
+        Get a copy of this Ollama model configuration served from another Ollama server.
+
+        Args:
+            endpoint: Ollama server URL (same form as OLLAMA_BASE_URL)
+
+        Returns:
+            LlmModel with its URLs pointing at the given server
+
+        Raises:
+            ValueError: If the model is not served by Ollama
+        """
+        if self.provider != "ollama":
+            raise ValueError(f"Only Ollama models can be moved to another endpoint, not {self.provider} model {self.model_name}")
+        endpoint = endpoint.rstrip("/")
+        return replace(self, batch_url=f"{endpoint}/v1/chat/completions", stream_url=f"{endpoint}/v1/chat/completions", endpoint=endpoint)
+
+    @property
+    def prompt_token_budget(self) -> int:
+        """Tokens available for the prompt once room for the completion is reserved.
+
+        Small context windows reserve at most a quarter of the window for the completion.
+        """
+        return self.context_window - min(self.max_output_tokens, self.context_window // 4)
+
+    def max_tokens_for(self, prompt_tokens: int) -> int:
+        """
+        Get the completion token limit for a prompt, so prompt and completion fit the window.
+
+        Args:
+            prompt_tokens: Counted tokens of the prompt
+
+        Returns:
+            The smaller of max_output_tokens and the room left in the context window
+            (at least 1, leaving an oversized prompt for the server to reject)
+        """
+        return max(min(self.max_output_tokens, self.context_window - prompt_tokens), 1)
 
     def get_headers(self) -> Dict[str, str]:
         """Get appropriate headers for this model's provider."""
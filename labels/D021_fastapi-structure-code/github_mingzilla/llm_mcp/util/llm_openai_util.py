@@ -1,9 +1,13 @@
-from typing import Any, Dict, List
+from typing import Any, Counter, Dict, List, Tuple
 
 from github_mingzilla.llm_mcp.models import ApiChatMessage, DomainMcpTool, LlmResponse, LlmToolCall, OpenAIMessage
 
 
 class LlmOpenaiUtil:
+    # Converted tool schemas keyed by the (server, name) pairs of the tool set
+    _tool_schema_cache: Dict[Tuple[Tuple[str, str], ...], List[Dict[str, Any]]] = {}
+    _TOOL_SCHEMA_CACHE_MAX_ENTRIES = 128
+
     @staticmethod
     def mcp_to_openai_function(mcp_tool: DomainMcpTool) -> Dict[str, Any]:
         """
@@ -47,9 +51,44 @@ class LlmOpenaiUtil:
             mcp_tools: List of DomainMcpTool objects
 
         Returns:
-            List of OpenAI function definitions
+            List of OpenAI function definitions (shared between calls; do not modify)
+        """
+        cache_key = tuple((tool.server, tool.name) for tool in mcp_tools)
+        tools = LlmOpenaiUtil._tool_schema_cache.get(cache_key)
+        if tools is None:
+            if len(LlmOpenaiUtil._tool_schema_cache) >= LlmOpenaiUtil._TOOL_SCHEMA_CACHE_MAX_ENTRIES:
+                LlmOpenaiUtil._tool_schema_cache.clear()
+            tools = [LlmOpenaiUtil.mcp_to_openai_function(tool) for tool in mcp_tools]
+            LlmOpenaiUtil._tool_schema_cache[cache_key] = tools
+        return tools
+
+    @staticmethod
+    def clear_tool_schema_cache() -> None:
+        """Drop converted tool schemas, e.g. after the MCP tool catalogue was refreshed."""
+        LlmOpenaiUtil._tool_schema_cache.clear()
+
+    @staticmethod
+    def get_unanswered_tool_calls(tool_calls: List[Dict[str, Any]], answered: Counter) -> List[Dict[str, Any]]:
+        """
+        Get the tool calls of an assistant message that have no result.
+
+        Results are matched to calls by ID in order, so when a model repeats an ID each
+        result answers one call.
+
+        Args:
+            tool_calls: OpenAI-format tool calls of the assistant message
+            answered: Number of tool results per tool call ID (consumed)
+
+        Returns:
+            Tool calls without a result, in their original order
         """
-        return [LlmOpenaiUtil.mcp_to_openai_function(tool) for tool in mcp_tools]
+        unanswered = []
+        for tool_call in tool_calls:
+            if answered[tool_call["id"]] > 0:
+                answered[tool_call["id"]] -= 1
+            else:
+                unanswered.append(tool_call)
+        return unanswered
 
     @staticmethod
     def chat_messages_to_openai_format(messages: List[ApiChatMessage]) -> List[Dict[str, Any]]:
@@ -1,14 +1,35 @@
+from typing import Dict, Optional
+
 from github_mingzilla.llm_mcp.llm_clients.abstract_llm_client import AbstractLlmClient
-from github_mingzilla.llm_mcp.llm_clients.llm_ollama_client import LLMOllamaClient
-from github_mingzilla.llm_mcp.llm_clients.llm_openai_client import LLMOpenAIClient
 
 
 class LLMProviders:
+    """
+    Provider clients by name, created on first use.
+
+    Provider modules are imported inside `_create` so that the `openai` and `pydantic_ai`
+    SDKs are loaded when a provider is first needed (or warmed up), not at worker boot.
+    """
+
     def __init__(self):
-        self._provider_dict = {
-            "ollama": LLMOllamaClient(),
-            "openai": LLMOpenAIClient(),
-        }
+        self._provider_dict: Dict[str, AbstractLlmClient] = {}
+
+    def get_by_name(self, provider_name: str, endpoint: Optional[str] = None) -> AbstractLlmClient:
+        """Get the provider client, one per Ollama endpoint when `endpoint` is given."""
+        key = f"{provider_name}@{endpoint}" if endpoint else provider_name
+        provider = self._provider_dict.get(key)
+        if provider is None:
+            provider = self._create(provider_name, endpoint)
+            self._provider_dict[key] = provider
+        return provider
+
+    @staticmethod
+    def _create(provider_name: str, endpoint: Optional[str]) -> AbstractLlmClient:
+        if provider_name == "openai":
+            from github_mingzilla.llm_mcp.llm_clients.llm_openai_client import LLMOpenAIClient
+
+            return LLMOpenAIClient()
+
+        from github_mingzilla.llm_mcp.llm_clients.llm_ollama_client import LLMOllamaClient
 
-    def get_by_name(self, provider_name: str) -> AbstractLlmClient:
-        return self._provider_dict[provider_name] or LLMOllamaClient()
+        return LLMOllamaClient(base_url=endpoint)
@@ -0,0 +1,262 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Metrics are defined once at module level below and recorded from the clients and
+services; `/metrics` renders them together with point-in-time gauges collected at
+scrape time. Recording is a dict lookup plus a bisect, cheap enough for per-chunk use.
+"""
+
+import bisect
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set, escaping label values."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _HistogramChild:
+    """Bucket counts, sum and count of one label set."""
+
+    __slots__ = ("_upper_bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, upper_bounds: List[float]):
+        self._upper_bounds = upper_bounds
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)  # Last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.bucket_counts[bisect.bisect_left(self._upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram:
+    """Prometheus-style histogram with fixed buckets and optional labels."""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            buckets: Sorted bucket upper bounds (the +Inf bucket is implicit)
+            label_names: Names of the labels every observation carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.upper_bounds = sorted(buckets)
+        self.label_names = tuple(label_names)
+        self._children: Dict[LabelValues, _HistogramChild] = {}
+
+    def labels(self, *values: str) -> _HistogramChild:
+        """
+        Get the series of a label set, for repeated observations on a hot path.
+
+        Args:
+            values: Label values in the order of label_names
+
+        Returns:
+            Series to call observe() on
+        """
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _HistogramChild(self.upper_bounds)
+        return child
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation for a label set."""
+        self.labels(*label_values).observe(value)
+
+    def render(self) -> List[str]:
+        """Render the histogram in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bucket_label_names = self.label_names + ("le",)
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.upper_bounds + [math.inf], child.bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_label_names, values + (_format_value(upper_bound),))} {cumulative}")
+            labels = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Counter:
+    """Prometheus-style monotonically increasing counter with optional labels."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """
+        Initialize the counter.
+
+        Args:
+            name: Metric name (conventionally ending in _total)
+            documentation: HELP text
+            label_names: Names of the labels every increment carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increase the counter of a label set."""
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        """Render the counter in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, values)} {_format_value(value)}")
+        return lines
+
+
+def render_collected(name: str, documentation: str, metric_type: str, label_names: Sequence[str], samples: Iterable[Tuple[Sequence[str], float]]) -> List[str]:
+    """
+    Render values collected at scrape time in Prometheus text format.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        metric_type: "gauge" or "counter" (for cumulative totals kept by a component)
+        label_names: Names of the labels of each sample
+        samples: (label values, value) pairs
+
+    Returns:
+        Exposition lines
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    for values, value in samples:
+        lines.append(f"{name}{_format_labels(label_names, tuple(values))} {_format_value(value)}")
+    return lines
+
+
+class MetricsRegistry:
+    """Collection of the metrics rendered on `/metrics`."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float], label_names: Sequence[str] = ()) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, buckets, label_names))
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, label_names))
+
+    def _register(self, metric):
+        """Register a metric under its unique name."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[object]:
+        """Get a registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> List[str]:
+        """Render all registered metrics in Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return lines
+
+
+metrics_registry = MetricsRegistry()
+
+_LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_GAP_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+_CHUNK_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_RATE_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 200, 400, 800)
+
+# Upstream LLM latency, measured from sending the request to the provider
+LLM_TTFT_SECONDS = metrics_registry.histogram("llm_time_to_first_chunk_seconds", "Time from sending the upstream request to its first streamed chunk.", _LATENCY_BUCKETS, ("model", "provider"))
+LLM_INTER_CHUNK_SECONDS = metrics_registry.histogram("llm_inter_chunk_gap_seconds", "Time between consecutive upstream stream reads that produced chunks.", _GAP_BUCKETS, ("model", "provider"))
+LLM_STREAM_DURATION_SECONDS = metrics_registry.histogram("llm_stream_duration_seconds", "Total duration of upstream streams.", _DURATION_BUCKETS, ("model", "provider"))
+LLM_STREAM_CHUNKS = metrics_registry.histogram("llm_stream_chunks", "Chunks received per upstream stream.", _CHUNK_BUCKETS, ("model", "provider"))
+LLM_STREAM_CHUNKS_PER_SECOND = metrics_registry.histogram("llm_stream_chunks_per_second", "Chunks per second after the first chunk (about one token per chunk).", _RATE_BUCKETS, ("model", "provider"))
+LLM_REQUEST_DURATION_SECONDS = metrics_registry.histogram("llm_request_duration_seconds", "Duration of non-streaming upstream completions.", _DURATION_BUCKETS, ("model", "provider"))
+LLM_ERRORS_TOTAL = metrics_registry.counter("llm_errors_total", "Upstream LLM calls that failed or returned an error status.", ("model", "provider", "mode"))
+LLM_HEDGED_REQUESTS_TOTAL = metrics_registry.counter("llm_hedged_requests_total", "Requests that sent a backup call, by the call that answered first.", ("model", "winner"))
+LLM_HEDGE_WASTED_TOKENS_TOTAL = metrics_registry.counter("llm_hedge_wasted_tokens_total", "Estimated tokens spent by the losing call of hedged requests.", ("model",))
+
+# Gateway latency, measured from the start of request handling to the first chunk sent to the client
+GATEWAY_TTFT_SECONDS = metrics_registry.histogram("gateway_time_to_first_chunk_seconds", "Time from handling a stream request to its first chunk sent to the client.", _LATENCY_BUCKETS, ("model", "mode"))
+
+# MCP tool calls
+MCP_TOOL_CALL_SECONDS = metrics_registry.histogram("mcp_tool_call_duration_seconds", "Duration of MCP tool calls.", _LATENCY_BUCKETS, ("server", "status"))
+MCP_TOOL_CALLS_SAVED_TOTAL = metrics_registry.counter("mcp_tool_calls_saved_total", "Tool calls answered without calling the server, by reason (cached, deduplicated).", ("server", "reason"))
+
+
+class StreamTimer:
+    """
+    Records the latency metrics of one upstream stream.
+
+    Call on_chunks() whenever a network read produced chunks and finish() once the
+    stream ends, however it ends.
+    """
+
+    __slots__ = ("_labels", "_gap_series", "_started", "_first_at", "_last_at", "chunks", "_finished")
+
+    def __init__(self, model: str, provider: str):
+        """
+        Start timing a stream; create it right before sending the upstream request.
+
+        Args:
+            model: Model name label
+            provider: Provider name label
+        """
+        self._labels = (model, provider)
+        self._gap_series = LLM_INTER_CHUNK_SECONDS.labels(model, provider)
+        self._started = time.perf_counter()
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self.chunks = 0
+        self._finished = False
+
+    def on_chunks(self, count: int = 1) -> None:
+        """Record chunks arriving now."""
+        now = time.perf_counter()
+        if self._first_at is None:
+            self._first_at = now
+            LLM_TTFT_SECONDS.observe(now - self._started, *self._labels)
+        else:
+            self._gap_series.observe(now - self._last_at)
+        self._last_at = now
+        self.chunks += count
+
+    def finish(self) -> None:
+        """Record stream totals (only the first call has an effect)."""
+        if self._finished:
+            return
+        self._finished = True
+        LLM_STREAM_DURATION_SECONDS.observe(time.perf_counter() - self._started, *self._labels)
+        LLM_STREAM_CHUNKS.observe(self.chunks, *self._labels)
+        if self.chunks > 1 and self._last_at > self._first_at:
+            LLM_STREAM_CHUNKS_PER_SECOND.observe((self.chunks - 1) / (self._last_at - self._first_at), *self._labels)
@@ -0,0 +1,177 @@
+"""Byte-level Server-Sent Events helpers for passthrough streaming."""
+
+import json
+from typing import List, Union
+
+
+class SseFrameBuffer:
+    """
+    Reassembles upstream SSE `data:` lines from raw network reads.
+
+    Network reads do not respect line boundaries, so incomplete trailing bytes are
+    kept until the next read completes them. Complete `data:` payloads are re-framed
+    as downstream SSE events without ever decoding them to `str`.
+    """
+
+    DATA_PREFIX = b"data:"
+    DONE_PAYLOAD = b"[DONE]"
+
+    def __init__(self, event_name: bytes = b"chunk"):
+        """
+        Initialize an empty reassembly buffer.
+
+        Args:
+            event_name: SSE event name attached to every forwarded frame
+        """
+        self._buffer = bytearray()
+        self._event_line = b"event: " + event_name + b"\n"
+        self.frame_count = 0
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Append raw bytes and return every complete frame they finish.
+
+        Args:
+            data: Raw bytes as read from the upstream response
+
+        Returns:
+            Downstream SSE bytes for all complete frames, or b"" if none completed
+        """
+        self._buffer += data
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return b""
+
+        complete = bytes(self._buffer[: end + 1])
+        del self._buffer[: end + 1]
+        return self._frame_lines(complete.split(b"\n"))
+
+    def flush(self) -> bytes:
+        """
+        Frame any trailing bytes left when the upstream closes without a final newline.
+
+        Returns:
+            Downstream SSE bytes for the trailing frame, or b"" if nothing was pending
+        """
+        if not self._buffer:
+            return b""
+
+        remaining = bytes(self._buffer)
+        self._buffer.clear()
+        return self._frame_lines([remaining])
+
+    def encode_frame(self, payload: bytes) -> bytes:
+        """
+        Frame a single payload as a downstream SSE event.
+
+        Args:
+            payload: Event data (typically a JSON document)
+
+        Returns:
+            Complete SSE event bytes
+        """
+        return self._event_line + b"data: " + payload + b"\n\n"
+
+    def _frame_lines(self, lines: list) -> bytes:
+        """Convert complete upstream lines into downstream SSE events, skipping non-data lines."""
+        frames = []
+        for line in lines:
+            if not line.startswith(self.DATA_PREFIX):
+                continue
+            payload = line[len(self.DATA_PREFIX) :].strip()
+            if not payload or payload == self.DONE_PAYLOAD:
+                continue
+            frames.append(self.encode_frame(payload))
+
+        self.frame_count += len(frames)
+        return b"".join(frames)
+
+
+class DeltaContentAccumulator:
+    """
+    Accumulates `choices[0].delta.content` from OpenAI-format stream chunks.
+
+    Instead of running `json.loads` on every token, each chunk is scanned for the
+    `"content"` string that follows `"delta"` and the still-escaped JSON string body
+    is kept as-is. Escaped fragments concatenate into one valid JSON string body, so
+    the full reply is decoded exactly once in `get_content()`.
+
+    Accepts both `str` chunks (raw JSON documents) and `bytes` (passthrough SSE frames,
+    possibly several per write).
+    """
+
+    def __init__(self):
+        """Initialize an empty accumulator."""
+        self._fragments: List[bytes] = []
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        """
+        Extract delta content from a chunk and keep it for later decoding.
+
+        Args:
+            chunk: Raw JSON chunk or SSE frame bytes from the LLM stream
+        """
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        position = 0
+
+        while True:
+            delta_start = data.find(b'"delta"', position)
+            if delta_start < 0:
+                return
+
+            key_start = data.find(b'"content"', delta_start)
+            if key_start < 0:
+                return
+
+            # A later delta before the key means this delta carried no content
+            next_delta = data.find(b'"delta"', delta_start + 7)
+            if 0 <= next_delta < key_start:
+                position = next_delta
+                continue
+
+            value_start = data.find(b":", key_start + 9) + 1
+            while data[value_start : value_start + 1] in (b" ", b"\t"):
+                value_start += 1
+
+            # null content (e.g. tool-call or role-only deltas)
+            if data[value_start : value_start + 1] != b'"':
+                position = value_start
+                continue
+
+            value_end = self._find_string_end(data, value_start + 1)
+            if value_end < 0:
+                return
+
+            self._fragments.append(data[value_start + 1 : value_end])
+            position = value_end + 1
+
+    def get_content(self) -> str:
+        """
+        Decode all accumulated fragments into the assistant reply.
+
+        Returns:
+            Accumulated content text (empty string if nothing was streamed)
+        """
+        if not self._fragments:
+            return ""
+
+        body = b"".join(self._fragments)
+        try:
+            return json.loads(b'"' + body + b'"')
+        except json.JSONDecodeError:
+            return body.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _find_string_end(data: bytes, start: int) -> int:
+        """Find the closing quote of a JSON string body, skipping escaped quotes."""
+        quote = data.find(b'"', start)
+        while quote >= 0:
+            backslashes = 0
+            index = quote - 1
+            while index >= start and data[index] == 0x5C:
+                backslashes += 1
+                index -= 1
+            if backslashes % 2 == 0:
+                return quote
+            quote = data.find(b'"', quote + 1)
+        return -1
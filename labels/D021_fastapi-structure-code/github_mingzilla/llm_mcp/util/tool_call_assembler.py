@@ -0,0 +1,128 @@
+"""Incremental assembly of OpenAI tool calls from streamed chat completion deltas."""
+
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from github_mingzilla.llm_mcp.models import LlmResponse, LlmToolCall
+
+
+class ToolCallStreamAssembler:
+    """
+    Builds OpenAI `tool_calls` from streaming deltas.
+
+    Each tool call is reported exactly once, as soon as it is complete:
+    - its arguments parse as a JSON object (nothing valid can follow the closing brace)
+    - a tool call with a higher index starts streaming
+    - the choice reports a finish_reason
+    """
+
+    def __init__(self):
+        """Initialize an empty assembler."""
+        self._calls: Dict[int, Dict[str, Any]] = {}
+        self._completed: Set[int] = set()
+        self._content_parts: List[str] = []
+        self.finish_reason: Optional[str] = None
+
+    def feed(self, chunk: Dict[str, Any]) -> List[LlmToolCall]:
+        """
+        Apply one parsed stream chunk.
+
+        Args:
+            chunk: Parsed OpenAI-format chat completion chunk
+
+        Returns:
+            Tool calls that became complete with this chunk, in index order
+        """
+        choices = chunk.get("choices") or []
+        if not choices:
+            return []
+
+        choice = choices[0]
+        delta = choice.get("delta") or {}
+        if delta.get("content"):
+            self._content_parts.append(delta["content"])
+
+        completed = []
+        for position, tool_call_delta in enumerate(delta.get("tool_calls") or []):
+            index = tool_call_delta.get("index", position)
+
+            # A new index means every earlier tool call has finished streaming
+            if index not in self._calls:
+                completed.extend(self._complete_where(lambda other: other < index))
+
+            call = self._calls.setdefault(index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+            if tool_call_delta.get("id"):
+                call["id"] = tool_call_delta["id"]
+            function_delta = tool_call_delta.get("function") or {}
+            if function_delta.get("name"):
+                call["function"]["name"] += function_delta["name"]
+            if function_delta.get("arguments"):
+                call["function"]["arguments"] += function_delta["arguments"]
+
+            if index not in self._completed and self._has_complete_arguments(call):
+                completed.extend(self._complete_where(lambda other: other == index))
+
+        if choice.get("finish_reason"):
+            self.finish_reason = choice["finish_reason"]
+            completed.extend(self._complete_where(lambda other: True))
+
+        return completed
+
+    def finish(self) -> List[LlmToolCall]:
+        """
+        Complete any tool calls still open when the stream ends without a finish_reason.
+
+        Returns:
+            Tool calls that had not been reported yet
+        """
+        return self._complete_where(lambda other: True)
+
+    def get_tool_calls(self) -> List[LlmToolCall]:
+        """Get all assembled tool calls in index order."""
+        return [self._to_tool_call(index) for index in sorted(self._calls)]
+
+    def to_llm_response(self, model: Optional[str], provider: Optional[str]) -> LlmResponse:
+        """
+        Build the generic response for the whole streamed completion.
+
+        Args:
+            model: Model name used for the request
+            provider: Provider name used for the request
+
+        Returns:
+            LlmResponse with accumulated content and tool calls
+        """
+        tool_calls = self.get_tool_calls()
+        return LlmResponse(
+            content="".join(self._content_parts) or None,
+            tool_calls=tool_calls or None,
+            finish_reason=self.finish_reason,
+            model=model,
+            provider=provider,
+        )
+
+    def _complete_where(self, predicate) -> List[LlmToolCall]:
+        """Mark matching open tool calls as complete and return them in index order."""
+        completed = []
+        for index in sorted(self._calls):
+            if index not in self._completed and predicate(index):
+                self._completed.add(index)
+                completed.append(self._to_tool_call(index))
+        return completed
+
+    def _to_tool_call(self, index: int) -> LlmToolCall:
+        """Convert an assembled tool call dict to the generic tool call model."""
+        call = self._calls[index]
+        arguments = call["function"]["arguments"] or "{}"
+        return LlmToolCall(id=call["id"] or f"call_{index}", type=call["type"], function={"name": call["function"]["name"], "arguments": arguments})
+
+    @staticmethod
+    def _has_complete_arguments(call: Dict[str, Any]) -> bool:
+        """Check whether the streamed arguments already form a complete JSON object."""
+        arguments = call["function"]["arguments"].rstrip()
+        if not call["function"]["name"] or not arguments.endswith("}"):
+            return False
+        try:
+            return isinstance(json.loads(arguments), dict)
+        except json.JSONDecodeError:
+            return False
@@ -0,0 +1,228 @@
+"""
+Low-overhead request tracing with head sampling and an in-memory ring buffer.
+
+A trace is started per request; whether it is recorded is decided once, at its start.
+For unsampled requests every span is a shared no-op object, so instrumented code pays
+one context variable lookup per span and nothing per chunk. Finished traces are kept in
+a bounded buffer served by `/debug/traces`.
+
+Configuration via environment variables:
+- TRACE_SAMPLE_RATE: Fraction of requests traced, 0.0-1.0 (default 0.01; 0 disables)
+- TRACE_BUFFER_SIZE: Finished traces kept in memory (default 200)
+"""
+
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+class Span:
+    """Timed operation within a sampled trace."""
+
+    __slots__ = ("name", "span_id", "parent_id", "_trace", "_started", "_ended", "attributes", "events", "status")
+
+    def __init__(self, trace: "_Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self._trace = trace
+        self._started = time.perf_counter()
+        self._ended: Optional[float] = None
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute on the span."""
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record a point-in-time event, timestamped relative to the trace start."""
+        self.events.append({"name": name, "at_ms": self._trace.elapsed_ms(), **attributes})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span to a JSON-serializable dict."""
+        ended = self._ended if self._ended is not None else time.perf_counter()
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self._started - self._trace.started) * 1000, 3),
+            "duration_ms": round((ended - self._started) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class _NoopSpan:
+    """Span stand-in for unsampled requests; every method does nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Spans of one sampled request."""
+
+    __slots__ = ("trace_id", "started", "started_at", "spans")
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the trace started."""
+        return round((time.perf_counter() - self.started) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the trace to a JSON-serializable dict."""
+        spans = [span.to_dict() for span in self.spans]
+        return {
+            "trace_id": self.trace_id,
+            "name": spans[0]["name"] if spans else None,
+            "started_at": self.started_at,
+            "duration_ms": spans[0]["duration_ms"] if spans else 0.0,
+            "spans": spans,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Head-sampling tracer that keeps recent traces in a ring buffer.
+    """
+
+    def __init__(self, sample_rate: float, buffer_size: int):
+        """
+        Initialize the tracer.
+
+        Args:
+            sample_rate: Fraction of traces recorded
+            buffer_size: Number of finished traces kept
+        """
+        self.sample_rate = sample_rate
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._stats = {"started": 0, "sampled": 0}
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """
+        Start a request trace, making the sampling decision for all its spans.
+
+        Inside an already sampled trace this starts a child span instead.
+
+        Args:
+            name: Name of the root span (e.g. "chat.stream")
+            attributes: Initial span attributes
+
+        Yields:
+            Root span, or a no-op span if the request is not sampled
+        """
+        if _current_span.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        self._stats["started"] += 1
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield NOOP_SPAN
+            return
+
+        self._stats["sampled"] += 1
+        trace = _Trace()
+        try:
+            with self._open_span(trace, name, None, attributes) as span:
+                yield span
+        finally:
+            self._buffer.append(trace.to_dict())
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """
+        Open a child span of the current span.
+
+        Args:
+            name: Span name (e.g. "llm.call")
+            attributes: Initial span attributes
+
+        Yields:
+            New span, or a no-op span outside a sampled trace
+        """
+        parent = _current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+
+        with self._open_span(parent._trace, name, parent.span_id, attributes) as span:
+            yield span
+
+    @contextmanager
+    def _open_span(self, trace: _Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> Iterator[Span]:
+        """Record a span and make it current for its duration."""
+        span = Span(trace, name, parent_id, attributes)
+        trace.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except (GeneratorExit, asyncio.CancelledError):
+            span.status = "cancelled"
+            raise
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = str(e)
+            raise
+        finally:
+            span._ended = time.perf_counter()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Streams may be finalized in a different context than they started in
+                pass
+
+    def current_span(self) -> Any:
+        """Get the current span (a no-op span outside a sampled trace)."""
+        return _current_span.get() or NOOP_SPAN
+
+    def get_recent_traces(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Get the most recently finished traces.
+
+        Args:
+            limit: Maximum number of traces
+
+        Returns:
+            Traces as dicts, newest first
+        """
+        return list(reversed(self._buffer))[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get tracer statistics.
+
+        Returns:
+            Dictionary with sampling configuration and counters
+        """
+        return {"sample_rate": self.sample_rate, "buffer_size": self._buffer.maxlen, "buffered": len(self._buffer), **self._stats}
+
+
+# Module-level tracer used by all instrumented code
+tracer = Tracer(float(os.getenv("TRACE_SAMPLE_RATE", "0.01")), int(os.getenv("TRACE_BUFFER_SIZE", "200")))
@@ -0,0 +1,175 @@
+"""Local embedding and brute-force cosine similarity index (requires NumPy)."""
+
+import hashlib
+import re
+from typing import Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency; semantic caching is disabled without it
+    np = None
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def numpy_available() -> bool:
+    """Check whether NumPy is installed."""
+    return np is not None
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedder using signed feature hashing.
+
+    Lower-cased word unigrams and bigrams are hashed into a fixed number of dimensions
+    and the vector is L2-normalized, so paraphrases that share most of their words
+    score a high cosine similarity. Useful as a default and in tests; a model-based
+    embedder can replace it for real paraphrase detection.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        """
+        Initialize the embedder.
+
+        Args:
+            dimensions: Size of the embedding vectors
+        """
+        self.dimensions = dimensions
+
+    def __call__(self, text: str) -> "np.ndarray":
+        """
+        Embed a text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            L2-normalized float32 vector (all zeros for text without words)
+        """
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class CosineVectorIndex:
+    """
+    Append-only, matrix-backed cosine similarity index.
+
+    Vectors are stored normalized in the rows of one preallocated matrix (grown by
+    doubling) and queries are normalized too, so a search is a single matrix-vector
+    product whose scores are cosine similarities whatever the embedder returns. Removed rows are only
+    marked dead; the matrix is compacted once dead rows exceed a quarter of it.
+    """
+
+    def __init__(self, dimensions: int, initial_capacity: int = 64):
+        """
+        Initialize an empty index.
+
+        Args:
+            dimensions: Size of the stored vectors
+            initial_capacity: Rows allocated up front
+        """
+        self.dimensions = dimensions
+        self._matrix = np.zeros((initial_capacity, dimensions), dtype=np.float32)
+        self._alive = np.zeros(initial_capacity, dtype=bool)
+        self._payloads: List[Any] = []
+        self._size = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        """Number of live entries."""
+        return self._size - self._dead
+
+    def add(self, vector: "np.ndarray", payload: Any) -> int:
+        """
+        Append a vector with its payload.
+
+        Args:
+            vector: Embedding (normalized here if it is not already)
+            payload: Object returned by searches that match this vector
+
+        Returns:
+            Row of the new entry (valid until the next compaction)
+        """
+        if self._size == len(self._matrix):
+            self._grow()
+
+        self._matrix[self._size] = self._normalize(vector)
+        self._alive[self._size] = True
+        self._payloads.append(payload)
+        self._size += 1
+        return self._size - 1
+
+    def search(self, vector: "np.ndarray") -> Optional[Tuple[int, float, Any]]:
+        """
+        Find the most similar live entry.
+
+        Args:
+            vector: Query embedding (normalized here if it is not already)
+
+        Returns:
+            Tuple of (row, cosine similarity, payload), or None if the index is empty
+        """
+        if not len(self):
+            return None
+
+        scores = self._matrix[: self._size] @ self._normalize(vector)
+        scores[~self._alive[: self._size]] = -np.inf
+        row = int(np.argmax(scores))
+        return row, float(scores[row]), self._payloads[row]
+
+    @staticmethod
+    def _normalize(vector: Any) -> "np.ndarray":
+        """Convert a vector to an L2-normalized float32 array (zero vectors stay zero)."""
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def remove(self, rows: List[int]) -> None:
+        """
+        Mark rows as dead, compacting the matrix when enough rows are dead.
+
+        Args:
+            rows: Rows to remove
+        """
+        for row in rows:
+            if self._alive[row]:
+                self._alive[row] = False
+                self._payloads[row] = None
+                self._dead += 1
+
+        if self._dead and self._dead * 4 >= self._size:
+            self._compact()
+
+    def rows(self) -> List[Tuple[int, Any]]:
+        """Get (row, payload) pairs of all live entries."""
+        return [(row, self._payloads[row]) for row in np.flatnonzero(self._alive[: self._size]).tolist()]
+
+    def _grow(self) -> None:
+        """Double the matrix capacity."""
+        capacity = max(len(self._matrix) * 2, 1)
+        matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        matrix[: self._size] = self._matrix[: self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._size] = self._alive[: self._size]
+        self._matrix, self._alive = matrix, alive
+
+    def _compact(self) -> None:
+        """Move live rows to the front of the matrix, dropping dead ones."""
+        live_rows = np.flatnonzero(self._alive[: self._size])
+        count = len(live_rows)
+        self._matrix[:count] = self._matrix[live_rows]
+        self._matrix[count : self._size] = 0
+        self._alive[:count] = True
+        self._alive[count : self._size] = False
+        self._payloads = [self._payloads[row] for row in live_rows.tolist()]
+        self._size = count
+        self._dead = 0
@@ -0,0 +1,67 @@
+import asyncio
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+from github_mingzilla.llm_mcp.boundary_models import LlmResponse
+from github_mingzilla.llm_mcp.repositories.chat_history_repository import chat_history_repo
+from github_mingzilla.llm_mcp.routers.chat_router import chat_router
+from github_mingzilla.llm_mcp.services.admission_control_service import _AdmissionControlService, admission_control_service
+from github_mingzilla.llm_mcp.services.chat_service import chat_service
+
+MODEL = "gpt-4o-mini"
+
+
+def post_chat(body: dict, path: str = "/api/v1/chat", headers: dict = None) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(chat_router)
+
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post(path, json=body, headers=headers)
+
+    return asyncio.run(send())
+
+
+def test_admission_control_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("ADMISSION_CONTROL_ENABLED", raising=False)
+    assert _AdmissionControlService().enabled is False
+
+
+def test_rejected_request_returns_429_and_leaves_no_user_turn(monkeypatch):
+    monkeypatch.setattr(admission_control_service, "enabled", True)
+    monkeypatch.setattr(admission_control_service, "max_per_model", 1)
+    monkeypatch.setattr(admission_control_service, "max_queue", 0)
+
+    async def invoke(**kwargs):
+        raise AssertionError("a rejected request must not reach the LLM")
+
+    monkeypatch.setattr(chat_service.llm_client, "invoke", invoke)
+    session_id = str(uuid.uuid4())
+
+    # Another request holds the only slot of the model
+    held = asyncio.run(admission_control_service.acquire(MODEL))
+    try:
+        response = post_chat({"message": "Hello", "session_id": session_id, "model": MODEL})
+        stream_response = post_chat({"message": "Hello", "session_id": session_id, "model": MODEL}, "/api/v1/chat/stream", {"Accept": "text/event-stream"})
+    finally:
+        held.release()
+
+    assert response.status_code == 429
+    assert stream_response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert chat_history_repo.find_conversation_by_id(session_id) is None
+
+
+def test_admitted_request_saves_the_whole_turn(monkeypatch):
+    async def invoke(**kwargs):
+        return LlmResponse(content="Hi there", model=MODEL)
+
+    monkeypatch.setattr(chat_service.llm_client, "invoke", invoke)
+    session_id = str(uuid.uuid4())
+
+    response = post_chat({"message": "Hello", "session_id": session_id, "model": MODEL})
+
+    assert response.status_code == 200
+    assert [(message.role, message.content) for message in chat_history_repo.get_conversation_history(session_id)] == [("user", "Hello"), ("assistant", "Hi there")]
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from collections import Counter
+
+import httpx
+from fastapi import FastAPI
+
+from github_mingzilla.llm_mcp.boundary_models import ApiBatchChatRequest, ApiChatResponse
+from github_mingzilla.llm_mcp.routers.chat_router import chat_router
+from github_mingzilla.llm_mcp.services.chat_service import chat_service
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+
+
+def fake_batch_chat(monkeypatch, delays: dict = None, in_flight: Counter = None, peak: Counter = None):
+    async def handle_batch_chat(chat_request):
+        provider = LlmModel.get_by_model(chat_request.model).provider
+        if in_flight is not None:
+            in_flight[provider] += 1
+            peak[provider] = max(peak[provider], in_flight[provider])
+        await asyncio.sleep((delays or {}).get(chat_request.message, 0.01))
+        if in_flight is not None:
+            in_flight[provider] -= 1
+        return ApiChatResponse(response=f"echo {chat_request.message}", session_id="s", model=chat_request.model)
+
+    monkeypatch.setattr(chat_service, "handle_batch_chat", handle_batch_chat)
+
+
+def test_batch_streams_ndjson_in_completion_order(monkeypatch):
+    fake_batch_chat(monkeypatch, delays={"slow": 0.05, "fast": 0})
+    monkeypatch.setattr(chat_service, "bulk_concurrency_per_provider", 2)
+    app = FastAPI()
+    app.include_router(chat_router)
+
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/api/v1/chat/batch", json={"requests": [{"message": "slow"}, {"message": "fast"}, {"message": ""}]})
+
+    response = asyncio.run(send())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text.endswith("\n")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [1, 2, 0]
+    assert lines[0]["response"]["response"] == "echo fast"
+    # The empty message fails on its own without aborting the batch
+    assert lines[1] == {"index": 2, "error": "Message cannot be empty", "status_code": 400}
+    assert lines[2]["response"]["response"] == "echo slow"
+
+
+def test_bulk_chat_limits_workers_per_provider(monkeypatch):
+    in_flight, peak = Counter(), Counter()
+    fake_batch_chat(monkeypatch, in_flight=in_flight, peak=peak)
+    monkeypatch.setattr(chat_service, "bulk_concurrency_per_provider", 3)
+
+    async def run(max_concurrency):
+        peak.clear()
+        requests = [{"message": f"openai {i}", "model": "gpt-4o-mini"} for i in range(6)] + [{"message": f"ollama {i}", "model": "tinyllama"} for i in range(4)]
+        batch_request = ApiBatchChatRequest(requests=requests, max_concurrency=max_concurrency)
+        return [result async for result in chat_service.handle_bulk_chat(batch_request)]
+
+    results = asyncio.run(run(max_concurrency=2))
+    assert sorted(result.index for result in results) == list(range(10))
+    assert peak == {"openai": 2, "ollama": 2}
+
+    # The request cannot raise the limit above the server's
+    asyncio.run(run(max_concurrency=10))
+    assert peak == {"openai": 3, "ollama": 3}
@@ -0,0 +1,107 @@
+import asyncio
+import sqlite3
+import threading
+
+from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage
+from github_mingzilla.llm_mcp.repositories.chat_history_repository import _ChatHistoryRepository
+from github_mingzilla.llm_mcp.repositories.sqlite_chat_history_store import SqliteChatHistoryStore
+
+
+def make_repo(monkeypatch, tmp_path, **env) -> _ChatHistoryRepository:
+    monkeypatch.setenv("CHAT_HISTORY_BACKEND", "sqlite")
+    monkeypatch.setenv("CHAT_HISTORY_SQLITE_PATH", str(tmp_path / "chat_history.db"))
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return _ChatHistoryRepository()
+
+
+def insert_from_other_process(path: str, session_id: str, content: str) -> None:
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("INSERT INTO chat_messages (session_id, message) VALUES (?, ?)", (session_id, ApiChatMessage(role="user", content=content).model_dump_json()))
+    conn.close()
+
+
+def test_trimming_keeps_persisted_messages(monkeypatch, tmp_path):
+    repo = make_repo(monkeypatch, tmp_path, CHAT_HISTORY_MAX_MESSAGES_PER_SESSION="3")
+
+    async def scenario():
+        for i in range(5):
+            repo.save_message("s1", ApiChatMessage(role="user", content=f"message {i}"))
+        await repo._store.flush()
+        assert [message.content for message in repo.get_conversation_history("s1")] == ["message 2", "message 3", "message 4"]
+        assert repo._store.get_message_counts() == {"s1": 5}
+        await repo.disconnect()
+
+    asyncio.run(scenario())
+
+
+def test_stale_check_polls_data_version_at_interval(tmp_path):
+    path = str(tmp_path / "chat_history.db")
+    store = SqliteChatHistoryStore(path, stale_check_interval=60)
+    store.append("s1", ApiChatMessage(role="user", content="hello"))
+    store.load_messages("s1")
+    assert not store.is_stale("s1")
+
+    insert_from_other_process(path, "s1", "from another worker")
+    assert not store.is_stale("s1")  # Within the interval, the change is not looked for yet
+
+    store._version_checked_at = float("-inf")
+    assert store.is_stale("s1")
+    asyncio.run(store.close())
+
+
+def test_writer_updates_bookkeeping_on_the_event_loop(tmp_path):
+    store = SqliteChatHistoryStore(str(tmp_path / "chat_history.db"))
+    last_ids = store._apply_batch([("append", "s1", ApiChatMessage(role="user", content="hello").model_dump_json())])
+    assert last_ids == {"s1": 1}
+    assert store._last_ids == {}  # Only the caller on the loop thread records the result
+
+    async def scenario():
+        store.load_messages("s1")
+        store.append("s1", ApiChatMessage(role="user", content="again"))
+        await store.flush()
+        assert store._last_ids == {"s1": 2}
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_bookkeeping_only_follows_tracked_sessions(tmp_path):
+    store = SqliteChatHistoryStore(str(tmp_path / "chat_history.db"))
+
+    async def scenario():
+        store.load_messages("kept")
+        store.load_messages("evicted")
+        store.load_messages("deleted")
+        for session_id in ("kept", "evicted", "deleted", "never_loaded"):
+            store.append(session_id, ApiChatMessage(role="user", content="hello"))
+        store.forget("evicted")  # Evicted while its write was still queued
+        store.delete_session("deleted")
+        await store.flush()
+        assert list(store._last_ids) == ["kept"]
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_preload_reads_history_in_a_worker_thread(monkeypatch, tmp_path):
+    repo = make_repo(monkeypatch, tmp_path)
+    insert_from_other_process(repo._store.path, "s1", "persisted")
+    read_threads = []
+    read_session = repo._store._read_session
+
+    def recording_read_session(session_id):
+        read_threads.append(threading.get_ident())
+        return read_session(session_id)
+
+    monkeypatch.setattr(repo._store, "_read_session", recording_read_session)
+
+    async def scenario():
+        await repo.preload("s1")
+        await repo.preload("unknown")
+        assert [message.content for message in repo.find_conversation_by_id("s1")] == ["persisted"]
+        assert repo.get_all_session_ids() == ["s1"]
+        await repo.disconnect()
+
+    asyncio.run(scenario())
+    assert read_threads and threading.get_ident() not in read_threads
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from github_mingzilla.llm_mcp.boundary_models import LlmResponse
+from github_mingzilla.llm_mcp.repositories.completion_cache_repository import _CompletionCacheRepository
+
+
+def make_repo(monkeypatch, **env) -> _CompletionCacheRepository:
+    monkeypatch.setenv("COMPLETION_CACHE_ENABLED", "true")
+    monkeypatch.delenv("SHARED_STATE_DIR", raising=False)
+    monkeypatch.delenv("COMPLETION_CACHE_DISK_PATH", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return _CompletionCacheRepository()
+
+
+def counting_upstream(calls: list, delay: float = 0.01, error: Exception = None):
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return LlmResponse(content=f"answer {len(calls)}")
+
+    return compute
+
+
+def test_concurrent_identical_requests_make_one_upstream_call(monkeypatch):
+    repo = make_repo(monkeypatch)
+    assert repo.is_cacheable(0) and not repo.is_cacheable(None) and not repo.is_cacheable(0.7)
+    key = repo.build_key("gpt-4o-mini", [{"role": "user", "content": "hi"}], {"temperature": 0})
+    calls = []
+
+    async def scenario():
+        return await asyncio.gather(*(repo.get_or_compute(key, counting_upstream(calls)) for _ in range(10)))
+
+    responses = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert {response.content for response in responses} == {"answer 1"}
+    assert repo.get_stats()["coalesced"] == 9
+
+
+def test_failed_leader_does_not_poison_waiters_or_the_cache(monkeypatch):
+    repo = make_repo(monkeypatch)
+    calls = []
+
+    async def scenario():
+        leader = asyncio.create_task(repo.get_or_compute("k", counting_upstream(calls, error=ConnectionError("upstream down"))))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(repo.get_or_compute("k", counting_upstream(calls))) for _ in range(3)]
+        with pytest.raises(ConnectionError):
+            await leader
+        # Waiters share the leader's outcome instead of hanging or stampeding upstream
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
+        assert repo._inflight == {}
+
+        # The failure was not cached: the next request calls upstream again
+        return await repo.get_or_compute("k", counting_upstream(calls))
+
+    assert asyncio.run(scenario()).content == "answer 2"
+    assert len(calls) == 2
+
+
+def test_cancelled_leader_hands_over_to_a_waiter(monkeypatch):
+    repo = make_repo(monkeypatch)
+    calls = []
+
+    async def scenario():
+        leader = asyncio.create_task(repo.get_or_compute("k", counting_upstream(calls, delay=10)))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(repo.get_or_compute("k", counting_upstream(calls))) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    responses = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert {response.content for response in responses} == {"answer 2"}
+
+
+def test_lru_evicts_least_recently_used(monkeypatch):
+    repo = make_repo(monkeypatch, COMPLETION_CACHE_MAX_ENTRIES="2")
+    calls = []
+
+    async def scenario():
+        for key in ("a", "b", "a", "c"):  # Reading "a" again makes "b" the least recently used
+            await repo.get_or_compute(key, counting_upstream(calls, delay=0))
+
+    asyncio.run(scenario())
+    assert list(repo._entries) == ["a", "c"]
+    assert repo.get_stats()["evictions"] == 1
+    assert len(calls) == 3
+
+
+def test_disk_tier_survives_a_restart(monkeypatch, tmp_path):
+    path = str(tmp_path / "completion_cache.db")
+    first = make_repo(monkeypatch, COMPLETION_CACHE_DISK_PATH=path)
+    calls = []
+
+    async def scenario():
+        stored = await first.get_or_compute("k", counting_upstream(calls, delay=0))
+        await first.disconnect()
+
+        second = _CompletionCacheRepository()
+        loaded = await second.get_or_compute("k", counting_upstream(calls, delay=0))
+        stats = second.get_stats()
+        await second.disconnect()
+        return stored, loaded, stats
+
+    stored, loaded, stats = asyncio.run(scenario())
+    assert loaded == stored
+    assert len(calls) == 1
+    assert stats["disk_hits"] == 1 and stats["entries"] == 1
+
+
+def test_key_ignores_surrounding_whitespace_and_key_order():
+    build_key = _CompletionCacheRepository.build_key
+    key = build_key("gpt-4o-mini", [{"role": "user", "content": "  What is 2+2?\n"}], {"temperature": 0})
+
+    assert key == build_key("gpt-4o-mini", [{"content": "What is 2+2?", "role": "user"}], {"temperature": 0})
+    assert key != build_key("gpt-4o-mini", [{"role": "user", "content": "What is 2 + 2?"}], {"temperature": 0})
+    assert key != build_key("gpt-4.1-nano", [{"role": "user", "content": "What is 2+2?"}], {"temperature": 0})
+    assert key != build_key("gpt-4o-mini", [{"role": "user", "content": "What is 2+2?"}], {"temperature": 0, "top_p": 0.5})
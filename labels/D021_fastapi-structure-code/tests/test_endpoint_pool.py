@@ -0,0 +1,86 @@
+from contextlib import ExitStack
+
+import pytest
+
+from github_mingzilla.llm_mcp.util import endpoint_pool
+from github_mingzilla.llm_mcp.util.endpoint_pool import EndpointPool
+
+URLS = ["http://a:11434", "http://b:11434", "http://c:11434"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(endpoint_pool.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_pool(affinity_slack: int = 1) -> EndpointPool:
+    return EndpointPool(URLS, affinity=True, affinity_slack=affinity_slack, eject_after_errors=2, eject_seconds=30)
+
+
+def fail(pool: EndpointPool, url: str) -> None:
+    with pool.track(url) as lease:
+        lease.fail()
+
+
+def test_least_outstanding_wins_and_ties_rotate(clock):
+    pool = make_pool()
+    assert sorted(pool.choose() for _ in URLS) == URLS
+
+    with pool.track(URLS[0]), pool.track(URLS[1]):
+        assert {pool.choose() for _ in range(5)} == {URLS[2]}
+        assert pool.get_stats()[URLS[0]]["outstanding"] == 1
+    assert pool.get_stats()[URLS[0]]["outstanding"] == 0
+
+
+def test_affinity_tolerates_slack_then_moves(clock):
+    pool = make_pool(affinity_slack=1)
+    home = pool.choose("s1")
+
+    with ExitStack() as stack:
+        stack.enter_context(pool.track(home))
+        assert pool.choose("s1") == home  # One more in flight than the others is within the slack
+        stack.enter_context(pool.track(home))
+        moved = pool.choose("s1")
+        assert moved != home
+
+    # The session now sticks to the endpoint it moved to
+    assert pool.choose("s1") == moved
+
+
+def test_ejection_after_consecutive_errors_and_again_after_cool_down(clock):
+    pool = make_pool()
+    fail(pool, URLS[0])
+    with pool.track(URLS[0]):
+        pass  # A success resets the run of errors
+    fail(pool, URLS[0])
+    assert not pool.get_stats()[URLS[0]]["ejected"]
+
+    fail(pool, URLS[0])
+    assert pool.get_stats()[URLS[0]]["ejected"]
+    assert URLS[0] not in {pool.choose() for _ in range(6)}
+
+    clock[0] += 31
+    assert URLS[0] in {pool.choose() for _ in range(6)}
+    fail(pool, URLS[0])  # A single failure after the cool-down ejects it again
+    assert pool.get_stats()[URLS[0]] == {"outstanding": 0, "requests": 5, "errors": 4, "consecutive_errors": 1, "ejected": True, "ejections": 2}
+
+
+def test_raised_exception_counts_as_failure(clock):
+    pool = make_pool()
+    for _ in range(2):
+        with pytest.raises(ConnectionError), pool.track(URLS[1]):
+            raise ConnectionError("refused")
+    assert pool.get_stats()[URLS[1]]["ejected"]
+
+
+def test_fails_open_when_every_endpoint_is_ejected(clock):
+    pool = make_pool()
+    for url in URLS:
+        fail(pool, url)
+        fail(pool, url)
+        clock[0] += 1
+
+    assert all(stats["ejected"] for stats in pool.get_stats().values())
+    assert {pool.choose() for _ in range(3)} == {URLS[0]}  # The endpoint that comes back first
@@ -0,0 +1,45 @@
+import asyncio
+
+from github_mingzilla.llm_mcp.clients.mcp_client import _MCPClient
+from github_mingzilla.llm_mcp.mcp_clients.single_server_mcp_client import SingleServerMCPClient
+
+
+def test_ping_servers_never_discovers_tools(monkeypatch):
+    client = _MCPClient()
+    down, up = list(client._server_config)[:2]
+
+    async def ping_url(server_url, timeout):
+        if server_url == client._server_config[down]["url"]:
+            raise ConnectionError("connection refused")
+
+    async def no_discovery(*args, **kwargs):
+        raise AssertionError("probing must not discover tools")
+
+    monkeypatch.setattr(SingleServerMCPClient, "ping_url", staticmethod(ping_url))
+    monkeypatch.setattr(client, "_get_or_create_client", no_discovery)
+    monkeypatch.setattr(client, "_discover_server_tools", no_discovery)
+
+    results = asyncio.run(client.ping_servers(timeout=1.0))
+
+    assert results[down]["healthy"] is False
+    assert results[down]["error"] == "connection refused"
+    assert results[up]["healthy"] is True
+    assert client._mcp_clients == {}
+
+
+def test_server_without_tools_is_healthy(monkeypatch):
+    client = _MCPClient()
+    server_name = list(client._server_config)[0]
+    server_client = SingleServerMCPClient(server_name, client._server_config[server_name]["url"])
+    server_client.tools = []
+
+    async def ping():
+        pass
+
+    monkeypatch.setattr(server_client, "ping", ping)
+    client._mcp_clients[server_name] = server_client
+    monkeypatch.setattr(SingleServerMCPClient, "ping_url", staticmethod(lambda server_url, timeout: asyncio.sleep(0)))
+
+    results = asyncio.run(client.ping_servers(timeout=1.0))
+
+    assert results[server_name]["healthy"] is True
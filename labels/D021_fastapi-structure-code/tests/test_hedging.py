@@ -0,0 +1,72 @@
+import asyncio
+
+from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage
+from github_mingzilla.llm_mcp.clients.llm_client import llm_client
+from github_mingzilla.llm_mcp.util.hedging import HedgingPolicy
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+
+
+def make_model(name: str, context_window: int = 8192) -> LlmModel:
+    return LlmModel(provider="ollama", batch_url="http://test/v1/chat/completions", stream_url="http://test/v1/chat/completions", model_name=name, context_window=context_window, max_output_tokens=256)
+
+
+def make_policy(backup_gate=None) -> HedgingPolicy:
+    policy = HedgingPolicy(backup_gate=backup_gate)
+    policy.initial_delay = 0.01
+    policy.max_ratio = 1.0
+    return policy
+
+
+def make_open_stream(items_by_model, delays_by_model, opened):
+    async def open_stream(target):
+        opened.append(target.model_name)
+        await asyncio.sleep(delays_by_model[target.model_name])
+        for item in items_by_model[target.model_name]:
+            yield item
+
+    return open_stream
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+def test_primary_error_chunk_loses_to_the_backup():
+    primary, backup = make_model("primary"), make_model("backup")
+    released = []
+    policy = make_policy(lambda model: lambda: released.append(model.model_name))
+    opened = []
+    open_stream = make_open_stream({"primary": ['{"error": "API error 500"}'], "backup": ["ok", "done"]}, {"primary": 0.05, "backup": 0.1}, opened)
+
+    items = asyncio.run(collect(policy.stream(primary, backup, open_stream, 10, llm_client._is_error_chunk)))
+    assert items == ["ok", "done"]
+    assert policy.get_stats()["backup_won"] == 1
+    assert released == ["backup"]
+
+
+def test_backup_is_skipped_without_an_admission_slot():
+    primary, backup = make_model("primary"), make_model("backup")
+    policy = make_policy(lambda model: None)
+    opened = []
+    open_stream = make_open_stream({"primary": ["slow answer"], "backup": ["fast answer"]}, {"primary": 0.05, "backup": 0}, opened)
+
+    items = asyncio.run(collect(policy.stream(primary, backup, open_stream, 10, llm_client._is_error_chunk)))
+    assert items == ["slow answer"]
+    assert opened == ["primary"]
+    assert policy.get_stats()["skipped_admission"] == 1
+
+
+def test_history_is_fitted_to_each_target_model():
+    messages = [ApiChatMessage(role="user", content=f"question {i} " + "word " * 200) for i in range(10)]
+    large, small = make_model("large", context_window=100_000), make_model("small", context_window=1024)
+
+    async def scenario():
+        fit = llm_client._fit_per_model(large, messages, None)
+        large_messages, _ = await fit(large)
+        small_messages, _ = await fit(small)
+        return large_messages, small_messages
+
+    large_messages, small_messages = asyncio.run(scenario())
+    assert len(large_messages) == 10
+    assert 0 < len(small_messages) < 10
+    assert sum(message.estimate_tokens() for message in small_messages) <= small.prompt_token_budget
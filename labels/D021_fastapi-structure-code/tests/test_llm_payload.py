@@ -0,0 +1,22 @@
+from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage
+from github_mingzilla.llm_mcp.clients.llm_client import llm_client
+from github_mingzilla.llm_mcp.util.llm_model import LlmModel
+
+
+def make_model(context_window: int, max_output_tokens: int) -> LlmModel:
+    return LlmModel(provider="ollama", batch_url="http://test/v1/chat/completions", stream_url="http://test/v1/chat/completions", model_name="test-model", context_window=context_window, max_output_tokens=max_output_tokens)
+
+
+def test_max_tokens_is_capped_by_the_room_left_in_the_window():
+    messages = [ApiChatMessage(role="user", content="word " * 400)]
+    prompt_tokens = sum(message.estimate_tokens() for message in messages)
+
+    payload = llm_client._build_stream_payload(messages, make_model(context_window=prompt_tokens + 100, max_output_tokens=1000))
+    assert payload["max_tokens"] == 100
+
+    payload = llm_client._build_stream_payload(messages, make_model(context_window=prompt_tokens + 5000, max_output_tokens=1000))
+    assert payload["max_tokens"] == 1000
+
+
+def test_max_tokens_stays_positive_for_an_oversized_prompt():
+    assert make_model(context_window=100, max_output_tokens=50).max_tokens_for(500) == 1
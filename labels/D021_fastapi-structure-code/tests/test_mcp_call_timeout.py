@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from github_mingzilla.llm_mcp.mcp_clients.single_server_mcp_client import SingleServerMCPClient
+
+
+class SlowSession:
+    def __init__(self, call_seconds: float):
+        self.call_seconds = call_seconds
+
+    async def call_tool(self, tool_name, arguments):
+        await asyncio.sleep(self.call_seconds)
+        return SimpleNamespace(isError=False, content=[])
+
+
+def make_client(queue_seconds: float, call_seconds: float) -> SingleServerMCPClient:
+    client = SingleServerMCPClient("calculator", "http://test/mcp/", {"call_timeout": 0.1})
+
+    @asynccontextmanager
+    async def session():
+        await asyncio.sleep(queue_seconds)  # Waiting for a slot
+        yield SlowSession(call_seconds)
+
+    client._session_pool.session = session
+    return client
+
+
+def test_queue_wait_does_not_count_against_the_call_timeout():
+    client = make_client(queue_seconds=0.2, call_seconds=0.01)
+    assert asyncio.run(client.call_tool("add", {"a": 1, "b": 2})) == {}
+
+
+def test_slow_tool_call_times_out():
+    client = make_client(queue_seconds=0, call_seconds=0.5)
+    try:
+        asyncio.run(client.call_tool("add", {"a": 1, "b": 2}))
+        raise AssertionError("call should time out")
+    except RuntimeError as e:
+        assert str(e) == "Tool call failed: no result within 0.1s"
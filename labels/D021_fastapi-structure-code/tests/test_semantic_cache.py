@@ -0,0 +1,28 @@
+import numpy as np
+
+from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage
+from github_mingzilla.llm_mcp.repositories.semantic_cache_repository import _SemanticCacheRepository
+from github_mingzilla.llm_mcp.util.vector_index import CosineVectorIndex
+
+
+def test_index_normalizes_queries_and_stored_vectors():
+    index = CosineVectorIndex(2)
+    index.add(np.array([3.0, 0.0]), "x-axis")
+    index.add([0.0, 0.5], "y-axis")
+
+    row, similarity, payload = index.search([10.0, 1.0])
+    assert payload == "x-axis"
+    assert 0.99 < similarity <= 1.0
+
+
+def test_only_deterministic_requests_are_cacheable_by_default(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "true")
+    repo = _SemanticCacheRepository()
+    messages = [ApiChatMessage(role="user", content="What is the capital of France?")]
+
+    assert repo.get_cacheable_question(messages, 0) == "What is the capital of France?"
+    assert repo.get_cacheable_question(messages, None) is None
+    assert repo.get_cacheable_question(messages, 0.7) is None
+
+    monkeypatch.setenv("SEMANTIC_CACHE_SAMPLED", "true")
+    assert _SemanticCacheRepository().get_cacheable_question(messages, None) == "What is the capital of France?"
@@ -0,0 +1,72 @@
+import json
+
+from github_mingzilla.llm_mcp.util.sse_util import DeltaContentAccumulator, SseFrameBuffer
+
+CHUNKS = [
+    {"choices": [{"index": 0, "delta": {"role": "assistant", "content": None}}]},
+    {"choices": [{"index": 0, "delta": {"content": 'She said "hi"'}}]},
+    {"choices": [{"index": 0, "delta": {"content": " \\ back\\slash\nnew line, tab\t"}}]},
+    {"choices": [{"index": 0, "delta": {"tool_calls": [{"index": 0, "function": {"arguments": '{"content": "not text"}'}}]}}]},
+    {"choices": [{"index": 0, "delta": {"content": " café ☃ ends with \\"}}]},
+    {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+]
+
+
+def upstream_bytes(separator: str = "\n") -> bytes:
+    events = [f"data: {json.dumps(chunk, ensure_ascii=False)}" for chunk in CHUNKS] + ["data: [DONE]"]
+    return "".join(event + separator + separator for event in events).encode("utf-8")
+
+
+def json_path_content() -> str:
+    return "".join(chunk["choices"][0]["delta"].get("content") or "" for chunk in CHUNKS)
+
+
+def frame_payloads(frames: bytes) -> list:
+    return [json.loads(event.split(b"data: ", 1)[1]) for event in frames.split(b"\n\n") if event]
+
+
+def test_frames_split_across_reads_are_reassembled():
+    buffer = SseFrameBuffer()
+    data = upstream_bytes()
+
+    frames = b"".join(buffer.feed(data[i : i + 7]) for i in range(0, len(data), 7)) + buffer.flush()
+
+    assert frame_payloads(frames) == CHUNKS
+    assert buffer.frame_count == len(CHUNKS)
+    assert frames.startswith(b"event: chunk\ndata: ")
+
+
+def test_several_frames_in_one_read_and_crlf_separators():
+    buffer = SseFrameBuffer()
+    frames = buffer.feed(upstream_bytes("\r\n"))
+
+    assert frame_payloads(frames) == CHUNKS
+    assert b"\r" not in frames
+    assert buffer.flush() == b""
+
+
+def test_trailing_frame_without_newline_is_flushed():
+    buffer = SseFrameBuffer()
+    assert buffer.feed(b'data: {"a": 1}') == b""
+    assert buffer.flush() == b'event: chunk\ndata: {"a": 1}\n\n'
+
+
+def test_accumulated_raw_chunks_match_the_json_path():
+    accumulator = DeltaContentAccumulator()
+    for chunk in CHUNKS:
+        accumulator.feed(json.dumps(chunk))
+
+    assert accumulator.get_content() == json_path_content()
+
+
+def test_accumulated_passthrough_frames_match_the_json_path():
+    buffer = SseFrameBuffer()
+    accumulator = DeltaContentAccumulator()
+    data = upstream_bytes("\r\n")
+    for i in range(0, len(data), 11):
+        frames = buffer.feed(data[i : i + 11])
+        if frames:
+            accumulator.feed(frames)
+
+    assert accumulator.get_content() == json_path_content()
+    assert DeltaContentAccumulator().get_content() == ""
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from github_mingzilla.llm_mcp.clients.mcp_client import _MCPClient
+from github_mingzilla.llm_mcp.repositories.sqlite_tool_catalogue_store import SqliteToolCatalogueStore
+
+
+def make_client(tmp_path) -> _MCPClient:
+    client = _MCPClient()
+    client._catalogue_store = SqliteToolCatalogueStore(str(tmp_path / "tool_catalogue.db"))
+    client._all_tools = []
+    client._tools_cached_at = 0.0
+    return client
+
+
+def test_lease_miss_backs_off_until_the_lease_expires(tmp_path):
+    client = make_client(tmp_path)
+    other_worker = SqliteToolCatalogueStore(client._catalogue_store.path)
+    assert other_worker.try_acquire_lease("tool_discovery", "other-worker", 30)
+
+    discovered = []
+
+    async def discover_server_tools(server_name):
+        discovered.append(server_name)
+        return []
+
+    client._discover_server_tools = discover_server_tools
+
+    async def scenario():
+        await client.discover_tools()
+        await client._refresh_task
+        assert client._discovery_backoff_until > time.monotonic() + 25
+
+        # Within the backoff, a stale catalogue does not start another lease attempt
+        finished = client._refresh_task
+        await client.discover_tools()
+        assert client._refresh_task is finished
+
+    asyncio.run(scenario())
+    assert discovered == []
+    other_worker.close()
+    client._catalogue_store.close()
+
+
+def test_lease_renewals_do_not_reload_the_catalogue(tmp_path):
+    path = str(tmp_path / "tool_catalogue.db")
+    reader = SqliteToolCatalogueStore(path)
+    writer = SqliteToolCatalogueStore(path)
+    assert reader.load_if_changed() == {}
+
+    writer.save({"calculator": [{"name": "add"}]})
+    assert list(reader.load_if_changed()) == ["calculator"]
+
+    writer.try_acquire_lease("tool_discovery", "writer", 30)
+    writer.release_lease("tool_discovery", "writer")
+    assert reader.load_if_changed() is None
+
+    reader.close()
+    writer.close()
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+from github_mingzilla.llm_mcp.boundary_models import ApiChatMessage, DomainToolExecutionRequest, LlmResponse
+from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
+from github_mingzilla.llm_mcp.repositories.chat_history_repository import chat_history_repo
+from github_mingzilla.llm_mcp.routers.chat_router import chat_router
+from github_mingzilla.llm_mcp.services.tool_orchestration_service import OrchestrationInProgressError, tool_orchestration_service
+
+MODEL = "gpt-4o-mini"
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(chat_router)
+    return app
+
+
+def start_interrupted_session() -> str:
+    """Create a session whose last assistant message has a tool call without a result."""
+    session_id = str(uuid.uuid4())
+    chat_history_repo.save_message(session_id, ApiChatMessage(role="user", content="What is 2 + 3?"))
+    tool_call = {"id": "call_1", "type": "function", "function": {"name": "add", "arguments": json.dumps({"a": 2, "b": 3})}}
+    chat_history_repo.save_message(session_id, ApiChatMessage(role="assistant", content="", tool_calls=[tool_call]))
+    return session_id
+
+
+def test_claim_rejects_second_orchestration_until_released():
+    first = tool_orchestration_service.claim_session("claimed-session")
+    try:
+        try:
+            tool_orchestration_service.claim_session("claimed-session")
+            raise AssertionError("second claim should be rejected")
+        except OrchestrationInProgressError:
+            pass
+    finally:
+        first.release()
+
+    second = tool_orchestration_service.claim_session("claimed-session")
+    first.release()  # A stale release must not drop the newer claim
+    try:
+        try:
+            tool_orchestration_service.claim_session("claimed-session")
+            raise AssertionError("claim should still be held")
+        except OrchestrationInProgressError:
+            pass
+    finally:
+        second.release()
+
+
+def test_concurrent_resumes_run_pending_tool_calls_once(monkeypatch):
+    session_id = start_interrupted_session()
+    executed = []
+
+    async def get_filtered_tools(selected_tools):
+        return []
+
+    async def execute_tools_parallel(tool_calls, deadline=None):
+        executed.extend(tool_call.id for tool_call in tool_calls)
+        await asyncio.sleep(0.2)
+        return [ApiChatMessage(role="tool", content="5", tool_call_id=tool_call.id, name=tool_call.name) for tool_call in tool_calls]
+
+    async def invoke(**kwargs):
+        return LlmResponse(content="2 + 3 = 5", model=MODEL)
+
+    monkeypatch.setattr(tool_orchestration_service.mcp_client, "get_filtered_tools", get_filtered_tools)
+    monkeypatch.setattr(tool_orchestration_service.mcp_client, "execute_tools_parallel", execute_tools_parallel)
+    monkeypatch.setattr(tool_orchestration_service.llm_client, "invoke", invoke)
+
+    async def resume(client: httpx.AsyncClient) -> int:
+        body = {"message": "", "session_id": session_id, "model": MODEL, "selected_tools": [{"name": "add"}]}
+        response = await client.post("/api/v1/chat/stream-tools", json=body, headers={"Accept": "text/event-stream"})
+        return response.status_code
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=make_app()), base_url="http://test") as client:
+            return await asyncio.gather(resume(client), resume(client))
+
+    statuses = asyncio.run(scenario())
+
+    assert sorted(statuses) == [200, 409]
+    assert executed == ["call_1"]
+    tool_messages = [message for message in chat_history_repo.get_conversation_history(session_id) if message.role == "tool"]
+    assert [message.tool_call_id for message in tool_messages] == ["call_1"]
+
+
+def test_new_message_closes_tool_calls_left_without_results():
+    session_id = start_interrupted_session()
+
+    assert chat_history_repo.close_unanswered_tool_calls(session_id) == 1
+    assert chat_history_repo.close_unanswered_tool_calls(session_id) == 0
+
+    roles = [message["role"] for message in chat_history_repo.get_openai_messages(session_id)]
+    assert roles == ["user", "assistant", "tool"]
+    assert "interrupted" in chat_history_repo.get_conversation_history(session_id)[-1].content
+
+
+def stream_chunk(delta: dict, finish_reason=None) -> str:
+    return json.dumps({"choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]})
+
+
+def test_overlapped_mode_saves_each_tool_result_as_it_finishes(monkeypatch):
+    session_id = str(uuid.uuid4())
+    chat_history_repo.save_message(session_id, ApiChatMessage(role="user", content="Add and multiply 2 and 3"))
+    slow_tool_started = asyncio.Event()
+
+    async def raw_stream_openai_format(*args, **kwargs):
+        for index, name in enumerate(["add", "multiply"]):
+            tool_call = {"index": index, "id": f"call_{name}", "type": "function", "function": {"name": name, "arguments": '{"a": 2, "b": 3}'}}
+            yield stream_chunk({"tool_calls": [tool_call]})
+        yield stream_chunk({}, finish_reason="tool_calls")
+
+    async def execute_tool(request, deadline=None):
+        if request.name == "multiply":
+            slow_tool_started.set()
+            await asyncio.sleep(10)
+        return ApiChatMessage(role="tool", content="5", tool_call_id=request.id, name=request.name)
+
+    monkeypatch.setattr(tool_orchestration_service.llm_client, "raw_stream_openai_format", raw_stream_openai_format)
+    monkeypatch.setattr(tool_orchestration_service.mcp_client, "execute_tool", execute_tool)
+
+    async def scenario():
+        events = tool_orchestration_service.orchestrate_tools_overlapped(session_id, MODEL, mcp_tools=[])
+        async for event in events:
+            if event.event == "tool_call_completed":
+                break
+        # The client disconnects while multiply is still running
+        await events.aclose()
+
+    asyncio.run(scenario())
+
+    conversation = chat_history_repo.get_conversation_history(session_id)
+    assert [message.role for message in conversation] == ["user", "assistant", "tool"]
+    assert conversation[-1].tool_call_id == "call_add"
+
+
+def test_iteration_count_uses_checkpointed_round_when_user_message_was_trimmed():
+    tool_call = {"id": "call_3", "type": "function", "function": {"name": "add", "arguments": "{}"}}
+    # The user message and earlier rounds were trimmed away
+    conversation = [
+        ApiChatMessage(role="tool", content="5", tool_call_id="call_2", name="add"),
+        ApiChatMessage(role="assistant", content="", tool_calls=[tool_call], orchestration_round=3),
+        ApiChatMessage(role="tool", content="5", tool_call_id="call_3", name="add"),
+    ]
+
+    assert tool_orchestration_service._count_completed_iterations(conversation) == 4
+    assert tool_orchestration_service._count_completed_iterations([ApiChatMessage(role="user", content="hi")] + conversation[1:]) == 4
+    assert tool_orchestration_service._count_completed_iterations(conversation[:1] + [ApiChatMessage(role="user", content="hi")]) == 0
+
+
+def test_overlapped_mode_runs_tool_calls_that_repeat_an_id(monkeypatch):
+    session_id = str(uuid.uuid4())
+    chat_history_repo.save_message(session_id, ApiChatMessage(role="user", content="Add and multiply 2 and 3"))
+    rounds = []
+
+    async def raw_stream_openai_format(*args, **kwargs):
+        rounds.append(len(rounds))
+        if len(rounds) == 1:
+            # Some models number every tool call of a turn with the same ID
+            for index, name in enumerate(["add", "multiply"]):
+                tool_call = {"index": index, "id": "call_0", "type": "function", "function": {"name": name, "arguments": '{"a": 2, "b": 3}'}}
+                yield stream_chunk({"tool_calls": [tool_call]})
+            yield stream_chunk({}, finish_reason="tool_calls")
+        else:
+            yield stream_chunk({"content": "5 and 6"}, finish_reason="stop")
+
+    async def execute_tool(request, deadline=None):
+        return ApiChatMessage(role="tool", content="5" if request.name == "add" else "6", tool_call_id=request.id, name=request.name)
+
+    monkeypatch.setattr(tool_orchestration_service.llm_client, "raw_stream_openai_format", raw_stream_openai_format)
+    monkeypatch.setattr(tool_orchestration_service.mcp_client, "execute_tool", execute_tool)
+
+    async def scenario():
+        return [event async for event in tool_orchestration_service.orchestrate_tools_overlapped(session_id, MODEL, mcp_tools=[])]
+
+    events = asyncio.run(scenario())
+
+    assert sorted(event.data["name"] for event in events if event.event == "tool_call_completed") == ["add", "multiply"]
+    tool_messages = [message for message in chat_history_repo.get_conversation_history(session_id) if message.role == "tool"]
+    assert sorted(message.content for message in tool_messages) == ["5", "6"]
+
+
+def test_unanswered_calls_are_matched_to_results_by_position():
+    tool_calls = [{"id": "call_0", "type": "function", "function": {"name": name, "arguments": "{}"}} for name in ("add", "multiply")]
+    conversation = [
+        ApiChatMessage(role="user", content="Add and multiply"),
+        ApiChatMessage(role="assistant", content="", tool_calls=tool_calls),
+        ApiChatMessage(role="tool", content="5", tool_call_id="call_0", name="add"),
+    ]
+
+    pending = tool_orchestration_service._get_unanswered_tool_calls(conversation, {"add": "calculator", "multiply": "calculator"})
+    assert [request.name for request in pending] == ["multiply"]
+
+
+def test_unknown_tool_is_answered_with_an_error_without_a_call(monkeypatch):
+    async def call_tool(*args, **kwargs):
+        raise AssertionError("an unknown tool must not be dispatched")
+
+    monkeypatch.setattr(mcp_client, "_call_tool", call_tool)
+
+    request = DomainToolExecutionRequest(id="call_1", name="subtract", arguments="{}", server=None)
+    tool_message = asyncio.run(mcp_client.execute_tool(request))
+
+    assert tool_message.tool_call_id == "call_1"
+    assert "Unknown tool 'subtract'" in json.loads(tool_message.content)["error"]
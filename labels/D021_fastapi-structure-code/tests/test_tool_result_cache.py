@@ -0,0 +1,99 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from mcp import types
+
+from github_mingzilla.llm_mcp.clients.mcp_client import mcp_client
+from github_mingzilla.llm_mcp.mcp_clients.single_server_mcp_client import SingleServerMCPClient
+from github_mingzilla.llm_mcp.models import DomainToolExecutionRequest
+from github_mingzilla.llm_mcp.repositories.tool_result_cache_repository import _ToolResultCacheRepository
+
+
+class FakeSession:
+    def __init__(self, result: types.CallToolResult):
+        self.result = result
+        self.calls = 0
+
+    async def call_tool(self, tool_name, arguments):
+        self.calls += 1
+        return self.result
+
+
+def make_client(session: FakeSession) -> SingleServerMCPClient:
+    client = SingleServerMCPClient("calculator", "http://localhost:0/mcp")
+
+    @asynccontextmanager
+    async def borrow():
+        yield session
+
+    client._session_pool.session = borrow
+    return client
+
+
+def test_tool_error_results_are_not_cached(monkeypatch):
+    session = FakeSession(types.CallToolResult(content=[types.TextContent(type="text", text="division by zero")], isError=True))
+    cache = _ToolResultCacheRepository()
+    cache.enabled = True
+    monkeypatch.setattr(mcp_client, "tool_result_cache_repo", cache)
+    monkeypatch.setitem(mcp_client._mcp_clients, "calculator", make_client(session))
+    monkeypatch.setitem(mcp_client._server_config, "calculator", {**mcp_client._server_config.get("calculator", {}), "tool_cache": {"add": 3600.0}})
+
+    request = DomainToolExecutionRequest(id="call_1", name="add", arguments={"a": 1, "b": 2}, server="calculator")
+    first = asyncio.run(mcp_client.execute_tool(request))
+    second = asyncio.run(mcp_client.execute_tool(request))
+
+    assert session.calls == 2
+    assert "division by zero" in first.content and "error" in second.content
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_result_computed_across_an_invalidation_is_not_stored():
+    cache = _ToolResultCacheRepository()
+    key = cache.build_key("api_config", "get_api_config", {"id": 1})
+
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_read():
+            started.set()
+            await release.wait()
+            return "before write"
+
+        read = asyncio.create_task(cache.get_or_compute(key, "api_config", 30.0, slow_read))
+        await started.wait()
+        await cache.invalidate_server("api_config")
+        release.set()
+        assert await read == "before write"
+
+        async def fresh_read():
+            return "after write"
+
+        return await cache.get_or_compute(key, "api_config", 30.0, fresh_read)
+
+    assert asyncio.run(scenario()) == "after write"
+    assert cache.get_stats()["stale_stores"] == 1
+
+
+def test_invalidation_is_shared_between_workers(monkeypatch, tmp_path):
+    monkeypatch.setenv("SHARED_STATE_DIR", str(tmp_path))
+    worker_a = _ToolResultCacheRepository()
+    worker_b = _ToolResultCacheRepository()
+    key = worker_a.build_key("api_config", "get_api_config", {"id": 1})
+    calls = []
+
+    async def read():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        assert await worker_a.get_or_compute(key, "api_config", 30.0, read) == 1
+        assert await worker_a.get_or_compute(key, "api_config", 30.0, read) == 1
+        await worker_b.invalidate_server("api_config")
+        return await worker_a.get_or_compute(key, "api_config", 30.0, read)
+
+    try:
+        assert asyncio.run(scenario()) == 2
+    finally:
+        asyncio.run(worker_a.disconnect())
+        asyncio.run(worker_b.disconnect())